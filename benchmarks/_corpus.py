@@ -0,0 +1,87 @@
+"""Reproduzierbare Testströme für die Benchmarks.
+
+Alle Generatoren nehmen ein `random.Random` mit festem Seed entgegen, damit
+zwei Läufe (vor/nach einer Änderung) exakt dieselben Bytes verarbeiten.
+"""
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from _load import load
+
+esp3 = load("esp3")
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "data" / "erp1_corpus.txt"
+# SubTelNum 1, Broadcast, -68 dBm, keine Verschlüsselung
+OPT = bytes.fromhex("01FFFFFFFF4400")
+
+
+def load_telegrams(path: Path = DEFAULT_CORPUS) -> List[Tuple[str, bytes]]:
+    """(EEP, DATA) je Zeile des Textkorpus."""
+    out = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        eep, data_hex = line.split()[:2]
+        out.append((eep, bytes.fromhex(data_hex)))
+    return out
+
+
+def with_sender(data: bytes, sender: int) -> bytes:
+    # DATA endet auf Sender-ID (4 Bytes) + Status
+    return data[:-5] + sender.to_bytes(4, "big") + data[-1:]
+
+
+def frames_for(
+    telegrams: List[Tuple[str, bytes]], n: int, rng: random.Random, senders: int = 0
+) -> Tuple[List[bytes], Dict[int, str]]:
+    """`n` Frames aus dem Korpus; mit `senders` > 0 über so viele IDs verteilt.
+
+    Liefert zusätzlich Sender -> EEP für die EEP-Stufe.
+    """
+    frames = []
+    eeps: Dict[int, str] = {}
+    if senders:
+        # Jede ID bekommt fest ein Korpus-Telegramm als Gerätetyp
+        ids = rng.sample(range(0x01000000, 0xFF7FFFFF), senders)
+        devices = [(sid, telegrams[i % len(telegrams)]) for i, sid in enumerate(ids)]
+        for _ in range(n):
+            sid, (eep, data) = devices[rng.randrange(senders)]
+            frames.append(esp3.build_frame(0x01, with_sender(data, sid), OPT))
+            eeps[sid] = eep
+    else:
+        for i in range(n):
+            eep, data = telegrams[i % len(telegrams)]
+            frames.append(esp3.build_frame(0x01, data, OPT))
+            eeps[int.from_bytes(data[-5:-1], "big")] = eep
+    return frames, eeps
+
+
+def noisy(frames: Iterable[bytes], rng: random.Random, garbage: float = 0.05, flips: float = 0.02) -> bytes:
+    """Strom mit Müll zwischen Frames (inkl. falscher Sync-Bytes) und Bitfehlern."""
+    out = bytearray()
+    for frame in frames:
+        if rng.random() < garbage:
+            junk = bytearray(rng.randbytes(rng.randint(1, 12)))
+            junk[0] = esp3.ESP3_SYNC  # Falsches Sync: Header-CRC muss greifen
+            out += junk
+        if rng.random() < flips:
+            frame = bytearray(frame)
+            i = rng.randrange(esp3.ESP3_HEADER_LEN, len(frame))
+            frame[i] ^= 1 << rng.randrange(8)  # Daten-CRC-Fehler
+        out += frame
+    return bytes(out)
+
+
+def fragment(stream: bytes, rng: random.Random, lo: int = 1, hi: int = 64) -> List[bytes]:
+    """Zerlegt einen Strom in Stücke zufälliger Länge (wie TCP-Segmente)."""
+    chunks = []
+    pos = 0
+    while pos < len(stream):
+        n = rng.randint(lo, hi)
+        chunks.append(stream[pos:pos + n])
+        pos += n
+    return chunks
@@ -0,0 +1,35 @@
+"""Lokales Fake-Gateway für Benchmarks: TCP auf 127.0.0.1, ohne Hardware.
+
+Läuft in einem eigenen Thread mit blockierenden Sockets, damit der Sender
+den Event-Loop des Empfängers nicht belastet.
+"""
+from __future__ import annotations
+
+import socket
+import threading
+from typing import Optional
+
+
+class FakeGateway:
+    def __init__(self, stream: bytes = b""):
+        self._stream = stream
+        self._srv = socket.create_server(("127.0.0.1", 0))
+        self.port = self._srv.getsockname()[1]
+        self._conn: Optional[socket.socket] = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        conn, _ = self._srv.accept()
+        self._srv.close()
+        self._conn = conn
+        self._ready.set()
+        with conn:
+            if self._stream:
+                conn.sendall(self._stream)
+            conn.recv(1)  # offen halten, bis der Empfänger schließt
+
+    def send(self, data: bytes) -> None:
+        """Einzelne Frames nachschieben (Latenzmessung)."""
+        self._ready.wait()
+        self._conn.sendall(data)
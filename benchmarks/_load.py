@@ -0,0 +1,26 @@
+"""Lädt die HA-freien Module der Integration ohne `__init__.py`.
+
+`custom_components/enocean_tcp/__init__.py` importiert Home Assistant. Die
+Protokoll-Module (CRC, Parser, Decoder …) tun das nicht – damit Benchmarks
+auch ohne HA-Installation laufen, wird das Paket hier nur als Namensraum
+registriert und die Untermodule werden regulär importiert.
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+PKG = "enocean_tcp"
+COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / PKG
+
+
+def load(name: str):
+    if PKG not in sys.modules:
+        spec = importlib.machinery.ModuleSpec(PKG, None, is_package=True)
+        pkg = importlib.util.module_from_spec(spec)
+        pkg.__path__ = [str(COMPONENT_DIR)]
+        sys.modules[PKG] = pkg
+    return importlib.import_module(f"{PKG}.{name}")
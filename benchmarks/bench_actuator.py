@@ -0,0 +1,45 @@
+"""Micro-Benchmark: Aktor-Frames aus Vorlagen vs. `encode_triplet` je Aufruf.
+
+`encode_triplet` ist der Weg über den Dienst `send_raw` (Hex parsen, Header
+und beide CRCs berechnen); `actuator` nutzt die beim Anlegen berechneten
+`FrameTemplate`s. Zusätzlich eine Szene: 100 Dimmer auf einen Wert.
+
+Aufruf: python benchmarks/bench_actuator.py
+"""
+from __future__ import annotations
+
+import timeit
+
+from _load import load
+
+esp3 = load("esp3")
+actuator = load("actuator")
+
+DEVICE = 0x05123456
+SCENE = 100
+
+
+def main() -> None:
+    act = actuator.get_actuator("D2-01-12", DEVICE)
+    data_on = "D2010064" + "00000000" + "00"
+    opt = f"03{DEVICE:08X}FF00"
+    assert esp3.encode_triplet(1, data_on, opt) == act.switch(True)
+    assert esp3.encode_triplet(1, "D2010032" + "00000000" + "00", opt) == act.dim(50)
+
+    n = 200_000
+    runs = {
+        "encode_triplet (Ein)": lambda: esp3.encode_triplet(1, data_on, opt),
+        "Vorlage Ein/Aus (fertig)": lambda: act.switch(True),
+        "Vorlage Dimmwert (gepatcht)": lambda: act.dim(50),
+    }
+    for name, fn in runs.items():
+        t = min(timeit.repeat(fn, number=n, repeat=3))
+        print(f"{name:32s} {t / n * 1e6:7.3f} µs/frame")
+
+    dimmers = [actuator.get_actuator("A5-38-08", DEVICE + i, 0, 0xFF990080 + (i & 0x7F)) for i in range(SCENE)]
+    t = min(timeit.repeat(lambda: [d.dim(40) for d in dimmers], number=2000, repeat=3))
+    print(f"{f'Szene ({SCENE} Dimmer)':32s} {t / 2000 * 1e6:7.1f} µs/Szene")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Micro-Benchmark: tabellenbasierte CRC8 vs. bitweise Referenz.
+
+Aufruf: python benchmarks/bench_crc8.py
+"""
+from __future__ import annotations
+
+import os
+import timeit
+
+from _load import load
+
+crc8_mod = load("crc8")
+
+
+def crc8_bitwise(data: bytes) -> int:
+    # Ursprüngliche Implementierung aus hub.py (vor der Tabelle)
+    crc = 0
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ 0x07) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+    return crc
+
+
+def main() -> None:
+    # Typisches ERP1-Telegramm: 4BS DATA (10 Bytes) + OPT (7 Bytes)
+    data = os.urandom(10)
+    opt = os.urandom(7)
+    header = bytes([0x00, 0x0A, 0x07, 0x01])
+    assert crc8_bitwise(data + opt) == crc8_mod.crc8(opt, crc8_mod.crc8(data))
+
+    n = 200_000
+    runs = {
+        "bitweise (header + data+opt)": lambda: (
+            crc8_bitwise(header),
+            crc8_bitwise(data + opt),
+        ),
+        "tabelle (header + data+opt)": lambda: (
+            crc8_mod.crc8(header),
+            crc8_mod.crc8(data + opt),
+        ),
+        "tabelle inkrementell": lambda: (
+            crc8_mod.crc8(header),
+            crc8_mod.crc8(opt, crc8_mod.crc8(data)),
+        ),
+    }
+    for name, fn in runs.items():
+        t = min(timeit.repeat(fn, number=n, repeat=3))
+        print(f"{name:32s} {t / n * 1e6:7.3f} µs/frame")
+
+    # Batch-Prüfung: 1000 Frames à 17 Bytes in einem Puffer
+    frame = data + opt
+    buf = frame * 1000
+    expected = crc8_mod.crc8(frame)
+    spans = [(i * len(frame), (i + 1) * len(frame), expected) for i in range(1000)]
+    t = min(timeit.repeat(lambda: crc8_mod.crc8_verify_many(buf, spans), number=50, repeat=3))
+    print(f"{'verify_many (1000 Frames)':32s} {t / 50 / 1000 * 1e6:7.3f} µs/frame")
+
+
+if __name__ == "__main__":
+    main()
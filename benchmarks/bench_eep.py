@@ -0,0 +1,77 @@
+"""Benchmark: EEP-Dekodierung über einen Telegramm-Korpus.
+
+Vergleicht die übersetzten Profile der Registry mit einer Variante, die die
+Felddefinitionen bei jedem Telegramm interpretiert.
+
+Aufruf: python benchmarks/bench_eep.py [korpus.txt]
+"""
+from __future__ import annotations
+
+import sys
+import timeit
+from pathlib import Path
+
+from _load import load
+
+eep = load("eep")
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "data" / "erp1_corpus.txt"
+
+
+def load_corpus(path: Path):
+    out = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        profile, data_hex = line.split()[:2]
+        dec = eep.get_decoder(*eep.parse_eep(profile))
+        if dec is None:
+            raise SystemExit(f"Unbekanntes Profil im Korpus: {profile}")
+        out.append((dec, bytes.fromhex(data_hex)))
+    return out
+
+
+def decode_interpreted(dec, data):
+    # Spezifikation pro Telegramm auswerten (Referenz ohne Vorübersetzung)
+    n = dec.payload_len
+    v = int.from_bytes(data[1:1 + n], "big")
+    bits = n * 8
+    out = {}
+    for f in dec.fields:
+        raw = (v >> (bits - f.offset - f.size)) & ((1 << f.size) - 1)
+        if f.scale is not None:
+            rmin, rmax, smin, smax = f.scale
+            out[f.key] = (raw - rmin) * (smax - smin) / (rmax - rmin) + smin
+        elif f.enum is not None:
+            out[f.key] = f.enum.get(raw)
+        else:
+            out[f.key] = raw
+    return out
+
+
+def main() -> None:
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CORPUS
+    corpus = load_corpus(path)
+    for dec, data in corpus:
+        a, b = dec.decode(data), decode_interpreted(dec, data)
+        assert a.keys() == b.keys() and all(abs(a[k] - b[k]) < 1e-9 if isinstance(a[k], float) else a[k] == b[k] for k in a), (dec.name, a, b)
+
+    def run_compiled():
+        for dec, data in corpus:
+            dec.decode(data)
+
+    def run_interpreted():
+        for dec, data in corpus:
+            decode_interpreted(dec, data)
+
+    n = 2000
+    print(f"Korpus: {path.name}, {len(corpus)} Telegramme")
+    for name, fn in (("übersetzt", run_compiled), ("interpretiert", run_interpreted)):
+        t = min(timeit.repeat(fn, number=n, repeat=3))
+        per = t / (n * len(corpus))
+        print(f"{name:14s} {per * 1e6:7.3f} µs/Telegramm  {1 / per:12,.0f} Telegramme/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark: StreamReader-Leseschleife vs. BufferedProtocol (mit/ohne Metrik).
+
+Ein lokaler TCP-Server spielt den Telegramm-Korpus als ESP3-Strom ab. Gemessen
+werden je Empfangspfad
+- Durchsatz (viele Frames am Stück),
+- Latenz vom Schreiben eines einzelnen Frames bis zur Verteilung,
+- Spitzen-Speicher laut tracemalloc während eines eigenen Durchsatzlaufs.
+
+Aufruf: python benchmarks/bench_transport.py [korpus.txt]
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from _corpus import DEFAULT_CORPUS, OPT, load_telegrams
+from _gateway import FakeGateway
+from _load import load
+
+esp3 = load("esp3")
+transport = load("transport")
+metrics = load("metrics")
+
+
+def load_frames(path: Path):
+    return [esp3.build_frame(0x01, data, OPT) for _, data in load_telegrams(path)]
+
+
+class StreamReceiver:
+    """Bisheriger Pfad: read(4096) -> feed() -> packets()."""
+
+    name = "StreamReader + feed"
+
+    def __init__(self, on_packet):
+        self.on_packet = on_packet
+        self.parser = esp3.ESP3StreamParser()
+
+    async def connect(self, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        task = asyncio.create_task(self._loop(reader))
+        return writer.close, task
+
+    async def _loop(self, reader):
+        parser = self.parser
+        on_packet = self.on_packet
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                return
+            parser.feed(chunk)
+            for pkt in parser.packets():
+                on_packet(pkt)
+
+
+class ProtocolReceiver:
+    """Neuer Pfad: recv_into direkt in den Parser, Verteilung im Callback."""
+
+    name = "BufferedProtocol"
+
+    def __init__(self, on_packet):
+        self.on_packet = on_packet
+        self.parser = esp3.ESP3StreamParser()
+
+    async def connect(self, port):
+        loop = asyncio.get_running_loop()
+        _, proto = await loop.create_connection(
+            lambda: transport.ESP3Protocol(self.parser, self.on_packet), "127.0.0.1", port
+        )
+        return proto.close, asyncio.ensure_future(proto.wait_closed())
+
+
+class MeteredProtocolReceiver(ProtocolReceiver):
+    """Wie im Hub: mit Parse-/Dispatch-Histogrammen (`ReceiveMetrics`)."""
+
+    name = "BufferedProtocol+Metrik"
+
+    async def connect(self, port):
+        loop = asyncio.get_running_loop()
+        _, proto = await loop.create_connection(
+            lambda: transport.ESP3Protocol(
+                self.parser, self.on_packet, metrics=metrics.ReceiveMetrics()
+            ),
+            "127.0.0.1",
+            port,
+        )
+        return proto.close, asyncio.ensure_future(proto.wait_closed())
+
+
+async def run_throughput(receiver_cls, stream: bytes, n_frames: int, trace: bool):
+    done = asyncio.get_running_loop().create_future()
+    count = 0
+
+    def on_packet(pkt):
+        nonlocal count
+        count += 1
+        if count == n_frames and not done.done():
+            done.set_result(None)
+
+    port = FakeGateway(stream).port
+    receiver = receiver_cls(on_packet)
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    close, task = await receiver.connect(port)
+    await done
+    elapsed = time.perf_counter() - t0
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    close()
+    await task
+    return elapsed, peak
+
+
+async def run_latency(receiver_cls, frames, rounds: int):
+    loop = asyncio.get_running_loop()
+    got = None
+
+    def on_packet(pkt):
+        if got is not None and not got.done():
+            got.set_result(time.perf_counter())
+
+    conn = loop.create_future()
+
+    async def serve(reader, writer):
+        conn.set_result(writer)
+        await reader.read()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    receiver = receiver_cls(on_packet)
+    close, task = await receiver.connect(port)
+    writer = await conn
+    samples = []
+    for i in range(rounds):
+        got = loop.create_future()
+        t0 = time.perf_counter()
+        writer.write(frames[i % len(frames)])
+        samples.append(await got - t0)
+    close()
+    await task
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return samples
+
+
+async def main() -> None:
+    corpus = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CORPUS
+    frames = load_frames(corpus)
+    reps = max(1, 200_000 // len(frames))
+    stream = b"".join(frames) * reps
+    n_frames = len(frames) * reps
+    print(f"{n_frames} Frames, {len(stream) / 1024:.0f} KiB")
+    for cls in (StreamReceiver, ProtocolReceiver, MeteredProtocolReceiver):
+        elapsed = min([(await run_throughput(cls, stream, n_frames, False))[0] for _ in range(3)])
+        _, peak = await run_throughput(cls, stream, n_frames, True)
+        lat = await run_latency(cls, frames, 2000)
+        print(
+            f"{cls.name:24s} {elapsed / n_frames * 1e6:6.2f} µs/frame  "
+            f"Latenz p50 {statistics.median(lat) * 1e6:6.1f} µs  "
+            f"p99 {statistics.quantiles(lat, n=100)[98] * 1e6:6.1f} µs  "
+            f"Spitze {peak / 1024:7.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""Loop-Lag: Parsen im HA-Loop vs. im Worker-Thread (`parse_worker`).
+
+Startet `--gateways` Gateway-Simulatoren (eigene Prozesse) mit je `--rate`
+Telegrammen/s und verbindet je einen `EnOceanTCPHub` – einmal im
+Standardmodus (Lesen/Parsen im Event-Loop), einmal mit `ParseWorker`.
+Gemessen wird wie in `soak.py` die Verspätung eines 50-ms-Timers im
+Event-Loop (stellvertretend für alle anderen Integrationen), dazu Durchsatz,
+Bündelgröße und Überläufe der Übergabe. Die Modi laufen abwechselnd in
+`--rounds` Runden; am Ende steht je Modus der Median.
+
+Braucht Home Assistant (nur `homeassistant.core`).
+
+Aufruf: python benchmarks/bench_worker.py [--gateways 4] [--rate 5000]
+        [--duration 10] [--devices 1000] [--rounds 3] [--json ergebnis.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import List
+
+from _load import load
+from soak import Simulator, _Bus, _lag_monitor, _pct
+
+
+async def run_mode(args, hub_mod, worker_mod, use_worker: bool) -> dict:
+    loop = asyncio.get_running_loop()
+    sims = [
+        await Simulator.spawn(["--devices", str(args.devices), "--rate", "0"])
+        for _ in range(args.gateways)
+    ]
+    worker = None
+    if use_worker:
+        worker = worker_mod.ParseWorker()
+        worker.start()
+    hass = SimpleNamespace(loop=loop, bus=_Bus())
+    hubs = []
+    received = 0
+
+    def on_packet(pkt) -> None:
+        # Wie eine Entity: Telegramm dekodieren
+        nonlocal received
+        if pkt.telegram is not None:
+            received += 1
+
+    for sim in sims:
+        hub = hub_mod.EnOceanTCPHub(hass, "127.0.0.1", sim.port, worker=worker)
+        hub.async_subscribe(on_packet)
+        await hub.start()
+        hubs.append(hub)
+    while not all(hub.connected for hub in hubs):
+        await asyncio.sleep(0.05)
+
+    lag: List[float] = []
+    monitor = asyncio.create_task(_lag_monitor(lag))
+    try:
+        for sim in sims:
+            await sim.command(f"rate {args.rate}")
+        await asyncio.sleep(1.0)  # Einschwingen
+        del lag[:]
+        rx0, cpu0, t0 = received, time.process_time(), time.monotonic()
+        await asyncio.sleep(args.duration)
+        elapsed = time.monotonic() - t0
+        rx_rate = (received - rx0) / elapsed
+        cpu = (time.process_time() - cpu0) / elapsed * 100
+        workers = [hub.stats["worker"] for hub in hubs]
+    finally:
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+        for hub in hubs:
+            await hub.stop()
+        for sim in sims:
+            await sim.close()
+        if worker is not None:
+            worker.join(5)
+
+    batches = sum(w["batches"] for w in workers if w) if use_worker else 0
+    delivered = sum(w["delivered"] for w in workers if w) if use_worker else 0
+    return {
+        "mode": "worker" if use_worker else "loop",
+        "received_per_s": rx_rate,
+        "loop_lag_p50_ms": (_pct(lag, 50) or 0.0) * 1000,
+        "loop_lag_p99_ms": (_pct(lag, 99) or 0.0) * 1000,
+        "loop_lag_max_ms": max(lag, default=0.0) * 1000,
+        "cpu_percent": cpu,
+        "mean_batch": delivered / batches if batches else None,
+        "overflows": sum(w["overflows"] for w in workers if w) if use_worker else 0,
+    }
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--gateways", type=int, default=4)
+    ap.add_argument("--rate", type=float, default=5000.0, help="Telegramme/s je Gateway")
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--devices", type=int, default=1000)
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--json")
+    args = ap.parse_args()
+
+    try:
+        hub_mod = load("hub")
+    except ImportError as e:
+        raise SystemExit(f"Home Assistant wird benötigt: {e}")
+    worker_mod = load("worker")
+
+    print(
+        f"Python {sys.version.split()[0]}, {args.gateways} Gateways × {args.rate:g} Telegramme/s, "
+        f"{args.duration:g} s je Modus"
+    )
+    print(f"{'Modus':7s} {'empfangen/s':>12s} {'Lag p50 ms':>11s} {'Lag p99 ms':>11s} {'Lag max ms':>11s} {'CPU %':>6s} {'Bündel':>7s} {'Überlauf':>9s}")
+    results = []
+    for rnd in range(args.rounds):
+        # Reihenfolge wechseln, damit Aufwärmeffekte beide Modi treffen
+        for use_worker in ((False, True) if rnd % 2 == 0 else (True, False)):
+            res = await run_mode(args, hub_mod, worker_mod, use_worker)
+            results.append(res)
+            _print_row(res["mode"], res)
+    summary = {}
+    for mode in ("loop", "worker"):
+        rows = [r for r in results if r["mode"] == mode]
+        summary[mode] = {
+            key: statistics.median(r[key] for r in rows)
+            for key in ("received_per_s", "loop_lag_p50_ms", "loop_lag_p99_ms", "loop_lag_max_ms", "cpu_percent")
+        }
+        summary[mode]["mean_batch"] = rows[0]["mean_batch"] and statistics.median(r["mean_batch"] for r in rows)
+        summary[mode]["overflows"] = sum(r["overflows"] for r in rows)
+    print("Median:")
+    for mode, res in summary.items():
+        _print_row(mode, res)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"python": sys.version, "args": vars(args), "results": results, "median": summary},
+                f,
+                indent=2,
+            )
+
+
+def _print_row(mode: str, res: dict) -> None:
+    batch = f"{res['mean_batch']:7.1f}" if res["mean_batch"] else f"{'–':>7s}"
+    print(
+        f"{mode:7s} {res['received_per_s']:12.0f} {res['loop_lag_p50_ms']:11.2f} "
+        f"{res['loop_lag_p99_ms']:11.2f} {res['loop_lag_max_ms']:11.2f} {res['cpu_percent']:6.0f} "
+        f"{batch} {res['overflows']:9d}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,381 @@
+"""ESP3-Gateway-Simulator: ersetzt den TCP-Stick für Last- und Dauertests.
+
+Lauscht auf TCP (wie ein Ser2Net-/TCP-Stick) und schickt jeder verbundenen
+Gegenstelle ERP1-Telegramme vieler virtueller Geräte:
+
+    F6-02-01  Wippschalter (Drücken + Loslassen)
+    D5-00-01  Fensterkontakte
+    A5-02-05  Temperatursensoren
+    A5-04-01  Temperatur/Feuchte
+
+Optional mit Leitungsrauschen (Müll inkl. falscher Sync-Bytes, Bitfehler),
+Frames, die über mehrere Schreibvorgänge verteilt werden, und
+Verbindungsabbrüchen (schließen, hart zurücksetzen oder "stall": Verbindung
+bleibt offen, aber stumm – halboffen). Empfangene Frames werden wie vom TCM
+mit RESPONSE beantwortet, CO_RD_VERSION mit Versionsdaten.
+
+`--rate` zählt Telegramme (ein Tastendruck sind zwei). Gesendet wird mit
+Flusskontrolle: Kommt die Gegenstelle nicht hinterher,
+bremst der Simulator, und die erreichte Rate liegt unter der Zielrate.
+
+Aufruf:
+    python benchmarks/gateway_sim.py [--port 9999] [--devices 1000]
+        [--rate 100] [--garbage 0.01] [--flips 0.001] [--fragment 1:64]
+        [--drop-every 60] [--drop-mode close|reset|stall]
+        [--response-delay 0.005] [--tx-error-rate 0.0] [--duration 0]
+        [--control]     Befehle auf stdin: "rate <n>", "drop", "stats"
+
+Als Bibliothek: `GatewaySimulator(...)`, `await sim.start(port=0)`,
+`sim.port`, `sim.stats`, `await sim.stop()`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from _load import load
+
+esp3 = load("esp3")
+transport = load("transport")
+tx = load("tx")
+
+SEED = 4711
+TICK = 0.01  # Sekunden zwischen zwei Sendeschüben
+DEVICE_MIX = (("F6-02-01", 3), ("D5-00-01", 2), ("A5-02-05", 3), ("A5-04-01", 2))
+DROP_MODES = ("close", "reset", "stall")
+# CO_RD_VERSION-Antwort: App-/API-Version, Chip-ID, Chip-Version, App-Beschreibung
+VERSION_DATA = bytes.fromhex("02070100" "02060300" "0180A0B1" "45020100") + b"GATEWAY SIM".ljust(16, b"\0")
+
+
+class VirtualDevice:
+    __slots__ = ("sender", "eep", "state")
+
+    def __init__(self, sender: int, eep: str, rng: random.Random):
+        self.sender = sender
+        self.eep = eep
+        self.state = rng.random()
+
+    def telegrams(self, rng: random.Random) -> List[bytes]:
+        """DATA (RORG | Payload | Sender | Status) für ein Ereignis."""
+        sid = self.sender.to_bytes(4, "big")
+        if self.eep == "F6-02-01":
+            # Drücken (Energy Bow, T21/NU gesetzt), danach Loslassen
+            button = rng.randrange(4)
+            return [
+                bytes([0xF6, (button << 5) | 0x10]) + sid + b"\x30",
+                b"\xF6\x00" + sid + b"\x20",
+            ]
+        if self.eep == "D5-00-01":
+            self.state = 1.0 - self.state if rng.random() < 0.5 else self.state
+            return [bytes([0xD5, 0x08 | (self.state >= 0.5)]) + sid + b"\x00"]
+        # Messwerte wandern langsam
+        self.state = min(1.0, max(0.0, self.state + rng.uniform(-0.02, 0.02)))
+        raw = int(self.state * 250)
+        if self.eep == "A5-02-05":
+            return [bytes([0xA5, 0x00, 0x00, 255 - raw, 0x08]) + sid + b"\x00"]
+        humidity = rng.randrange(251)
+        return [bytes([0xA5, 0x00, humidity, raw, 0x0A]) + sid + b"\x00"]
+
+
+def make_devices(count: int, rng: random.Random) -> List[VirtualDevice]:
+    eeps = [eep for eep, weight in DEVICE_MIX for _ in range(weight)]
+    ids = rng.sample(range(0x01000000, 0xFF7FFFFF), count)
+    return [VirtualDevice(sid, eeps[i % len(eeps)], rng) for i, sid in enumerate(ids)]
+
+
+def erp1_opt(rng: random.Random) -> bytes:
+    # SubTelNum 1, Broadcast, Pegel -40…-95 dBm, keine Verschlüsselung
+    return b"\x01\xFF\xFF\xFF\xFF" + bytes([rng.randint(40, 95)]) + b"\x00"
+
+
+class _Connection(transport.ESP3Protocol):
+    """Eine Verbindung zum Simulator; Empfang wie beim echten Hub."""
+
+    def __init__(self, sim: "GatewaySimulator"):
+        super().__init__(esp3.ESP3StreamParser(), self._on_packet_received, on_made=sim._on_connection)
+        self.sim = sim
+        self.muted = False
+        self.drop_requested = False
+
+    def _on_packet_received(self, pkt) -> None:
+        if not self.muted:
+            self.sim._on_command(self, pkt)
+
+
+class GatewaySimulator:
+    def __init__(
+        self,
+        devices: int = 1000,
+        rate: float = 100.0,
+        garbage: float = 0.0,
+        flips: float = 0.0,
+        fragment: Optional[Tuple[int, int]] = None,
+        drop_every: float = 0.0,
+        drop_mode: str = "close",
+        response_delay: float = 0.0,
+        tx_error_rate: float = 0.0,
+        seed: int = SEED,
+    ):
+        if drop_mode not in DROP_MODES:
+            raise ValueError(f"drop_mode muss einer von {DROP_MODES} sein")
+        self.rng = random.Random(seed)
+        self.devices = make_devices(devices, self.rng)
+        self.rate = rate  # Telegramme/s je Verbindung
+        self.garbage = garbage
+        self.flips = flips
+        self.fragment = fragment
+        self.drop_every = drop_every  # mittlere Sekunden bis zum Abbruch, 0 = nie
+        self.drop_mode = drop_mode
+        self.response_delay = response_delay
+        self.tx_error_rate = tx_error_rate
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: List[asyncio.Task] = []
+        self._protocols: List = []
+        # Kennzahlen
+        self.connections = 0
+        self.telegrams_sent = 0
+        self.telegrams_skipped = 0
+        self.bytes_sent = 0
+        self.garbage_bytes = 0
+        self.corrupted = 0
+        self.drops = 0
+        self.commands_received = 0
+        self.responses_sent = 0
+        self.started = time.monotonic()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(self._create_protocol, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.started = time.monotonic()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for proto in list(self._protocols):
+            proto.abort()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    def _create_protocol(self) -> "_Connection":
+        return _Connection(self)
+
+    def _on_connection(self, proto) -> None:
+        self.connections += 1
+        self._protocols.append(proto)
+        task = asyncio.create_task(self._serve(proto))
+        self._tasks.append(task)
+        task.add_done_callback(self._tasks.remove)
+
+    # --- Senden -------------------------------------------------------------
+
+    def _batch(self, n: int) -> Tuple[bytes, int]:
+        """Mindestens `n` Telegramme als ein Byte-Block."""
+        rng = self.rng
+        out = bytearray()
+        count = 0
+        while count < n:
+            dev = self.devices[rng.randrange(len(self.devices))]
+            for data in dev.telegrams(rng):
+                if rng.random() < self.garbage:
+                    junk = bytearray(rng.randbytes(rng.randint(1, 12)))
+                    junk[0] = esp3.ESP3_SYNC  # falsches Sync
+                    out += junk
+                    self.garbage_bytes += len(junk)
+                frame = esp3.build_frame(0x01, data, erp1_opt(rng))
+                if rng.random() < self.flips:
+                    frame = bytearray(frame)
+                    i = rng.randrange(esp3.ESP3_HEADER_LEN, len(frame))
+                    frame[i] ^= 1 << rng.randrange(8)
+                    self.corrupted += 1
+                out += frame
+                count += 1
+        self.telegrams_sent += count
+        return bytes(out), count
+
+    async def _write(self, proto, data: bytes) -> None:
+        if not self.fragment:
+            await proto.write(data)
+            return
+        lo, hi = self.fragment
+        pos = 0
+        while pos < len(data):
+            n = self.rng.randint(lo, hi)
+            await proto.write(data[pos:pos + n])
+            # Loop freigeben: jedes Stück geht als eigener send()
+            await asyncio.sleep(0)
+            pos += n
+
+    async def _serve(self, proto) -> None:
+        loop = asyncio.get_running_loop()
+        drop_at = loop.time() + self.rng.expovariate(1 / self.drop_every) if self.drop_every else None
+        due = 0.0
+        last = loop.time()
+        try:
+            while not proto.is_closing:
+                await asyncio.sleep(TICK)
+                now = loop.time()
+                if proto.drop_requested or (drop_at is not None and now >= drop_at):
+                    await self._drop(proto)
+                    return
+                due += (now - last) * self.rate
+                last = now
+                if due > self.rate:
+                    # Gegenstelle kommt nicht hinterher: höchstens 1 s nachholen
+                    self.telegrams_skipped += int(due - self.rate)
+                    due = self.rate
+                n = int(due)
+                if n:
+                    data, count = self._batch(n)
+                    due -= count
+                    await self._write(proto, data)
+                    self.bytes_sent += len(data)
+        except ConnectionError:
+            pass
+        finally:
+            if proto in self._protocols:
+                self._protocols.remove(proto)
+
+    def drop_all(self) -> None:
+        """Alle Verbindungen sofort trennen (gemäß `drop_mode`)."""
+        for proto in self._protocols:
+            proto.drop_requested = True
+
+    async def _drop(self, proto) -> None:
+        self.drops += 1
+        if self.drop_mode == "close":
+            proto.close()
+        elif self.drop_mode == "reset":
+            proto.abort()
+        else:
+            # Halboffen: nichts mehr senden, nichts mehr beantworten
+            proto.muted = True
+            await proto.wait_closed()
+
+    # --- Empfang ------------------------------------------------------------
+
+    def _on_command(self, proto, pkt) -> None:
+        self.commands_received += 1
+        if pkt.packet_type == tx.PACKET_TYPE_COMMON_COMMAND and pkt.data[:1] == bytes([tx.CO_RD_VERSION]):
+            reply = esp3.build_frame(tx.PACKET_TYPE_RESPONSE, bytes([tx.RET_OK]) + VERSION_DATA)
+        else:
+            code = tx.RET_ERROR if self.rng.random() < self.tx_error_rate else tx.RET_OK
+            reply = esp3.build_frame(tx.PACKET_TYPE_RESPONSE, bytes([code]))
+        if self.response_delay:
+            asyncio.get_running_loop().call_later(self.response_delay, self._reply, proto, reply)
+        else:
+            self._reply(proto, reply)
+
+    def _reply(self, proto, reply: bytes) -> None:
+        if not proto.is_closing:
+            proto.transport.write(reply)
+            self.responses_sent += 1
+
+    @property
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "connections": self.connections,
+            "active": len(self._protocols),
+            "telegrams_sent": self.telegrams_sent,
+            "telegrams_per_s": self.telegrams_sent / elapsed if elapsed else 0.0,
+            "telegrams_skipped": self.telegrams_skipped,
+            "bytes_sent": self.bytes_sent,
+            "garbage_bytes": self.garbage_bytes,
+            "corrupted": self.corrupted,
+            "drops": self.drops,
+            "commands_received": self.commands_received,
+            "responses_sent": self.responses_sent,
+        }
+
+
+def _fragment(text: str) -> Tuple[int, int]:
+    lo, _, hi = text.partition(":")
+    return int(lo), int(hi or lo)
+
+
+def _print_stats(sim: GatewaySimulator) -> None:
+    print(json.dumps(sim.stats), flush=True)
+
+
+def _read_control(sim: GatewaySimulator, loop: asyncio.AbstractEventLoop, done: asyncio.Event) -> None:
+    """Steuerbefehle von stdin (eigener Thread, blockierendes Lesen)."""
+    for line in sys.stdin:
+        cmd, _, arg = line.strip().partition(" ")
+        if cmd == "rate":
+            loop.call_soon_threadsafe(setattr, sim, "rate", float(arg))
+        elif cmd == "drop":
+            loop.call_soon_threadsafe(sim.drop_all)
+        elif cmd == "stats":
+            loop.call_soon_threadsafe(_print_stats, sim)
+    loop.call_soon_threadsafe(done.set)
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9999)
+    ap.add_argument("--devices", type=int, default=1000)
+    ap.add_argument("--rate", type=float, default=100.0, help="Telegramme/s je Verbindung")
+    ap.add_argument("--garbage", type=float, default=0.0, help="Anteil Frames mit Müll davor")
+    ap.add_argument("--flips", type=float, default=0.0, help="Anteil Frames mit Bitfehler")
+    ap.add_argument("--fragment", type=_fragment, help="Stückgröße MIN:MAX je Schreibvorgang")
+    ap.add_argument("--drop-every", type=float, default=0.0, help="mittlere Sekunden bis zum Abbruch")
+    ap.add_argument("--drop-mode", choices=DROP_MODES, default="close")
+    ap.add_argument("--response-delay", type=float, default=0.0)
+    ap.add_argument("--tx-error-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--duration", type=float, default=0.0, help="Sekunden, 0 = unbegrenzt")
+    ap.add_argument("--interval", type=float, default=5.0, help="Statistik alle … Sekunden, 0 = nie")
+    ap.add_argument("--control", action="store_true", help="Befehle von stdin lesen, Ende bei EOF")
+    args = ap.parse_args()
+
+    sim = GatewaySimulator(
+        devices=args.devices,
+        rate=args.rate,
+        garbage=args.garbage,
+        flips=args.flips,
+        fragment=args.fragment,
+        drop_every=args.drop_every,
+        drop_mode=args.drop_mode,
+        response_delay=args.response_delay,
+        tx_error_rate=args.tx_error_rate,
+        seed=args.seed,
+    )
+    await sim.start(args.host, args.port)
+    # Erste Zeile: Port (wichtig bei --port 0)
+    print(json.dumps({"port": sim.port, "devices": args.devices, "rate": args.rate}), flush=True)
+    loop = asyncio.get_running_loop()
+    done = asyncio.Event()
+    if args.control:
+        threading.Thread(target=_read_control, args=(sim, loop, done), daemon=True).start()
+    end = loop.time() + args.duration if args.duration else None
+    try:
+        while not done.is_set() and (end is None or loop.time() < end):
+            waits = [t for t in (args.interval, end - loop.time() if end else 0) if t > 0]
+            try:
+                await asyncio.wait_for(done.wait(), min(waits) if waits else None)
+            except asyncio.TimeoutError:
+                if args.interval:
+                    _print_stats(sim)
+    finally:
+        await sim.stop()
+        _print_stats(sim)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
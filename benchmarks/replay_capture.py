@@ -0,0 +1,65 @@
+"""Spielt einen Mitschnitt (`*.eocap`) offline durch Parser und Dekoder.
+
+Aufruf:
+    python benchmarks/replay_capture.py capture.eocap [capture.eocap.1 …]
+        [--speed 1.0]   Echtzeit (bzw. Faktor); ohne Angabe Maximaltempo
+        [--dump]        jedes Paket ausgeben
+        [--delivered-only]  live verworfene Frames (Senderfilter,
+                        Duplikate) auslassen
+
+Rotierte Dateien bitte älteste zuerst angeben.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from _load import load
+
+capture = load("capture")
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("files", nargs="+")
+    ap.add_argument("--speed", type=float, default=None)
+    ap.add_argument("--dump", action="store_true")
+    ap.add_argument("--delivered-only", action="store_true")
+    args = ap.parse_args()
+
+    senders: Counter = Counter()
+    decoded = 0
+    dropped = 0
+
+    def on_packet(pkt):
+        nonlocal decoded
+        if pkt.telegram is not None:
+            decoded += 1
+        if pkt.sender_id:
+            senders[pkt.sender_id] += 1
+        if args.dump:
+            print(pkt.as_dict())
+
+    def records():
+        nonlocal dropped
+        for path in args.files:
+            for rec in capture.read_capture(path):
+                if rec.dropped and rec.direction == capture.DIR_RX:
+                    dropped += 1
+                yield rec
+
+    t0 = time.perf_counter()
+    count = await capture.replay(
+        records(), on_packet, speed=args.speed, dropped=not args.delivered_only
+    )
+    elapsed = time.perf_counter() - t0
+    print(f"{count} Pakete in {elapsed:.3f} s ({count / elapsed if elapsed else 0:.0f}/s), {decoded} dekodiert")
+    print(f"  davon live verworfen: {dropped}{' (ausgelassen)' if args.delivered_only else ''}")
+    for sender, n in senders.most_common(10):
+        print(f"  {sender}  {n}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,276 @@
+"""Last- und Dauertest: echter `EnOceanTCPHub` gegen den Gateway-Simulator.
+
+Der Simulator läuft als eigener Prozess (eigener GIL), der Hub hier mit
+Manager, Duplikatfilter, Event-Erzeugung (auf einen zählenden Bus statt des
+HA-Event-Bus) und einem Abo, das jedes Telegramm dekodiert. Die Rate wird
+stufenweise erhöht; je Stufe:
+
+    Ziel/s      vorgegebene Telegramme/s
+    gesendet/s  was der Simulator tatsächlich loswurde (TCP-Flusskontrolle)
+    empfangen/s was der Hub verteilt hat
+    Lag p99     Verspätung eines 50-ms-Timers im Event-Loop
+    CPU         Prozessorzeit des Hub-Prozesses je Sekunde
+    TX p50/p99  Umlaufzeit Frame -> RESPONSE über die Sende-Warteschlange
+
+Die erste Stufe ohne Verbindungsabbruch mit weniger als 95 % Durchsatz oder
+Lag p99 über 100 ms gilt als Sättigung. Mit `--drop-every` trennt der Simulator die Verbindung
+zufällig; am Ende stehen Reconnects und deren Dauer.
+
+Braucht Home Assistant (nur `homeassistant.core`).
+
+Aufruf: python benchmarks/soak.py [--rates 500,1000,2000,5000,10000]
+        [--step 10] [--devices 5000] [--garbage 0.01] [--flips 0.001]
+        [--fragment 1:64] [--drop-every 30] [--drop-mode close|reset|stall]
+        [--probe-interval 5] [--event-batch 0] [--json ergebnis.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional
+
+from _load import load
+
+SIMULATOR = Path(__file__).resolve().parent / "gateway_sim.py"
+SATURATION_RATIO = 0.95
+SATURATION_LAG = 0.1  # Sekunden
+LAG_TICK = 0.05
+TX_INTERVAL = 0.1
+# Wippschalter-Telegramm mit Broadcast-Ziel, wie es der Dienst `send_frame` sendet
+TX_DATA = bytes.fromhex("F630FFFFFFFF30")
+TX_OPT = bytes.fromhex("03FFFFFFFFFF00")
+
+
+def _pct(values: List[float], q: int) -> Optional[float]:
+    if len(values) < 2:
+        return values[0] if values else None
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+class _Bus:
+    def __init__(self):
+        self.events = 0
+
+    def async_fire(self, event_type, data=None) -> None:
+        self.events += 1
+
+
+class Simulator:
+    """Simulator-Prozess mit Steuerung über stdin/stdout."""
+
+    def __init__(self, proc: asyncio.subprocess.Process, port: int):
+        self.proc = proc
+        self.port = port
+
+    @classmethod
+    async def spawn(cls, args: List[str]) -> "Simulator":
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, str(SIMULATOR), "--port", "0", "--control", "--interval", "0", *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        hello = json.loads(await proc.stdout.readline())
+        return cls(proc, hello["port"])
+
+    async def command(self, line: str) -> None:
+        self.proc.stdin.write(line.encode() + b"\n")
+        await self.proc.stdin.drain()
+
+    async def stats(self) -> dict:
+        await self.command("stats")
+        return json.loads(await self.proc.stdout.readline())
+
+    async def close(self) -> None:
+        self.proc.stdin.close()
+        await self.proc.wait()
+
+
+async def _lag_monitor(samples: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(LAG_TICK)
+        samples.append(loop.time() - t0 - LAG_TICK)
+
+
+async def _tx_load(hub, esp3, samples: List[float], errors: List[str]) -> None:
+    frame = esp3.build_frame(0x01, TX_DATA, TX_OPT)
+    while True:
+        await asyncio.sleep(TX_INTERVAL)
+        if not hub.connected:
+            continue
+        t0 = time.perf_counter()
+        try:
+            await hub.send_frame(frame, 1)
+        except Exception as e:  # noqa
+            errors.append(type(e).__name__)
+        else:
+            samples.append(time.perf_counter() - t0)
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rates", default="500,1000,2000,5000,10000,20000")
+    ap.add_argument("--step", type=float, default=10.0, help="Sekunden je Stufe")
+    ap.add_argument("--devices", type=int, default=5000)
+    ap.add_argument("--garbage", type=float, default=0.0)
+    ap.add_argument("--flips", type=float, default=0.0)
+    ap.add_argument("--fragment")
+    ap.add_argument("--drop-every", type=float, default=0.0)
+    ap.add_argument("--drop-mode", default="close")
+    ap.add_argument("--reconnect-interval", type=float, default=1.0)
+    ap.add_argument("--reconnect-max", type=float, default=30.0)
+    ap.add_argument("--probe-interval", type=float, default=0.0)
+    ap.add_argument("--no-events", action="store_true", help="keine enocean_tcp_frame-Events erzeugen")
+    ap.add_argument(
+        "--event-batch", type=float, help="gebündelte enocean_tcp_frames-Events, Fenster in ms (0 = je Lesevorgang)"
+    )
+    ap.add_argument("--json")
+    args = ap.parse_args()
+
+    try:
+        hub_mod = load("hub")
+    except ImportError as e:
+        raise SystemExit(f"Home Assistant wird benötigt: {e}")
+    esp3 = load("esp3")
+
+    sim_args = ["--devices", str(args.devices), "--rate", "0"]
+    for opt in ("garbage", "flips", "drop_every"):
+        sim_args += [f"--{opt.replace('_', '-')}", str(getattr(args, opt))]
+    sim_args += ["--drop-mode", args.drop_mode]
+    if args.fragment:
+        sim_args += ["--fragment", args.fragment]
+    sim = await Simulator.spawn(sim_args)
+
+    loop = asyncio.get_running_loop()
+    bus = _Bus()
+    hass = SimpleNamespace(loop=loop, bus=bus)
+    hub = hub_mod.EnOceanTCPHub(
+        hass,
+        "127.0.0.1",
+        sim.port,
+        reconnect_interval=args.reconnect_interval,
+        reconnect_max=args.reconnect_max,
+        fire_events=not args.no_events,
+        event_batch=args.event_batch / 1000 if args.event_batch is not None else None,
+        probe_interval=args.probe_interval,
+    )
+    received = 0
+    decoded = 0
+    reconnects: List[float] = []
+
+    def on_gateway(pkt) -> None:
+        nonlocal received
+        if pkt.packet_type == 0x01:
+            received += 1
+
+    def on_packet(pkt) -> None:
+        # Wie eine Entity: Telegramm dekodieren
+        nonlocal decoded
+        if pkt.telegram is not None:
+            decoded += 1
+
+    hub.async_subscribe_gateway(on_gateway)
+    hub.async_subscribe(on_packet)
+    await hub.start()
+    while not hub.connected:
+        await asyncio.sleep(0.05)
+
+    lag: List[float] = []
+    tx_rtt: List[float] = []
+    tx_errors: List[str] = []
+    tasks = [
+        asyncio.create_task(_lag_monitor(lag)),
+        asyncio.create_task(_tx_load(hub, esp3, tx_rtt, tx_errors)),
+    ]
+    print(f"Python {sys.version.split()[0]}, {args.devices} Geräte, {args.step:g} s je Stufe")
+    print(f"{'Ziel/s':>8s} {'gesendet/s':>11s} {'empfangen/s':>12s} {'Lag p99 ms':>11s} {'CPU %':>6s} {'TX p50 ms':>10s} {'TX p99 ms':>10s}")
+    results = []
+    saturation = None
+    seen_connects = hub.connects
+    try:
+        for rate in (float(r) for r in args.rates.split(",")):
+            await sim.command(f"rate {rate}")
+            await asyncio.sleep(1.0)  # Einschwingen
+            before = await sim.stats()
+            rx0, cpu0, t0 = received, time.process_time(), time.monotonic()
+            del lag[:], tx_rtt[:]
+            end = t0 + args.step
+            while time.monotonic() < end:
+                await asyncio.sleep(0.2)
+                if hub.connects != seen_connects:
+                    seen_connects = hub.connects
+                    if hub.reconnect_latency is not None:
+                        reconnects.append(hub.reconnect_latency)
+            after = await sim.stats()
+            elapsed = time.monotonic() - t0
+            sent_rate = (after["telegrams_sent"] - before["telegrams_sent"]) / elapsed
+            rx_rate = (received - rx0) / elapsed
+            cpu = (time.process_time() - cpu0) / elapsed * 100
+            lag_p99 = _pct(lag, 99) or 0.0
+            row = {
+                "target_per_s": rate,
+                "sent_per_s": sent_rate,
+                "received_per_s": rx_rate,
+                "loop_lag_p99_ms": lag_p99 * 1000,
+                "cpu_percent": cpu,
+                "tx_p50_ms": (_pct(tx_rtt, 50) or 0.0) * 1000,
+                "tx_p99_ms": (_pct(tx_rtt, 99) or 0.0) * 1000,
+                "drops": after["drops"] - before["drops"],
+            }
+            results.append(row)
+            print(
+                f"{rate:8.0f} {sent_rate:11.0f} {rx_rate:12.0f} {row['loop_lag_p99_ms']:11.1f} "
+                f"{cpu:6.0f} {row['tx_p50_ms']:10.2f} {row['tx_p99_ms']:10.2f}"
+                + (f"  ({row['drops']}× getrennt)" if row["drops"] else "")
+            )
+            # Stufen mit Verbindungsabbruch sagen nichts über den Durchsatz
+            if saturation is None and not row["drops"] and (
+                rx_rate < SATURATION_RATIO * rate or lag_p99 > SATURATION_LAG
+            ):
+                saturation = rate
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        stats = hub.stats
+        await hub.stop()
+        final = await sim.stats()
+        await sim.close()
+
+    print(f"Sättigung: {'ab ' + format(saturation, 'g') + ' Telegramme/s' if saturation else 'nicht erreicht'}")
+    print(
+        f"Verbindungen: {stats['connects']}, Abbrüche: {stats['disconnects']}, "
+        f"Probe-Fehler: {stats['probe_failures']}, Simulator-Abbrüche: {final['drops']}"
+    )
+    if reconnects:
+        print(
+            f"Reconnect-Dauer: min {min(reconnects):.2f} s, Median {statistics.median(reconnects):.2f} s, "
+            f"max {max(reconnects):.2f} s"
+        )
+    print(
+        f"Parser: {stats['frames']} Frames, {stats['header_crc_errors']} Header-/"
+        f"{stats['data_crc_errors']} Daten-CRC-Fehler; dekodiert {decoded}, Events {bus.events}; "
+        f"TX-Fehler {len(tx_errors)}"
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "python": sys.version,
+                "devices": args.devices,
+                "steps": results,
+                "saturation": saturation,
+                "reconnects": reconnects,
+                "hub": stats,
+                "simulator": final,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
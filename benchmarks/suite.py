@@ -0,0 +1,330 @@
+"""Benchmark-Suite: Parser, Dekodierung und Verteilung je Workload.
+
+Workloads (fester Seed, reproduzierbar):
+    clean        saubere Frames, ein Frame je Chunk
+    noisy        Müll und falsche Sync-Bytes zwischen Frames, Bitfehler
+    fragmented   sauberer Strom in 1–64-Byte-Stücken
+    senders      5000 verschiedene Sender-IDs
+    neighbors    wie `senders`, Senderfilter erlaubt nur 1 % davon (die
+                 übrigen sind Nachbargeräte und werden im Parser verworfen)
+    capture      Mitschnitt(e) aus `--capture` (optional)
+
+Stufen (jeweils inkl. der vorherigen Parser-Arbeit):
+    parse        feed() + packets()
+    decode       + ESP3Packet.telegram
+    as_dict      + ESP3Packet.as_dict()
+    eep          + EEP-Dekoder des Senders
+    dispatch     + EnOceanTCPManager.handle_packet mit einem Abo je Sender
+                 (nur wenn Home Assistant installiert ist)
+    tcp          Ende-zu-Ende über das Fake-Gateway und ESP3Protocol
+
+Ausgabe je Zeile: Frames/s (bester von 3 Läufen, auch verworfene Frames), Bytes/Frame (Spitze
+laut tracemalloc je Frame, gemittelt) und p50/p99 der Verarbeitungszeit je
+Frame; bei `tcp` die Zeit vom Senden eines Einzelframes bis zur Verteilung. `--json datei` speichert die Werte zum Vergleich zweier Stände.
+
+Aufruf: python benchmarks/suite.py [--quick] [--workload …] [--stage …]
+        [--capture datei.eocap …] [--json ergebnis.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Set
+
+from _corpus import fragment, frames_for, load_telegrams, noisy
+from _gateway import FakeGateway
+from _load import load
+
+esp3 = load("esp3")
+allowlist = load("allowlist")
+eep = load("eep")
+capture = load("capture")
+transport = load("transport")
+
+SEED = 4711
+REPEATS = 3
+ALLOC_SAMPLE = 2000  # Chunks mit tracemalloc (langsam)
+OWN_SHARE = 0.01  # Anteil eigener Geräte im Workload "neighbors"
+
+
+def build_workloads(n: int, captures: List[str]) -> Dict[str, dict]:
+    telegrams = load_telegrams()
+    out = {}
+    rng = random.Random(SEED)
+    frames, eeps = frames_for(telegrams, n, rng)
+    # "frames": saubere Einzelframes derselben Geräte für die TCP-Latenz
+    out["clean"] = {"chunks": frames, "frames": frames, "eeps": eeps}
+    out["noisy"] = {
+        "chunks": [noisy(frames[i:i + 64], rng) for i in range(0, n, 64)],
+        "frames": frames,
+        "eeps": eeps,
+    }
+    out["fragmented"] = {"chunks": fragment(b"".join(frames), rng), "frames": frames, "eeps": eeps}
+    frames, eeps = frames_for(telegrams, n, rng, senders=5000)
+    out["senders"] = {"chunks": frames, "frames": frames, "eeps": eeps}
+    own = set(rng.sample(sorted(eeps), int(len(eeps) * OWN_SHARE)))
+    out["neighbors"] = {
+        "chunks": frames,
+        "frames": frames,
+        "eeps": {s: e for s, e in eeps.items() if s in own},
+        "allowed": own,
+    }
+    if captures:
+        frames = [r.frame for p in captures for r in capture.read_capture(p) if r.direction == capture.DIR_RX]
+        out["capture"] = {"chunks": frames, "frames": frames, "eeps": {}}
+    return out
+
+
+def _manager_dispatch(eeps: Dict[int, str]) -> Optional[Callable]:
+    """Verteilung wie im Betrieb – braucht Home Assistant (nur `core`)."""
+    try:
+        manager_mod = load("manager")
+    except ImportError:
+        return None
+
+    class _Hub:
+        fire_events = False
+        dedup_window = 0.0
+        connected = True
+
+    class _Hass:
+        bus = None
+
+    mgr = manager_mod.EnOceanTCPManager(_Hass())
+    hub = _Hub()
+    mgr.register(hub)
+    sink = []
+    for sender in eeps:
+        mgr.async_subscribe(sink.append, sender, None)
+        del sink[:]
+    handle = mgr.handle_packet
+
+    def dispatch(pkt):
+        handle(hub, pkt)
+        sink.clear()
+
+    return dispatch
+
+
+def make_stage(name: str, eeps: Dict[int, str]) -> Optional[Callable]:
+    if name == "parse":
+        return lambda pkt: None
+    if name == "decode":
+        return lambda pkt: pkt.telegram
+    if name == "as_dict":
+        return lambda pkt: pkt.as_dict()
+    if name == "eep":
+        decoders = {s: eep.get_decoder(*eep.parse_eep(e)) for s, e in eeps.items()}
+
+        def decode(pkt):
+            dec = decoders.get(pkt.sender)
+            if dec is not None:
+                dec.decode(pkt.data)
+
+        return decode
+    if name == "dispatch":
+        return _manager_dispatch(eeps)
+    raise ValueError(name)
+
+
+def new_parser(allowed: Optional[Set[int]] = None):
+    if allowed is None:
+        return esp3.ESP3StreamParser()
+    return esp3.ESP3StreamParser(sender_filter=allowlist.SenderFilter(allowed))
+
+
+def _parsed(parser) -> int:
+    """Gültige Frames inkl. der vom Senderfilter verworfenen."""
+    return parser.frames + parser.frames_filtered
+
+
+def run_chunks(chunks: List[bytes], on_packet: Callable, allowed=None) -> int:
+    parser = new_parser(allowed)
+    for chunk in chunks:
+        parser.feed(chunk)
+        for pkt in parser.packets():
+            on_packet(pkt)
+    return _parsed(parser)
+
+
+def measure_throughput(chunks, on_packet, allowed=None) -> tuple:
+    best = None
+    frames = 0
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        frames = run_chunks(chunks, on_packet, allowed)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return frames, frames / best if best else 0.0
+
+
+def measure_latency(chunks, on_packet, allowed=None) -> List[float]:
+    """Zeit je Chunk, geteilt durch die darin fertig gewordenen Frames."""
+    parser = new_parser(allowed)
+    clock = time.perf_counter_ns
+    samples = []
+    for chunk in chunks:
+        before = _parsed(parser)
+        t0 = clock()
+        parser.feed(chunk)
+        for pkt in parser.packets():
+            on_packet(pkt)
+        dt = clock() - t0
+        n = _parsed(parser) - before
+        if n:
+            samples.append(dt / n)
+    return samples
+
+
+def measure_alloc(chunks, on_packet, allowed=None) -> float:
+    """Speicherspitze je Frame (Frame für Frame gemessen), inkl. anteiligem feed()."""
+    parser = new_parser(allowed)
+    sample = chunks[:ALLOC_SAMPLE]
+    get = tracemalloc.get_traced_memory
+    reset = tracemalloc.reset_peak
+    total = 0
+    tracemalloc.start()
+    try:
+        for chunk in sample:
+            base, _ = get()
+            reset()
+            parser.feed(chunk)
+            it = parser.packets()
+            while True:
+                pkt = next(it, None)
+                if pkt is None:
+                    break
+                on_packet(pkt)
+                _, peak = get()
+                total += peak - base
+                base, _ = get()
+                reset()
+    finally:
+        tracemalloc.stop()
+    frames = _parsed(parser)
+    return total / frames if frames else 0.0
+
+
+async def measure_tcp(chunks: List[bytes], singles: List[bytes]) -> dict:
+    stream = b"".join(chunks)
+    loop = asyncio.get_running_loop()
+    # Erwartete Frameanzahl vorab offline bestimmen (Müll/Bitfehler fallen weg)
+    expected = run_chunks(chunks, lambda pkt: None)
+    best = None
+    for _ in range(REPEATS):
+        done = loop.create_future()
+        count = 0
+
+        def on_packet(pkt):
+            nonlocal count
+            count += 1
+            if count == expected and not done.done():
+                done.set_result(None)
+
+        gw = FakeGateway(stream)
+        t0 = time.perf_counter()
+        _, proto = await loop.create_connection(
+            lambda: transport.ESP3Protocol(esp3.ESP3StreamParser(), on_packet), "127.0.0.1", gw.port
+        )
+        try:
+            await asyncio.wait_for(done, 60)
+        except asyncio.TimeoutError:
+            raise SystemExit(f"tcp: nur {count} von {expected} Frames angekommen")
+        elapsed = time.perf_counter() - t0
+        proto.close()
+        await proto.wait_closed()
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Latenz: einzelne Frames vom Gateway bis zur Verteilung
+    got: Optional[asyncio.Future] = None
+
+    def on_single(pkt):
+        if got is not None and not got.done():
+            got.set_result(time.perf_counter_ns())
+
+    gw = FakeGateway()
+    _, proto = await loop.create_connection(
+        lambda: transport.ESP3Protocol(esp3.ESP3StreamParser(), on_single), "127.0.0.1", gw.port
+    )
+    samples = []
+    for frame in singles[:1000]:
+        got = loop.create_future()
+        t0 = time.perf_counter_ns()
+        await loop.run_in_executor(None, gw.send, frame)
+        samples.append(await got - t0)
+    proto.close()
+    await proto.wait_closed()
+    return {"frames": expected, "fps": expected / best, "latency": samples, "alloc": None}
+
+
+def fmt_row(workload, stage, res) -> str:
+    lat = res["latency"]
+    p50 = statistics.median(lat) / 1000 if lat else float("nan")
+    p99 = statistics.quantiles(lat, n=100)[98] / 1000 if len(lat) > 1 else float("nan")
+    alloc = f"{res['alloc']:8.0f}" if res["alloc"] is not None else "       –"
+    return f"{workload:11s} {stage:9s} {res['frames']:8d} {res['fps']:12,.0f} {alloc} {p50:9.2f} {p99:9.2f}"
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quick", action="store_true", help="kleiner Korpus für schnelle Läufe")
+    ap.add_argument("--workload", action="append")
+    ap.add_argument("--stage", action="append")
+    ap.add_argument("--capture", action="append", default=[])
+    ap.add_argument("--json")
+    args = ap.parse_args()
+
+    n = 5_000 if args.quick else 50_000
+    workloads = build_workloads(n, args.capture)
+    stages = args.stage or ["parse", "decode", "as_dict", "eep", "dispatch", "tcp"]
+    print(f"Python {platform.python_version()} ({platform.machine()}), Seed {SEED}, {n} Frames je Workload")
+    print(f"{'Workload':11s} {'Stufe':9s} {'Frames':>8s} {'Frames/s':>12s} {'B/Frame':>8s} {'p50 µs':>9s} {'p99 µs':>9s}")
+    results = []
+    for wname, wl in workloads.items():
+        if args.workload and wname not in args.workload:
+            continue
+        chunks = wl["chunks"]
+        for stage in stages:
+            if stage == "tcp":
+                if wl.get("allowed"):
+                    # Der TCP-Pfad läuft über einen Parser ohne Senderfilter
+                    continue
+                res = await measure_tcp(chunks, wl["frames"])
+            else:
+                fn = make_stage(stage, wl["eeps"])
+                if fn is None:
+                    print(f"{wname:11s} {stage:9s} übersprungen (Home Assistant nicht installiert)")
+                    continue
+                allowed = wl.get("allowed")
+                frames, fps = measure_throughput(chunks, fn, allowed)
+                res = {
+                    "frames": frames,
+                    "fps": fps,
+                    "latency": measure_latency(chunks, fn, allowed),
+                    "alloc": measure_alloc(chunks, fn, allowed),
+                }
+            print(fmt_row(wname, stage, res))
+            lat = res["latency"]
+            results.append({
+                "workload": wname,
+                "stage": stage,
+                "frames": res["frames"],
+                "frames_per_s": res["fps"],
+                "bytes_per_frame": res["alloc"],
+                "p50_us": statistics.median(lat) / 1000 if lat else None,
+                "p99_us": statistics.quantiles(lat, n=100)[98] / 1000 if len(lat) > 1 else None,
+            })
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version, "seed": SEED, "frames": n, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
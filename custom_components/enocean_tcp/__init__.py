@@ -1,36 +1,154 @@
 from __future__ import annotations
+from functools import partial
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_RECONNECT, DEFAULT_RECONNECT, SERVICE_SEND_RAW
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_MODE,
+    MODE_SERVER,
+    DEFAULT_MODE,
+    CONF_RECONNECT,
+    DEFAULT_RECONNECT_S,
+    CONF_RECONNECT_MAX,
+    DEFAULT_RECONNECT_MAX_S,
+    CONF_KEEPALIVE,
+    DEFAULT_KEEPALIVE_S,
+    CONF_PROBE_INTERVAL,
+    DEFAULT_PROBE_INTERVAL_S,
+    CONF_FIRE_EVENTS,
+    DEFAULT_FIRE_EVENTS,
+    CONF_TX_PACING,
+    DEFAULT_TX_PACING_MS,
+    CONF_TX_RESPONSE_TIMEOUT,
+    DEFAULT_TX_RESPONSE_TIMEOUT_S,
+    CONF_DEDUP_WINDOW,
+    DEFAULT_DEDUP_WINDOW_MS,
+    CONF_CAPTURE,
+    DEFAULT_CAPTURE,
+    CONF_SENDER_FILTER,
+    DEFAULT_SENDER_FILTER,
+    CONF_PARSE_WORKER,
+    DEFAULT_PARSE_WORKER,
+    CONF_EVENT_BATCH,
+    DEFAULT_EVENT_BATCH,
+    CONF_EVENT_WINDOW,
+    DEFAULT_EVENT_WINDOW_MS,
+    CONF_LINK_HISTORY,
+    DEFAULT_LINK_HISTORY,
+    SERVICE_SEND_RAW,
+    SERVICE_SEND_BATCH,
+    SERVICE_SET_PULSE,
+    SERVICE_LEARN,
+    SERVICE_ALLOW_SENDER,
+    SERVICE_ADD_ACTUATOR,
+    SIGNAL_ADD_ACTUATOR,
+    ms_to_s,
+)
+from .actuator import get_actuator
+from .allowlist import SenderFilter
+from .capture import CaptureWriter
+from .devices import DATA_DEVICES, DeviceStore
+from .esp3 import encode_raw_hex, encode_triplet
 from .hub import EnOceanTCPHub
+from .manager import EnOceanTCPManager, async_get_manager
+from .server import EnOceanTCPServer
+from .tx import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+from .worker import ParseWorker
 
-PLATFORMS: list[str] = ["sensor", "binary_sensor"]
+DATA_WORKER = f"{DOMAIN}_worker"
+
+PRIORITIES = {"high": PRIORITY_HIGH, "normal": PRIORITY_NORMAL, "low": PRIORITY_LOW}
+
+PLATFORMS: list[str] = ["sensor", "binary_sensor", "switch", "light"]
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
-    reconnect = entry.options.get(CONF_RECONNECT, DEFAULT_RECONNECT)
+    reconnect = entry.options.get(CONF_RECONNECT, DEFAULT_RECONNECT_S)
+    fire_events = entry.options.get(CONF_FIRE_EVENTS, DEFAULT_FIRE_EVENTS)
+    event_batch = None
+    if entry.options.get(CONF_EVENT_BATCH, DEFAULT_EVENT_BATCH):
+        event_batch = ms_to_s(entry.options.get(CONF_EVENT_WINDOW, DEFAULT_EVENT_WINDOW_MS))
+    # Optionen in ms einmal hier in Sekunden umrechnen
+    tx_pacing = ms_to_s(entry.options.get(CONF_TX_PACING, DEFAULT_TX_PACING_MS))
+    tx_timeout = entry.options.get(CONF_TX_RESPONSE_TIMEOUT, DEFAULT_TX_RESPONSE_TIMEOUT_S)
+    dedup_window = ms_to_s(entry.options.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW_MS))
+    keepalive = entry.options.get(CONF_KEEPALIVE, DEFAULT_KEEPALIVE_S)
+    probe_interval = entry.options.get(CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL_S)
+    link_history = entry.options.get(CONF_LINK_HISTORY, DEFAULT_LINK_HISTORY)
+    # Bekannte Geräte vor den Plattformen laden, damit sie sofort da sind
+    devices = DeviceStore(hass, entry.entry_id)
+    await devices.async_load()
+    hass.data.setdefault(DATA_DEVICES, {})[entry.entry_id] = devices
+    capture = None
+    if entry.options.get(CONF_CAPTURE, DEFAULT_CAPTURE):
+        # Datei wird im Schreib-Thread geöffnet, nicht im Event-Loop
+        capture = CaptureWriter(hass.config.path(DOMAIN, f"capture_{entry.entry_id}.eocap"))
+        capture.start()
+    worker = None
+    if entry.options.get(CONF_PARSE_WORKER, DEFAULT_PARSE_WORKER):
+        worker = _async_get_worker(hass)
+    sender_filter = None
+    if entry.options.get(CONF_SENDER_FILTER, DEFAULT_SENDER_FILTER):
+        # Folgt den erlaubten Sendern der Gerätetabelle; Angelerntes wird dort gespeichert
+        on_learn = devices.async_allow
+        if worker is not None:
+            # Der Parser läuft dann im Worker-Thread
+            on_learn = partial(hass.loop.call_soon_threadsafe, devices.async_allow)
+        sender_filter = SenderFilter(devices.allowed, on_learn)
+        entry.async_on_unload(devices.async_listen_allowed(sender_filter.set_allowed))
 
-    hub = EnOceanTCPHub(hass, host, port, reconnect)
+    manager = async_get_manager(hass)
+    if entry.data.get(CONF_MODE, DEFAULT_MODE) == MODE_SERVER:
+        # Gateways verbinden sich selbst; jede Verbindung meldet sich beim Manager an
+        hub = EnOceanTCPServer(
+            hass,
+            host,
+            port,
+            fire_events,
+            event_batch=event_batch,
+            tx_pacing=tx_pacing,
+            tx_response_timeout=tx_timeout,
+            dedup_window=dedup_window,
+            manager=manager,
+            name=entry.title,
+            keepalive=keepalive,
+            probe_interval=probe_interval,
+            capture=capture,
+            sender_filter=sender_filter,
+            worker=worker,
+            link_history=link_history,
+        )
+    else:
+        hub = EnOceanTCPHub(
+            hass,
+            host,
+            port,
+            reconnect,
+            fire_events,
+            event_batch=event_batch,
+            tx_pacing=tx_pacing,
+            tx_response_timeout=tx_timeout,
+            dedup_window=dedup_window,
+            manager=manager,
+            name=entry.title,
+            reconnect_max=entry.options.get(CONF_RECONNECT_MAX, DEFAULT_RECONNECT_MAX_S),
+            keepalive=keepalive,
+            probe_interval=probe_interval,
+            capture=capture,
+            sender_filter=sender_filter,
+            worker=worker,
+            link_history=link_history,
+        )
+        manager.register(hub)
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = hub
-
-    # Service: RAW (vollständiger ESP3‑Frame) ODER Triplet (pt/data/opt)
-    async def _send_raw(call: ServiceCall):
-        raw_hex = call.data.get("raw")
-        pt = call.data.get("pt")
-        data_hex = call.data.get("data")
-        opt_hex = call.data.get("opt", "")
-        if raw_hex:
-            await hub.send_raw_hex(raw_hex)
-        elif pt is not None and data_hex is not None:
-            await hub.send_triplet(int(pt), str(data_hex), str(opt_hex))
-        else:
-            raise vol.Invalid("Entweder 'raw' ODER ('pt' und 'data') angeben")
-
-    hass.services.async_register(DOMAIN, SERVICE_SEND_RAW, _send_raw)
+    _async_register_services(hass, manager)
 
     try:
         # Plattformen zuerst laden; wenn das klappt, starten wir den Hub
@@ -39,25 +157,221 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     except Exception as e:
         # Sicherstellen, dass kein Task hängen bleibt
         try:
-            await hub.stop()
+            await _async_stop_hub(hass, hub)
         finally:
-            hass.services.async_remove(DOMAIN, SERVICE_SEND_RAW)
-            hass.data[DOMAIN].pop(entry.entry_id, None)
+            _async_release_hub(hass, entry, hub)
         # Für HA signalisieren, dass das Setup fehlgeschlagen ist
         raise ConfigEntryNotReady(str(e))
 
+    # Geänderte Optionen greifen erst nach einem Neuladen
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
-    hub: EnOceanTCPHub = hass.data[DOMAIN][entry.entry_id]
-    await hub.stop()
+    hub: EnOceanTCPHub | EnOceanTCPServer = hass.data[DOMAIN][entry.entry_id]
+    await _async_stop_hub(hass, hub)
+    await hass.data[DATA_DEVICES][entry.entry_id].async_save()
 
-    hass.services.async_remove(DOMAIN, SERVICE_SEND_RAW)
-    hass.data[DOMAIN].pop(entry.entry_id, None)
+    _async_release_hub(hass, entry, hub)
     return unload_ok
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry):
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
\ No newline at end of file
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await DeviceStore(hass, entry.entry_id).async_remove()
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+@callback
+def _async_get_worker(hass: HomeAssistant) -> ParseWorker:
+    """Gemeinsamer Empfangs-Thread aller Einträge mit Worker-Option."""
+    worker = hass.data.get(DATA_WORKER)
+    if worker is None:
+        worker = hass.data[DATA_WORKER] = ParseWorker()
+        worker.start()
+    return worker
+
+@callback
+def _async_register_services(hass: HomeAssistant, manager: EnOceanTCPManager) -> None:
+    # Services sind global – einmal für alle Gateways registrieren und über
+    # den Manager zum passenden Gateway leiten
+    if hass.services.has_service(DOMAIN, SERVICE_SEND_RAW):
+        return
+
+    def _target(call: ServiceCall):
+        target = call.data.get("target")
+        return int(str(target), 16) if target else None
+
+    # Service: RAW (vollständiger ESP3‑Frame) ODER Triplet (pt/data/opt)
+    async def _send_raw(call: ServiceCall):
+        raw_hex = call.data.get("raw")
+        pt = call.data.get("pt")
+        data_hex = call.data.get("data")
+        opt_hex = call.data.get("opt", "")
+        priority = PRIORITIES[call.data.get("priority", "normal")]
+        if raw_hex:
+            frame = encode_raw_hex(raw_hex)
+        elif pt is not None and data_hex is not None:
+            frame = encode_triplet(int(pt), str(data_hex), str(opt_hex))
+        else:
+            raise vol.Invalid("Entweder 'raw' ODER ('pt' und 'data') angeben")
+        await manager.send_frame(frame, priority, call.data.get("gateway"), _target(call))
+
+    hass.services.async_register(DOMAIN, SERVICE_SEND_RAW, _send_raw)
+
+    # Service: viele Frames (RAW‑Strings oder pt/data/opt‑Objekte) in einem Aufruf
+    async def _send_batch(call: ServiceCall) -> ServiceResponse:
+        priority = PRIORITIES[call.data.get("priority", "normal")]
+        results = await manager.send_batch(
+            call.data["frames"], priority, call.data.get("gateway"), _target(call)
+        )
+        if call.return_response:
+            return {"results": results}
+        return None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEND_BATCH,
+        _send_batch,
+        schema=vol.Schema(
+            {
+                vol.Required("frames"): vol.All(list, vol.Length(min=1)),
+                vol.Optional("priority", default="normal"): vol.In(PRIORITIES),
+                vol.Optional("gateway"): str,
+                vol.Optional("target"): str,
+            }
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    # Service: Pulsdauer eines Tasters (ohne Loslassen-Telegramm)
+    async def _set_pulse(call: ServiceCall):
+        sender = int(call.data["sender_id"], 16)
+        for devices in hass.data[DATA_DEVICES].values():
+            if devices.async_set(sender, pulse=call.data["duration"]):
+                return
+        raise vol.Invalid(f"Unbekanntes Gerät {call.data['sender_id']}")
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_PULSE,
+        _set_pulse,
+        schema=vol.Schema(
+            {
+                vol.Required("sender_id"): vol.Match(r"^[0-9A-Fa-f]{8}$"),
+                vol.Required("duration"): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=3600)),
+            }
+        ),
+    )
+
+    # Service: Lernmodus des Senderfilters (alle Einträge mit aktivem Filter)
+    async def _learn(call: ServiceCall):
+        filters = [
+            hub.sender_filter for hub in hass.data[DOMAIN].values() if hub.sender_filter is not None
+        ]
+        if not filters:
+            raise vol.Invalid("Senderfilter ist bei keinem Eintrag aktiviert")
+        for sender_filter in filters:
+            sender_filter.start_learning(call.data["duration"])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LEARN,
+        _learn,
+        schema=vol.Schema(
+            {
+                vol.Optional("duration", default=60): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+            }
+        ),
+    )
+
+    # Service: Sender von Hand erlauben oder sperren
+    async def _allow_sender(call: ServiceCall):
+        sender = int(call.data["sender_id"], 16)
+        for devices in hass.data[DATA_DEVICES].values():
+            devices.async_allow(sender, call.data["allow"])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ALLOW_SENDER,
+        _allow_sender,
+        schema=vol.Schema(
+            {
+                vol.Required("sender_id"): vol.Match(r"^[0-9A-Fa-f]{8}$"),
+                vol.Optional("allow", default=True): bool,
+            }
+        ),
+    )
+
+    # Service: Aktor anlegen (Eintrag in der Gerätetabelle, Entity per Signal)
+    async def _add_actuator(call: ServiceCall):
+        stores = hass.data[DATA_DEVICES]
+        entry_id = call.data.get("config_entry")
+        if entry_id is None and len(stores) == 1:
+            entry_id = next(iter(stores))
+        if entry_id not in stores:
+            raise vol.Invalid("config_entry angeben (mehrere oder unbekannter Eintrag)")
+        devices = stores[entry_id]
+        device = int(call.data["device_id"], 16)
+        eep = call.data["eep"].upper()
+        platform = call.data["platform"]
+        channel = call.data["channel"]
+        source = int(call.data["sender_id"], 16)
+        try:
+            get_actuator(eep, device, channel, source)
+        except ValueError as e:
+            raise vol.Invalid(str(e))
+        rec = devices.devices.get(device)
+        if rec is None or rec.get("platform") != platform or rec.get("eep") != eep:
+            rec = devices.async_add(device, platform, eep)
+        devices.async_set(
+            device,
+            channels=sorted({*rec.get("channels", ()), channel}),
+            source=source,
+            name=call.data.get("name") or rec.get("name"),
+        )
+        async_dispatcher_send(hass, SIGNAL_ADD_ACTUATOR.format(entry_id), device)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ADD_ACTUATOR,
+        _add_actuator,
+        schema=vol.Schema(
+            {
+                vol.Required("device_id"): vol.Match(r"^[0-9A-Fa-f]{8}$"),
+                vol.Required("eep"): str,
+                vol.Optional("platform", default="switch"): vol.In(["switch", "light"]),
+                vol.Optional("channel", default=0): vol.All(int, vol.Range(min=0, max=29)),
+                vol.Optional("sender_id", default="00000000"): vol.Match(r"^[0-9A-Fa-f]{8}$"),
+                vol.Optional("name"): str,
+                vol.Optional("config_entry"): str,
+            }
+        ),
+    )
+
+async def _async_stop_hub(hass: HomeAssistant, hub: EnOceanTCPHub | EnOceanTCPServer) -> None:
+    await hub.stop()
+    if hub.capture is not None:
+        # Restliche Datensätze schreiben; join() blockiert – daher im Executor
+        await hass.async_add_executor_job(hub.capture.close)
+
+@callback
+def _async_release_hub(
+    hass: HomeAssistant, entry: ConfigEntry, hub: EnOceanTCPHub | EnOceanTCPServer
+) -> None:
+    manager = hub.manager
+    manager.unregister(hub)
+    manager.release_claims(entry.entry_id)
+    hass.data[DOMAIN].pop(entry.entry_id, None)
+    hass.data[DATA_DEVICES].pop(entry.entry_id, None)
+    if not hass.data[DOMAIN]:
+        worker = hass.data.pop(DATA_WORKER, None)
+        if worker is not None:
+            worker.stop()
+        hass.services.async_remove(DOMAIN, SERVICE_SEND_RAW)
+        hass.services.async_remove(DOMAIN, SERVICE_SEND_BATCH)
+        hass.services.async_remove(DOMAIN, SERVICE_SET_PULSE)
+        hass.services.async_remove(DOMAIN, SERVICE_LEARN)
+        hass.services.async_remove(DOMAIN, SERVICE_ALLOW_SENDER)
+        hass.services.async_remove(DOMAIN, SERVICE_ADD_ACTUATOR)
@@ -0,0 +1,150 @@
+"""Sendefertige Frames und Statusauswertung für Aktoren (ohne HA-Abhängigkeit).
+
+Je Aktor-Kanal werden beim Anlegen `FrameTemplate`s gebaut; Ein/Aus liegen
+danach als fertige Frames vor, ein Dimmwert patcht nur die variablen Bytes.
+
+Unterstützt:
+    D2-01-xx  Electronic Switch/Dimmer (VLD): CMD 0x1 "Actuator Set Output",
+              Status über CMD 0x4 "Actuator Status Response"
+    A5-38-08  Central Command (4BS): CMD 0x1 Schalten, CMD 0x2 Dimmen;
+              Rückmeldung als RPS (0x70 an / 0x50 aus) oder A5-38-08-Dimmwert
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from .decode import RORG_4BS, RORG_RPS, RORG_VLD
+from .eep import EEPKey, parse_eep
+from .esp3 import FrameTemplate
+
+PACKET_TYPE_RADIO_ERP1 = 0x01
+BROADCAST = 0xFFFFFFFF
+STATUS_TX = 0x00
+# Sender 0: der TCM setzt seine Chip-ID ein
+DEFAULT_SOURCE = 0
+
+D2_01_SET_OUTPUT = 0x01
+D2_01_STATUS = 0x04
+D2_01_ALL_CHANNELS = 0x1E
+D2_01_INVALID = 0x7F
+
+A5_38_SWITCH = 0x01
+A5_38_DIM = 0x02
+A5_38_DATA = 0x08  # DB0.3: LRN-Bit gesetzt = Datentelegramm
+A5_38_RELATIVE = 0x04  # DB0.2: Dimmwert 0..100
+
+RPS_CONFIRM_ON = 0x70
+RPS_CONFIRM_OFF = 0x50
+
+
+def _opt(destination: int) -> bytes:
+    # SubTelNum | Ziel-ID | dBm (FF beim Senden) | Security
+    return b"\x03" + destination.to_bytes(4, "big") + b"\xff\x00"
+
+
+def _tail(source: int) -> bytes:
+    return source.to_bytes(4, "big") + bytes((STATUS_TX,))
+
+
+class Actuator(ABC):
+    """Ein Kanal eines Aktors: fertige Frames und Auswertung der Rückmeldung."""
+
+    def __init__(self, eep: EEPKey, device: int, channel: int = 0, source: int = DEFAULT_SOURCE):
+        self.eep = eep
+        self.device = device
+        self.channel = channel
+        self.source = source
+
+    @abstractmethod
+    def switch(self, on: bool) -> bytes:
+        """Fertiger Frame zum Ein-/Ausschalten."""
+
+    def dim(self, value: int) -> bytes:
+        """Frame für Ausgangswert `value` (0..100)."""
+        return self.switch(value > 0)
+
+    @abstractmethod
+    def status(self, data) -> Optional[int]:
+        """Ausgangswert 0..100 aus einer Rückmeldung, sonst `None`."""
+
+
+class D201Actuator(Actuator):
+    def __init__(self, eep: EEPKey, device: int, channel: int = 0, source: int = DEFAULT_SOURCE):
+        super().__init__(eep, device, channel, source)
+        # RORG | CMD | Dim-Modus (0 = sofort) + Kanal | Ausgangswert | Sender | Status
+        data = bytes((RORG_VLD, D2_01_SET_OUTPUT, channel & 0x1F, 0)) + _tail(source)
+        self._set = FrameTemplate(PACKET_TYPE_RADIO_ERP1, data, _opt(device), 3, 4)
+        self._on = self._set.render(b"\x64")
+        self._off = self._set.render(b"\x00")
+
+    def switch(self, on: bool) -> bytes:
+        return self._on if on else self._off
+
+    def dim(self, value: int) -> bytes:
+        return self._set.render((max(0, min(100, value)),))
+
+    def status(self, data) -> Optional[int]:
+        if len(data) < 9 or data[0] != RORG_VLD or data[1] & 0x0F != D2_01_STATUS:
+            return None
+        if data[2] & 0x1F not in (self.channel, D2_01_ALL_CHANNELS):
+            return None
+        value = data[3] & 0x7F
+        return None if value == D2_01_INVALID else min(value, 100)
+
+
+class A538Actuator(Actuator):
+    def __init__(self, eep: EEPKey, device: int, channel: int = 0, source: int = DEFAULT_SOURCE):
+        super().__init__(eep, device, channel, source)
+        # Angelernt wird auf unsere Sender-ID, gesendet als Broadcast
+        opt = _opt(BROADCAST)
+        switch = FrameTemplate(
+            PACKET_TYPE_RADIO_ERP1,
+            bytes((RORG_4BS, A5_38_SWITCH, 0, 0, A5_38_DATA)) + _tail(source),
+            opt,
+            4,
+            5,
+        )
+        self._on = switch.render((A5_38_DATA | 1,))
+        self._off = switch.render((A5_38_DATA,))
+        # DB2 Dimmwert | DB1 Rampe (s) | DB0 Flags + Ein/Aus
+        self._dim = FrameTemplate(
+            PACKET_TYPE_RADIO_ERP1,
+            bytes((RORG_4BS, A5_38_DIM, 0, 0, A5_38_DATA | A5_38_RELATIVE)) + _tail(source),
+            opt,
+            2,
+            5,
+        )
+
+    def switch(self, on: bool) -> bytes:
+        return self._on if on else self._off
+
+    def dim(self, value: int) -> bytes:
+        value = max(0, min(100, value))
+        return self._dim.render((value, 0, A5_38_DATA | A5_38_RELATIVE | (1 if value else 0)))
+
+    def status(self, data) -> Optional[int]:
+        if len(data) < 7:
+            return None
+        rorg = data[0]
+        if rorg == RORG_RPS:
+            if data[1] == RPS_CONFIRM_ON:
+                return 100
+            if data[1] == RPS_CONFIRM_OFF:
+                return 0
+            return None
+        if rorg == RORG_4BS and len(data) >= 10 and data[1] == A5_38_DIM and data[4] & A5_38_DATA:
+            return min(data[2], 100) if data[4] & 0x01 else 0
+        return None
+
+
+def get_actuator(
+    eep: str, device: int, channel: int = 0, source: int = DEFAULT_SOURCE
+) -> Actuator:
+    """Aktor für ein EEP ('D2-01-12', 'A5-38-08'); ValueError, wenn nicht unterstützt."""
+    key = parse_eep(eep)
+    if key[:2] == (RORG_VLD, 0x01):
+        return D201Actuator(key, device, channel, source)
+    if key == (RORG_4BS, 0x38, 0x08):
+        return A538Actuator(key, device, channel, source)
+    raise ValueError(f"Aktor-EEP nicht unterstützt: {eep}")
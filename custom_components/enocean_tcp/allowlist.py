@@ -0,0 +1,89 @@
+"""Senderfilter mit Lernmodus (ohne HA-Abhängigkeit).
+
+Der Parser prüft bei ERP1-Frames die Sender-ID direkt auf den Rohbytes
+gegen `allowed` (ein `frozenset` von `int`), bevor ein `ESP3Packet` entsteht. Fremde
+Telegramme – in Mehrfamilienhäusern der Großteil – kosten so nur die
+CRC-Prüfung und einen Set-Zugriff; Dekodieren, Events und Entities hängen
+nur noch an den eigenen Geräten.
+
+Im Lernmodus (`start_learning`) werden Sender bis zum Ablauf aufgenommen,
+wenn sie ein Teach-in senden: UTE (D4) immer, 4BS/1BS mit gelöschtem
+LRN-Bit. RPS (F6) hat kein Teach-in – dort zählt jedes Telegramm, also der
+Tastendruck während des Lernmodus.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, FrozenSet, Iterable, Optional
+
+from .decode import RORG_1BS, RORG_4BS, RORG_RPS, RORG_UTE
+
+LRN_BIT = 0x08  # DB0.3: 0 = Teach-in
+
+
+def is_teach_in(buf, d0: int, d1: int) -> bool:
+    """Teach-in-Telegramm? `buf[d0:d1]` sind die ERP1-Daten (RORG … Status)."""
+    rorg = buf[d0]
+    if rorg == RORG_UTE or rorg == RORG_RPS:
+        return True
+    if rorg == RORG_4BS:
+        return d1 - d0 == 10 and not buf[d0 + 4] & LRN_BIT
+    if rorg == RORG_1BS:
+        return d1 - d0 == 7 and not buf[d0 + 1] & LRN_BIT
+    return False
+
+
+class SenderFilter:
+    """Erlaubte Sender eines Config-Eintrags (von allen seinen Gateways geteilt).
+
+    `admit` läuft im Parser, mit Worker also im Worker-Thread. Es ersetzt nur
+    das eigene `allowed` (Referenzzuweisung) und meldet den Sender über
+    `on_learn`; der Aufrufer sorgt dafür, dass das auf dem Event-Loop
+    ankommt. Geteilter Zustand wird dort nicht angefasst.
+    """
+
+    def __init__(
+        self,
+        allowed: Iterable[int] = (),
+        on_learn: Optional[Callable[[int], None]] = None,
+    ):
+        # Nie an Ort und Stelle ändern, sondern ersetzen (Copy-on-Write): der
+        # Parser arbeitet je Durchlauf auf dem Set, das er vorgefunden hat
+        self.allowed: FrozenSet[int] = frozenset(allowed)
+        self._on_learn = on_learn
+        self.learn_until = 0.0  # time.monotonic(), 0 = Lernmodus aus
+        self.learned = 0
+
+    @property
+    def learning(self) -> bool:
+        return self.learn_until > time.monotonic()
+
+    def set_allowed(self, allowed: Iterable[int]) -> None:
+        """Erlaubte Sender ersetzen (z. B. nach Änderung der Gerätetabelle)."""
+        self.allowed = frozenset(allowed)
+
+    def start_learning(self, duration: float) -> None:
+        """Lernmodus für `duration` Sekunden; 0 beendet ihn."""
+        self.learn_until = time.monotonic() + duration if duration > 0 else 0.0
+
+    def admit(self, buf, d0: int, d1: int, sender: int) -> bool:
+        """Unbekannten Sender prüfen; True, wenn er im Lernmodus aufgenommen wurde."""
+        until = self.learn_until
+        # learn_until schreibt nur start_learning (Event-Loop)
+        if until and time.monotonic() < until and is_teach_in(buf, d0, d1):
+            # Sofort wirksam für die folgenden Frames; dauerhaft erst,
+            # wenn on_learn die Gerätetabelle aktualisiert hat
+            self.allowed = self.allowed | {sender}
+            self.learned += 1
+            if self._on_learn is not None:
+                self._on_learn(sender)
+            return True
+        return False
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "allowed": len(self.allowed),
+            "learning": self.learning,
+            "learned": self.learned,
+        }
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from abc import abstractmethod
+
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
@@ -7,31 +9,49 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, EVENT_FRAME
+from .const import DOMAIN
+from .decode import RORG_1BS, RORG_RPS, RPSTelegram
+from .devices import DeviceStore, async_get_devices
+from .eep import decode_eep, parse_eep
+from .entity import CoalescedWriteMixin
+from .esp3 import ESP3Packet
+from .hub import EnOceanTCPHub
+from .timerwheel import TimerWheel
 
-AUTO_OFF = 1.0  # Sekunden (nur für Taster)
+AUTO_OFF = 1.0  # Sekunden ohne Loslassen-Telegramm (Vorgabe je Taster)
 
-# --- Fenstergriff-Mapping: DB0 (zweites Byte nach 0xF6)
-WINDOW_CODES = {0xF0: "closed", 0xE0: "open", 0xD0: "tilt"}
+PLATFORM = "binary_sensor"
+EEP_WINDOW = "F6-10-00"
+EEP_ROCKER = "F6-02-01"
+EEP_CONTACT = "D5-00-01"
+_CONTACT_KEY = parse_eep(EEP_CONTACT)
 
 
 class _BaseBS(BinarySensorEntity):
+    """Binärsensor eines Senders; Unterklassen werten Telegramme in `_apply` aus."""
+
     _attr_should_poll = False
+    _rorg = RORG_RPS
 
     def __init__(
         self,
         hass: HomeAssistant,
         entry: ConfigEntry,
-        sender_id: str,
+        hub: EnOceanTCPHub,
+        devices: DeviceStore,
+        sender: int,
         name: str,
         model: str,
         device_class: BinarySensorDeviceClass | None,
     ) -> None:
+        sender_id = f"{sender:08X}"
         self.hass = hass
         self.entry = entry
+        self._hub = hub
+        self._devices = devices
+        self._sender = sender
         self._sender_id = sender_id
         self._attr_name = name
         self._attr_unique_id = (
@@ -47,81 +67,243 @@ class _BaseBS(BinarySensorEntity):
         if device_class is not None:
             self._attr_device_class = device_class
 
+    async def async_added_to_hass(self) -> None:
+        # Nur Telegramme dieses Senders (eigener RORG) vom Hub beziehen
+        self.async_on_remove(
+            self._hub.async_subscribe(self.handle_packet, self._sender, self._rorg)
+        )
+
+    @abstractmethod
+    def _apply(self, pkt: ESP3Packet) -> bool:
+        """Telegramm auswerten; True, wenn geschrieben werden soll."""
+
+    @callback
+    def handle_packet(self, pkt: ESP3Packet) -> None:
+        if self._apply(pkt):
+            self._seen(pkt)
+            self._write_state()
+
+    def _write_state(self) -> None:
+        self.async_write_ha_state()
+
+    def restore(self, state) -> None:
+        """Zustand aus der Gerätetabelle übernehmen (vor dem Hinzufügen)."""
+
+    @property
+    def stored_state(self):
+        return None
+
+    def _seen(self, pkt: ESP3Packet) -> None:
+        self._devices.async_seen(self._sender, pkt.dbm, self.stored_state)
+
+
+class _StateBS(CoalescedWriteMixin, _BaseBS):
+    """Zustand als Text (Fenstergriff, Kontakt), geschrieben nur bei Änderung."""
+
+    # Griffe/Kontakte/Repeater senden denselben Zustand oft mehrfach
+    _write_on_change_only = True
+    _attr_is_on: bool | None = None
+    _state_txt: str | None = None
+
+    @staticmethod
+    @abstractmethod
+    def _is_on(state: str) -> bool:
+        """Zustandstext -> an/aus."""
+
+    def restore(self, state) -> None:
+        if state is not None:
+            self._state_txt = state
+            self._attr_is_on = self._is_on(state)
+
+    @property
+    def stored_state(self):
+        return self._state_txt
+
+    def _write_key(self):
+        return self._state_txt
+
+    def _write_state(self) -> None:
+        self.async_write_coalesced()
 
-class EnOceanTCPWindowHandleBS(_BaseBS):
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, sender_id: str) -> None:
+
+class EnOceanTCPWindowHandleBS(_StateBS):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        hub: EnOceanTCPHub,
+        devices: DeviceStore,
+        sender: int,
+    ) -> None:
         super().__init__(
             hass,
             entry,
-            sender_id,
-            f"Window {sender_id}",
+            hub,
+            devices,
+            sender,
+            f"Window {sender:08X}",
             "F6-10 Window Handle",
             BinarySensorDeviceClass.WINDOW,
         )
-        self._attr_is_on: bool | None = None  # on==open/tilt
-        self._state_txt: str | None = None
+
+    @staticmethod
+    def _is_on(state: str) -> bool:
+        return state != "closed"  # open/tilt => ON
 
     @property
     def extra_state_attributes(self) -> dict:
         return {"state": self._state_txt}
 
-    @callback
-    def handle_frame(self, d: dict) -> None:
-        if d.get("sender_id") != self._sender_id:
-            return
-        data_hex: str = d.get("data_hex", "")
-        if not data_hex or len(data_hex) < 4:  # mindestens F6 + DB0
-            return
-        b = bytes.fromhex(data_hex)
-        if b[0] != 0xF6:
-            return
-        db0 = b[1]
-        if db0 not in WINDOW_CODES:
-            return
-        state = WINDOW_CODES[db0]
-        self._state_txt = state
-        self._attr_is_on = state != "closed"  # open/tilt => ON
-        self.async_write_ha_state()
+    def _apply(self, pkt: ESP3Packet) -> bool:
+        tg = pkt.telegram
+        state = tg.window if tg is not None else None
+        if state is None:
+            return False
+        self.restore(state)
+        return True
+
+
+class EnOceanTCPContactBS(_StateBS):
+    """D5-00-01: Kontakt über die EEP-Registry, an = offen."""
+
+    _rorg = RORG_1BS
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        hub: EnOceanTCPHub,
+        devices: DeviceStore,
+        sender: int,
+    ) -> None:
+        super().__init__(
+            hass,
+            entry,
+            hub,
+            devices,
+            sender,
+            f"Contact {sender:08X}",
+            "D5-00-01 Single Input Contact",
+            BinarySensorDeviceClass.OPENING,
+        )
+
+    @staticmethod
+    def _is_on(state: str) -> bool:
+        return state == "open"
+
+    def _apply(self, pkt: ESP3Packet) -> bool:
+        tg = pkt.telegram
+        if tg is None or tg.teach_in:
+            return False
+        values = decode_eep(_CONTACT_KEY, pkt.data)
+        if values is None:
+            return False
+        self.restore(values["contact"])
+        return True
 
 
 class EnOceanTCPPressBS(_BaseBS):
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, sender_id: str) -> None:
+    """F6-02: an beim Drücken (Energy Bow = 1), aus beim Loslassen.
+
+    Kommt kein Loslassen-Telegramm, schaltet das Timer-Rad der Plattform
+    nach der Pulsdauer des Geräts ab (`pulse` in der Gerätetabelle).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        hub: EnOceanTCPHub,
+        devices: DeviceStore,
+        sender: int,
+        wheel: TimerWheel,
+    ) -> None:
         super().__init__(
             hass,
             entry,
-            sender_id,
-            f"Button {sender_id}",
+            hub,
+            devices,
+            sender,
+            f"Button {sender:08X}",
             "ERP1 (F6)",
             BinarySensorDeviceClass.OCCUPANCY,
         )
         self._attr_is_on = False
         self._presses = 0
-        self._auto_off_handle = None
+        self._button: int | None = None
+        self._wheel = wheel
+        # Einmal binden statt je Druck eine neue Closure
+        self._auto_off_cb = self._auto_off
 
     @property
     def extra_state_attributes(self) -> dict:
-        return {"presses": self._presses}
+        return {"presses": self._presses, "button": self._button}
 
-    def _schedule_auto_off(self) -> None:
-        if self._auto_off_handle:
-            self._auto_off_handle()
+    def _pulse(self) -> float:
+        rec = self._devices.devices.get(self._sender)
+        return (rec.get("pulse") if rec else None) or AUTO_OFF
 
-        def _off(_now) -> None:
-            self._attr_is_on = False
-            self.async_write_ha_state()
+    @callback
+    def _auto_off(self) -> None:
+        self._attr_is_on = False
+        self.async_write_ha_state()
+
+    def _arm(self) -> None:
+        if self._attr_is_on:
+            self._wheel.schedule(self._sender, self._pulse(), self._auto_off_cb)
+        else:
+            self._wheel.cancel(self._sender)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._arm()
 
-        self._auto_off_handle = async_call_later(self.hass, AUTO_OFF, _off)
+    async def async_will_remove_from_hass(self) -> None:
+        self._wheel.cancel(self._sender)
+        await super().async_will_remove_from_hass()
+
+    def _apply(self, pkt: ESP3Packet) -> bool:
+        """Drücken/Loslassen auswerten; True, wenn sich der Zustand ändert."""
+        tg = pkt.telegram
+        if tg is None:
+            return False
+        if tg.energy_bow:
+            if self._attr_is_on:
+                # Wiederholung desselben Drucks (gehalten, Repeater)
+                return False
+            self._presses += 1
+            self._button = tg.rocker1
+            self._attr_is_on = True
+            return True
+        if not self._attr_is_on:
+            return False
+        self._attr_is_on = False
+        return True
+
+    def restore(self, state) -> None:
+        # Tastendruck ist ein Ereignis: nur den Zähler übernehmen
+        if isinstance(state, int):
+            self._presses = state
+
+    @property
+    def stored_state(self):
+        return self._presses
 
     @callback
-    def handle_frame(self, d: dict) -> None:
-        if d.get("sender_id") != self._sender_id:
-            return
-        if d.get("rorg") not in (0xF6, 246):
-            return
-        self._presses += 1
-        self._attr_is_on = True
-        self.async_write_ha_state()
-        self._schedule_auto_off()
+    def handle_packet(self, pkt: ESP3Packet) -> None:
+        changed = self._apply(pkt)
+        self._seen(pkt)
+        # Auch ein wiederholtes Drücken verlängert den Puls
+        self._arm()
+        if changed:
+            self.async_write_ha_state()
+
+
+def _detect_eep(tg: RPSTelegram) -> str:
+    """Fenstergriff nur bei passendem Code *und* NU=0 (keine Wippen-Nachricht)."""
+    if tg.window is not None and not tg.nu:
+        return EEP_WINDOW
+    return EEP_ROCKER
 
 
 class _DynamicPlatform:
@@ -129,49 +311,90 @@ class _DynamicPlatform:
         self,
         hass: HomeAssistant,
         entry: ConfigEntry,
+        hub: EnOceanTCPHub,
+        devices: DeviceStore,
         async_add_entities: AddEntitiesCallback,
     ) -> None:
         self.hass = hass
         self.entry = entry
+        self.hub = hub
+        self.devices = devices
         self.async_add_entities = async_add_entities
-        self._entities: dict[str, _BaseBS] = {}
-        self._unsub = None
+        self._entities: dict[int, _BaseBS] = {}
+        self._unsubs: list = []
+        # Ein Timer für die Abschaltung aller Taster
+        self.wheel = TimerWheel(hass.loop)
+
+    def _create(self, eep: str, sender: int) -> _BaseBS:
+        if eep == EEP_WINDOW:
+            return EnOceanTCPWindowHandleBS(self.hass, self.entry, self.hub, self.devices, sender)
+        if eep == EEP_CONTACT:
+            return EnOceanTCPContactBS(self.hass, self.entry, self.hub, self.devices, sender)
+        return EnOceanTCPPressBS(self.hass, self.entry, self.hub, self.devices, sender, self.wheel)
+
+    @callback
+    def restore(self) -> None:
+        """Alle bekannten Geräte in einem Aufruf wieder anlegen."""
+        entities = []
+        for sender, rec in self.devices.known(PLATFORM):
+            eep = rec.get("eep")
+            if eep not in (EEP_WINDOW, EEP_ROCKER, EEP_CONTACT):
+                continue
+            if not self.hub.manager.claim(PLATFORM, sender, self.entry.entry_id):
+                continue
+            ent = self._create(eep, sender)
+            ent.restore(rec.get("state"))
+            self._entities[sender] = ent
+            entities.append(ent)
+        if entities:
+            self.async_add_entities(entities)
 
     async def start(self) -> None:
-        self._unsub = self.hass.bus.async_listen(EVENT_FRAME, self._handle_event)
+        # Nur für die Erkennung neuer Sender; bekannte Entities haben eigene Abos
+        self._unsubs = [
+            self.hub.async_subscribe(self._handle_packet, rorg=rorg) for rorg in (RORG_RPS, RORG_1BS)
+        ]
 
     async def stop(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        self.wheel.clear()
 
     @callback
-    def _handle_event(self, event) -> None:
-        d = event.data
-        sender = d.get("sender_id")
-        if not sender or d.get("rorg") not in (0xF6, 246):
+    def _handle_packet(self, pkt: ESP3Packet) -> None:
+        sender = pkt.sender
+        if sender is None or sender in self._entities:
+            return
+        rec = self.devices.devices.get(sender)
+        if rec is not None and rec.get("platform") != PLATFORM:
+            # z. B. RPS-Rückmeldung eines Aktors
+            return
+        # Bei mehreren Gateways legt nur ein Eintrag die Entity an
+        if not self.hub.manager.claim(PLATFORM, sender, self.entry.entry_id):
             return
 
-        data_hex: str = d.get("data_hex", "")
-        db0 = bytes.fromhex(data_hex)[1] if data_hex and len(data_hex) >= 4 else None
-
-        ent = self._entities.get(sender)
-        if not ent:
-            # Fenstergriff oder Button anlegen
-            if db0 in WINDOW_CODES:
-                ent = EnOceanTCPWindowHandleBS(self.hass, self.entry, sender)
-            else:
-                ent = EnOceanTCPPressBS(self.hass, self.entry, sender)
-            self._entities[sender] = ent
-            self.async_add_entities([ent])
+        tg = pkt.telegram
+        if tg is None:
+            return
 
-        # Event an Entity weiterreichen
-        if hasattr(ent, "handle_frame"):
-            ent.handle_frame(d)
+        # Typ einmal erkennen und merken; erstes Telegramm als Startzustand
+        eep = EEP_CONTACT if pkt.rorg == RORG_1BS else _detect_eep(tg)
+        ent = self._create(eep, sender)
+        ent._apply(pkt)
+        self.devices.async_add(sender, PLATFORM, eep)
+        ent._seen(pkt)
+        self._entities[sender] = ent
+        self.async_add_entities([ent])
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
-    platform = _DynamicPlatform(hass, entry, async_add_entities)
-    await platform.start()
\ No newline at end of file
+    hub: EnOceanTCPHub = hass.data[DOMAIN][entry.entry_id]
+    platform = _DynamicPlatform(
+        hass, entry, hub, async_get_devices(hass, entry.entry_id), async_add_entities
+    )
+    platform.restore()
+    await platform.start()
+    entry.async_on_unload(platform.stop)
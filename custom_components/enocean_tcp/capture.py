@@ -0,0 +1,255 @@
+"""Mitschnitt und Wiedergabe von ESP3-Frames (ohne Home-Assistant-Abhängigkeit).
+
+Dateiformat (Little Endian):
+    Kopf:      b"EOCAP" + Version (1 Byte)
+    Datensatz: Zeitstempel in µs seit Epoche (u64), Richtung (u8: 0 = RX,
+               1 = TX; Bit 7 = live verworfen), Länge (u16), danach der
+               vollständige ESP3-Frame (Sync, Header, Daten, Optionsdaten,
+               CRCs) – je Datensatz genau ein Frame.
+
+Empfangen wird vor Senderfilter und Duplikatfilter mitgeschnitten; was live
+verworfen wurde, trägt das Flag. Die Datei gibt so den tatsächlichen
+Funkverkehr wieder.
+
+Geschrieben wird in einem eigenen Thread; der Event-Loop legt Datensätze nur
+in eine Warteschlange. Ist sie voll (Platte hängt), werden Datensätze
+verworfen und gezählt, statt den Loop zu blockieren.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from .esp3 import ESP3Packet, ESP3StreamParser, build_frame
+
+_LOGGER = logging.getLogger(__name__)
+
+FILE_MAGIC = b"EOCAP\x01"
+RECORD_HEADER = struct.Struct("<QBH")
+
+DIR_RX = 0
+DIR_TX = 1
+FLAG_DROPPED = 0x80  # Senderfilter oder Duplikat, nicht verteilt
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+DEFAULT_QUEUE_SIZE = 10000
+CLOSE_TIMEOUT = 5.0  # Sekunden
+
+
+class CaptureRecord(NamedTuple):
+    timestamp: float  # Sekunden seit Epoche
+    direction: int
+    frame: bytes
+    dropped: bool = False
+
+
+class CaptureWriter:
+    """Rotierende Mitschnittdatei `path` (+ `path.1` … `path.<backups>`)."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self.records = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="enocean_tcp_capture", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """Restliche Datensätze schreiben und Thread beenden (blockiert).
+
+        Ist der Thread nach einem Schreibfehler schon beendet, leert niemand
+        mehr die Warteschlange – dann wird nicht auf sie gewartet.
+        """
+        thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=CLOSE_TIMEOUT)
+        except queue.Full:
+            _LOGGER.warning("enocean_tcp: Mitschnitt %s wird nicht fertig geschrieben", self.path)
+            return
+        thread.join(CLOSE_TIMEOUT)
+
+    def record(
+        self, direction: int, frame: bytes, ts: Optional[float] = None, dropped: bool = False
+    ) -> None:
+        """Einen Frame einreihen; blockiert nie.
+
+        Auch aus dem Worker-Thread aufrufbar (Senderfilter im Parser).
+        """
+        if ts is None:
+            ts = time.time()
+        if dropped:
+            direction |= FLAG_DROPPED
+        try:
+            self._queue.put_nowait(
+                RECORD_HEADER.pack(int(ts * 1e6), direction, len(frame)) + frame
+            )
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.records += 1
+
+    def record_frames(self, direction: int, frames: Iterable[bytes]) -> None:
+        """Frames eines Schreibvorgangs: ein Datensatz je Frame."""
+        ts = time.time()
+        for frame in frames:
+            self.record(direction, frame, ts)
+
+    def record_filtered(self, frame: bytes) -> None:
+        """Vom Senderfilter im Parser verworfener Rohframe (`on_filtered`)."""
+        self.record(DIR_RX, frame, dropped=True)
+
+    def record_packet(self, pkt: ESP3Packet, dropped: bool = False) -> None:
+        """Empfangenes Paket als vollständigen Frame mitschneiden.
+
+        Nutzt den Rohframe aus dem Parser (`keep_frames`); nur ohne ihn wird
+        der Frame samt CRCs neu gebaut.
+        """
+        frame = pkt.frame
+        if frame is None:
+            frame = build_frame(pkt.packet_type, pkt.data, pkt.opt)
+        self.record(DIR_RX, frame, dropped=dropped)
+
+    def _run(self) -> None:
+        f = None
+        try:
+            f = self._open()
+            while True:
+                item = self._queue.get()
+                chunks = []
+                stop = False
+                # Was sich inzwischen angesammelt hat, gemeinsam schreiben
+                while item is not None:
+                    chunks.append(item)
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                else:
+                    stop = True
+                for chunk in chunks:
+                    # gepuffert – erst flush() geht an die Platte
+                    f.write(chunk)
+                    if f.tell() >= self.max_bytes:
+                        f.close()
+                        self._rotate()
+                        f = self._open()
+                f.flush()
+                if stop:
+                    return
+        except OSError as e:
+            self.errors += 1
+            _LOGGER.error("enocean_tcp: Mitschnitt %s nicht schreibbar: %s", self.path, e)
+        finally:
+            if f is not None:
+                f.close()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        f = open(self.path, "ab")
+        if f.tell() == 0:
+            f.write(FILE_MAGIC)
+        return f
+
+    def _rotate(self) -> None:
+        self.rotations += 1
+        for i in range(self.backups, 0, -1):
+            src = self.path if i == 1 else f"{self.path}.{i - 1}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i}")
+        if self.backups <= 0:
+            os.remove(self.path)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "records": self.records,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "errors": self.errors,
+            "pending": self._queue.qsize(),
+        }
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """Liest alle Datensätze einer Mitschnittdatei."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(FILE_MAGIC):
+        raise ValueError(f"{path}: keine EnOcean-Mitschnittdatei")
+    pos = len(FILE_MAGIC)
+    hlen = RECORD_HEADER.size
+    end = len(data)
+    while pos + hlen <= end:
+        ts_us, direction, n = RECORD_HEADER.unpack_from(data, pos)
+        pos += hlen
+        if pos + n > end:
+            # Abgeschnittener letzter Datensatz (z. B. Absturz beim Schreiben)
+            break
+        yield CaptureRecord(
+            ts_us / 1e6, direction & ~FLAG_DROPPED, data[pos:pos + n], bool(direction & FLAG_DROPPED)
+        )
+        pos += n
+
+
+async def replay(
+    records: Iterable[CaptureRecord],
+    on_packet: Callable[[ESP3Packet], None],
+    speed: Optional[float] = None,
+    direction: int = DIR_RX,
+    parser: Optional[ESP3StreamParser] = None,
+    dropped: bool = True,
+) -> int:
+    """Spielt Frames durch `ESP3StreamParser` und `on_packet` zurück.
+
+    `speed` None = so schnell wie möglich, 1.0 = Echtzeit, 2.0 = doppelt so
+    schnell usw. `dropped=False` lässt live verworfene Frames aus, spielt
+    also nur ab, was damals verteilt wurde. Liefert die Anzahl verteilter
+    Pakete.
+    """
+    parser = parser or ESP3StreamParser()
+    loop = asyncio.get_running_loop()
+    start = None
+    count = 0
+    for rec in records:
+        if rec.direction != direction or (rec.dropped and not dropped):
+            continue
+        if speed:
+            if start is None:
+                start = (rec.timestamp, loop.time())
+            delay = start[1] + (rec.timestamp - start[0]) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        parser.feed(rec.frame)
+        for pkt in parser.packets():
+            on_packet(pkt)
+            count += 1
+        if not speed and count % 1000 == 0:
+            # Bei Maximaltempo den Loop trotzdem nicht aushungern
+            await asyncio.sleep(0)
+    return count
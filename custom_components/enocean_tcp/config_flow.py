@@ -1,10 +1,48 @@
 from __future__ import annotations
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_RECONNECT, DEFAULT_RECONNECT
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_MODE,
+    MODE_CLIENT,
+    MODE_SERVER,
+    DEFAULT_MODE,
+    CONF_RECONNECT,
+    DEFAULT_RECONNECT_S,
+    CONF_RECONNECT_MAX,
+    DEFAULT_RECONNECT_MAX_S,
+    CONF_KEEPALIVE,
+    DEFAULT_KEEPALIVE_S,
+    CONF_PROBE_INTERVAL,
+    DEFAULT_PROBE_INTERVAL_S,
+    CONF_FIRE_EVENTS,
+    DEFAULT_FIRE_EVENTS,
+    CONF_STATE_INTERVAL,
+    DEFAULT_STATE_INTERVAL_S,
+    CONF_TX_PACING,
+    DEFAULT_TX_PACING_MS,
+    CONF_TX_RESPONSE_TIMEOUT,
+    DEFAULT_TX_RESPONSE_TIMEOUT_S,
+    CONF_DEDUP_WINDOW,
+    DEFAULT_DEDUP_WINDOW_MS,
+    CONF_CAPTURE,
+    DEFAULT_CAPTURE,
+    CONF_SENDER_FILTER,
+    DEFAULT_SENDER_FILTER,
+    CONF_PARSE_WORKER,
+    DEFAULT_PARSE_WORKER,
+    CONF_EVENT_BATCH,
+    DEFAULT_EVENT_BATCH,
+    CONF_EVENT_WINDOW,
+    DEFAULT_EVENT_WINDOW_MS,
+    CONF_LINK_HISTORY,
+    DEFAULT_LINK_HISTORY,
+)
 
 class EnOceanTCPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -21,6 +59,7 @@ class EnOceanTCPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         schema = vol.Schema({
             vol.Required(CONF_HOST): str,
             vol.Required(CONF_PORT, default=9999): int,
+            vol.Required(CONF_MODE, default=DEFAULT_MODE): vol.In([MODE_CLIENT, MODE_SERVER]),
         })
         return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
 
@@ -28,6 +67,11 @@ class EnOceanTCPConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Für YAML‑Import optional
         return await self.async_step_user(user_input)
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        return EnOceanTCPOptionsFlowHandler(config_entry)
+
 class EnOceanTCPOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         self.config_entry = config_entry
@@ -37,10 +81,20 @@ class EnOceanTCPOptionsFlowHandler(config_entries.OptionsFlow):
             return self.async_create_entry(title="", data=user_input)
 
         schema = vol.Schema({
-            vol.Optional(CONF_RECONNECT, default=self.config_entry.options.get(CONF_RECONNECT, DEFAULT_RECONNECT)): int,
+            vol.Optional(CONF_RECONNECT, default=self.config_entry.options.get(CONF_RECONNECT, DEFAULT_RECONNECT_S)): int,
+            vol.Optional(CONF_RECONNECT_MAX, default=self.config_entry.options.get(CONF_RECONNECT_MAX, DEFAULT_RECONNECT_MAX_S)): vol.All(int, vol.Range(min=1, max=3600)),
+            vol.Optional(CONF_KEEPALIVE, default=self.config_entry.options.get(CONF_KEEPALIVE, DEFAULT_KEEPALIVE_S)): vol.All(int, vol.Range(min=0, max=3600)),
+            vol.Optional(CONF_PROBE_INTERVAL, default=self.config_entry.options.get(CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL_S)): vol.All(int, vol.Range(min=0, max=3600)),
+            vol.Optional(CONF_FIRE_EVENTS, default=self.config_entry.options.get(CONF_FIRE_EVENTS, DEFAULT_FIRE_EVENTS)): bool,
+            vol.Optional(CONF_STATE_INTERVAL, default=self.config_entry.options.get(CONF_STATE_INTERVAL, DEFAULT_STATE_INTERVAL_S)): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_TX_PACING, default=self.config_entry.options.get(CONF_TX_PACING, DEFAULT_TX_PACING_MS)): vol.All(int, vol.Range(min=0, max=1000)),
+            vol.Optional(CONF_TX_RESPONSE_TIMEOUT, default=self.config_entry.options.get(CONF_TX_RESPONSE_TIMEOUT, DEFAULT_TX_RESPONSE_TIMEOUT_S)): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+            vol.Optional(CONF_DEDUP_WINDOW, default=self.config_entry.options.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW_MS)): vol.All(int, vol.Range(min=0, max=10000)),
+            vol.Optional(CONF_CAPTURE, default=self.config_entry.options.get(CONF_CAPTURE, DEFAULT_CAPTURE)): bool,
+            vol.Optional(CONF_SENDER_FILTER, default=self.config_entry.options.get(CONF_SENDER_FILTER, DEFAULT_SENDER_FILTER)): bool,
+            vol.Optional(CONF_PARSE_WORKER, default=self.config_entry.options.get(CONF_PARSE_WORKER, DEFAULT_PARSE_WORKER)): bool,
+            vol.Optional(CONF_EVENT_BATCH, default=self.config_entry.options.get(CONF_EVENT_BATCH, DEFAULT_EVENT_BATCH)): bool,
+            vol.Optional(CONF_EVENT_WINDOW, default=self.config_entry.options.get(CONF_EVENT_WINDOW, DEFAULT_EVENT_WINDOW_MS)): vol.All(int, vol.Range(min=0, max=1000)),
+            vol.Optional(CONF_LINK_HISTORY, default=self.config_entry.options.get(CONF_LINK_HISTORY, DEFAULT_LINK_HISTORY)): vol.All(int, vol.Range(min=0, max=1024)),
         })
-        return self.async_show_form(step_id="init", data_schema=schema)
-
-    @staticmethod
-    async def async_get_options_flow(config_entry):
-        return EnOceanTCPOptionsFlowHandler(config_entry)
\ No newline at end of file
+        return self.async_show_form(step_id="init", data_schema=schema)
\ No newline at end of file
@@ -2,7 +2,52 @@ DOMAIN = "enocean_tcp"
 DEFAULT_PORT = 9999
 CONF_HOST = "host"
 CONF_PORT = "port"
+CONF_MODE = "mode"
+MODE_CLIENT = "client"  # HA verbindet sich zum Gateway
+MODE_SERVER = "server"  # Gateways verbinden sich zu HA
+DEFAULT_MODE = MODE_CLIENT
 CONF_RECONNECT = "reconnect_interval"
-DEFAULT_RECONNECT = 5  # Sekunden
+DEFAULT_RECONNECT_S = 5  # Sekunden, erste Wartezeit; verdoppelt sich bis CONF_RECONNECT_MAX
+CONF_RECONNECT_MAX = "reconnect_max"
+DEFAULT_RECONNECT_MAX_S = 300  # Sekunden
+CONF_KEEPALIVE = "keepalive"
+DEFAULT_KEEPALIVE_S = 30  # Sekunden bis zur ersten TCP-Keepalive-Probe, 0 = aus
+CONF_PROBE_INTERVAL = "probe_interval"
+DEFAULT_PROBE_INTERVAL_S = 0  # Sekunden Funkstille bis CO_RD_VERSION, 0 = aus
+CONF_FIRE_EVENTS = "fire_events"
+DEFAULT_FIRE_EVENTS = True
+CONF_STATE_INTERVAL = "state_write_interval"
+DEFAULT_STATE_INTERVAL_S = 5  # Sekunden, min. Abstand für Zähler-/Diagnose-States
+CONF_TX_PACING = "tx_pacing"
+DEFAULT_TX_PACING_MS = 20  # Millisekunden zwischen zwei gesendeten Frames
+CONF_TX_RESPONSE_TIMEOUT = "tx_response_timeout"
+DEFAULT_TX_RESPONSE_TIMEOUT_S = 1.0  # Sekunden, 0 = nicht auf RESPONSE warten
+CONF_DEDUP_WINDOW = "dedup_window"
+DEFAULT_DEDUP_WINDOW_MS = 300  # Millisekunden, 0 = keine Duplikatfilterung
+CONF_CAPTURE = "capture"
+DEFAULT_CAPTURE = False  # alle Frames binär nach <config>/enocean_tcp/ mitschneiden
+CONF_SENDER_FILTER = "sender_filter"
+DEFAULT_SENDER_FILTER = False  # nur erlaubte/angelernte Sender verarbeiten
+CONF_PARSE_WORKER = "parse_worker"
+DEFAULT_PARSE_WORKER = False  # Lesen/Parsen in einem eigenen Thread statt im HA-Loop
+CONF_EVENT_BATCH = "event_batch"
+DEFAULT_EVENT_BATCH = False  # ein enocean_tcp_frames-Event je Lesevorgang statt je Frame
+CONF_EVENT_WINDOW = "event_window"
+DEFAULT_EVENT_WINDOW_MS = 0  # Millisekunden Sammelfenster, 0 = je Lesevorgang
+CONF_LINK_HISTORY = "link_history"
+DEFAULT_LINK_HISTORY = 64  # Telegramme je Sender für Pegel-/Repeater-Verlauf, 0 = aus
 EVENT_FRAME = "enocean_tcp_frame"
-SERVICE_SEND_RAW = "send_raw"
\ No newline at end of file
+EVENT_FRAMES = "enocean_tcp_frames"
+SERVICE_SEND_RAW = "send_raw"
+SERVICE_SEND_BATCH = "send_batch"
+SERVICE_SET_PULSE = "set_pulse"
+SERVICE_LEARN = "learn"
+SERVICE_ALLOW_SENDER = "allow_sender"
+SERVICE_ADD_ACTUATOR = "add_actuator"
+SIGNAL_ADD_ACTUATOR = f"{DOMAIN}_add_actuator_{{}}"  # je entry_id
+SIGNAL_DEVICE_ADDED = f"{DOMAIN}_device_added_{{}}"  # je entry_id, Argument: Sender
+
+
+def ms_to_s(value: float) -> float:
+    """Option in Millisekunden (`*_MS`) -> Sekunden für Hub, TX-Queue und Duplikatfilter."""
+    return value / 1000
@@ -0,0 +1,59 @@
+"""Tabellenbasierte CRC8 (Polynom 0x07) für ESP3.
+
+Modul ist bewusst frei von Home-Assistant-Importen, damit es auch in
+Benchmarks/Tools ohne HA-Installation genutzt werden kann.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+CRC8_POLY = 0x07
+
+
+def _build_table(poly: int) -> bytes:
+    table = bytearray(256)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ poly) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+        table[i] = crc
+    return bytes(table)
+
+
+CRC8_TABLE = _build_table(CRC8_POLY)
+
+
+def crc8(data: Buffer, crc: int = 0) -> int:
+    """CRC8 über `data`; `crc` erlaubt inkrementelles Weiterrechnen.
+
+    `crc8(b, crc8(a)) == crc8(a + b)` – so lassen sich DATA und OPT (oder
+    `memoryview`-Slices des Parser-Puffers) ohne Verketten prüfen.
+    """
+    table = CRC8_TABLE
+    for b in data:
+        crc = table[crc ^ b]
+    return crc
+
+
+def crc8_verify_many(
+    buf: Buffer, spans: Iterable[Tuple[int, int, int]]
+) -> List[bool]:
+    """Prüft viele Bereiche eines Puffers in einem Aufruf.
+
+    `spans` liefert `(start, stop, erwartete_crc)`; Ergebnis ist je Bereich
+    `True`/`False`. Der Puffer wird nur einmal als `memoryview` exportiert.
+    """
+    table = CRC8_TABLE
+    out: List[bool] = []
+    with memoryview(buf) as view:
+        for start, stop, expected in spans:
+            crc = 0
+            for b in view[start:stop]:
+                crc = table[crc ^ b]
+            out.append(crc == expected)
+    return out
@@ -0,0 +1,123 @@
+"""RORG-Dekodierung von ERP1-Telegrammen (ohne Home-Assistant-Abhängigkeit).
+
+Liefert pro Telegramm einmalig ein typisiertes Ergebnis, das über
+`ESP3Packet.telegram` an alle Konsumenten weitergereicht wird.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, NamedTuple, Optional, Union
+
+if TYPE_CHECKING:
+    from .esp3 import ESP3Packet
+
+RORG_RPS = 0xF6  # Repeated Switch (Taster, Fenstergriffe)
+RORG_1BS = 0xD5  # 1 Byte Communication (Kontakte)
+RORG_4BS = 0xA5  # 4 Byte Communication (Sensoren)
+RORG_VLD = 0xD2  # Variable Length Data (Aktoren)
+RORG_UTE = 0xD4  # Universal Teach-in (Anlernen)
+
+# --- Fenstergriff-Mapping (F6-10-00): obere 4 Bit von DB0 (zweites Byte nach 0xF6).
+# 11x0 = offen, 1111 = geschlossen, 1101 = gekippt; auch die EEP-Registry nutzt diese Tabelle.
+WINDOW_CODES = {0xC: "open", 0xE: "open", 0xF: "closed", 0xD: "tilt"}
+
+
+class RPSTelegram(NamedTuple):
+    db0: int
+    t21: bool
+    nu: bool
+    energy_bow: bool  # Taste gedrückt (F6-02)
+    rocker1: int  # R1 bzw. bei NU=0 Anzahl gedrückter Tasten
+    rocker2: Optional[int]  # R2, nur bei NU=1 und SA=1
+    window: Optional[str]  # Deutung als Fenstergriff, falls Code passt
+
+
+class OneBSTelegram(NamedTuple):
+    db0: int
+    closed: bool  # D5-00-01: Kontakt geschlossen
+    teach_in: bool
+
+
+class FourBSTelegram(NamedTuple):
+    db3: int
+    db2: int
+    db1: int
+    db0: int
+    teach_in: bool
+    # Nur bei Teach-in mit EEP-Angabe (LRN-Typ-Bit gesetzt)
+    func: Optional[int]
+    type: Optional[int]
+    manufacturer: Optional[int]
+
+
+class VLDTelegram(NamedTuple):
+    payload: bytes
+
+
+Telegram = Union[RPSTelegram, OneBSTelegram, FourBSTelegram, VLDTelegram]
+
+
+def _decode_rps(data, status: int) -> Optional[RPSTelegram]:
+    if len(data) < 7:
+        return None
+    db0 = data[1]
+    nu = bool(status & 0x10)
+    rocker2 = None
+    if nu and db0 & 0x01:
+        rocker2 = (db0 >> 1) & 0x07
+    return RPSTelegram(
+        db0,
+        bool(status & 0x20),
+        nu,
+        bool(db0 & 0x10),
+        db0 >> 5,
+        rocker2,
+        WINDOW_CODES.get(db0 >> 4),
+    )
+
+
+def _decode_1bs(data, status: int) -> Optional[OneBSTelegram]:
+    if len(data) < 7:
+        return None
+    db0 = data[1]
+    return OneBSTelegram(db0, bool(db0 & 0x01), not db0 & 0x08)
+
+
+def _decode_4bs(data, status: int) -> Optional[FourBSTelegram]:
+    if len(data) < 10:
+        return None
+    db3, db2, db1, db0 = data[1], data[2], data[3], data[4]
+    teach_in = not db0 & 0x08
+    if teach_in and db0 & 0x80:
+        return FourBSTelegram(
+            db3,
+            db2,
+            db1,
+            db0,
+            True,
+            db3 >> 2,
+            ((db3 & 0x03) << 5) | (db2 >> 3),
+            ((db2 & 0x07) << 8) | db1,
+        )
+    return FourBSTelegram(db3, db2, db1, db0, teach_in, None, None, None)
+
+
+def _decode_vld(data, status: int) -> Optional[VLDTelegram]:
+    if len(data) < 7:
+        return None
+    return VLDTelegram(bytes(data[1:-5]))
+
+
+_DECODERS: Dict[int, Callable[..., Optional[Telegram]]] = {
+    RORG_RPS: _decode_rps,
+    RORG_1BS: _decode_1bs,
+    RORG_4BS: _decode_4bs,
+    RORG_VLD: _decode_vld,
+}
+
+
+def decode_telegram(pkt: "ESP3Packet") -> Optional[Telegram]:
+    """Dekodiert ein ERP1-Paket anhand des RORG; sonst `None`."""
+    fn = _DECODERS.get(pkt.rorg)
+    if fn is None:
+        return None
+    return fn(pkt.data, pkt.status)
@@ -0,0 +1,66 @@
+"""Duplikatfilter für mehrfach empfangene ERP1-Telegramme.
+
+Repeater und mehrere Gateways liefern dasselbe Telegramm mehrfach; nur das
+Statusbyte (Repeater-Zähler) unterscheidet sich. Schlüssel ist daher
+(Sender, RORG+Nutzdaten) – Sender-ID und Status bleiben außen vor.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .const import DEFAULT_DEDUP_WINDOW_MS, ms_to_s
+from .esp3 import ESP3Packet
+
+DEFAULT_DEDUP_SIZE = 1024
+
+
+class DedupCache:
+    """Zeitfenster-Cache mit fester Größe und LRU-Verdrängung."""
+
+    def __init__(self, window: float = ms_to_s(DEFAULT_DEDUP_WINDOW_MS), maxsize: int = DEFAULT_DEDUP_SIZE):
+        self.window = window
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[int, bytes], float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_duplicate(self, pkt: ESP3Packet, now: float, window: Optional[float] = None) -> bool:
+        """True, wenn dasselbe Telegramm innerhalb des Fensters schon kam.
+
+        `window` überschreibt das Fenster für diesen Aufruf (Fenster des
+        empfangenden Gateways bei gemeinsam genutztem Cache).
+        """
+        if window is None:
+            window = self.window
+        sender = pkt.sender
+        if sender is None:
+            return False
+        # bytes(): Paketdaten sind ggf. memoryviews auf den Parserpuffer
+        key = (sender, bytes(pkt.data[:-5]))
+        entries = self._entries
+        ts = entries.get(key)
+        if ts is not None and now - ts < window:
+            # Zeitstempel des Originals behalten: das Fenster wandert nicht mit
+            self.hits += 1
+            return True
+        entries[key] = now
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        self.misses += 1
+        return False
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,145 @@
+"""Persistente Gerätetabelle je Config-Eintrag.
+
+Merkt sich für jeden Sender, für den eine Entity angelegt wurde: Plattform,
+erkanntes EEP, letzten Zustand, letzten Empfang und Pegel. Beim Start werden
+daraus alle bekannten Entities sofort wieder angelegt – ohne auf das nächste
+Telegramm jedes Geräts zu warten. Außerdem die erlaubten Sender für den
+Senderfilter (`allowed`): alle Geräte mit Entity plus angelernte.
+
+Geschrieben wird gebündelt über `Store.async_delay_save`: Änderungen markieren
+die Tabelle nur als geändert; der erste geänderte Eintrag plant das Speichern
+in `SAVE_DELAY` Sekunden, alle weiteren bis dahin fahren nur mit.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SIGNAL_DEVICE_ADDED
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30  # Sekunden
+
+DATA_DEVICES = f"{DOMAIN}_devices"
+
+
+class DeviceStore:
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._hass = hass
+        self._entry_id = entry_id
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.devices.{entry_id}")
+        # Sender -> {"platform", "eep", "state", "last_seen", "dbm"[, "pulse"]}
+        self.devices: Dict[int, Dict[str, Any]] = {}
+        # Wird bei Änderungen ersetzt, nie an Ort und Stelle geändert; der
+        # Senderfilter bekommt jede neue Fassung (async_listen_allowed)
+        self.allowed: FrozenSet[int] = frozenset()
+        self._allowed_listeners: List[Callable[[FrozenSet[int]], None]] = []
+        self._dirty = False
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self.devices = {int(sid, 16): rec for sid, rec in data.get("devices", {}).items()}
+        self._set_allowed(frozenset(int(sid, 16) for sid in data.get("allowed", ())).union(self.devices))
+
+    @callback
+    def async_listen_allowed(self, cb: Callable[[FrozenSet[int]], None]) -> Callable[[], None]:
+        """`cb` bei jeder Änderung der erlaubten Sender aufrufen."""
+        self._allowed_listeners = [*self._allowed_listeners, cb]
+
+        @callback
+        def _unsub() -> None:
+            self._allowed_listeners = [c for c in self._allowed_listeners if c is not cb]
+
+        return _unsub
+
+    @callback
+    def _set_allowed(self, allowed: FrozenSet[int]) -> None:
+        self.allowed = allowed
+        for cb in self._allowed_listeners:
+            cb(allowed)
+
+    def known(self, platform: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Bekannte Geräte einer Plattform."""
+        for sender, rec in self.devices.items():
+            if rec.get("platform") == platform:
+                yield sender, rec
+
+    @callback
+    def async_add(self, sender: int, platform: str, eep: str) -> Dict[str, Any]:
+        rec = self.devices[sender] = {
+            "platform": platform,
+            "eep": eep,
+            "state": None,
+            "last_seen": None,
+            "dbm": None,
+        }
+        if sender not in self.allowed:
+            self._set_allowed(self.allowed | {sender})
+        self._schedule()
+        async_dispatcher_send(self._hass, SIGNAL_DEVICE_ADDED.format(self._entry_id), sender)
+        return rec
+
+    @callback
+    def async_seen(
+        self, sender: int, dbm: Optional[int], state: Any = None, ts: Optional[float] = None
+    ) -> None:
+        """Empfang (und ggf. neuen Zustand) eines bekannten Geräts vermerken."""
+        rec = self.devices.get(sender)
+        if rec is None:
+            return
+        rec["last_seen"] = ts if ts is not None else time.time()
+        if dbm is not None:
+            rec["dbm"] = dbm
+        if state is not None:
+            rec["state"] = state
+        self._schedule()
+
+    @callback
+    def async_set(self, sender: int, **values: Any) -> bool:
+        """Einstellungen eines bekannten Geräts ändern (z. B. `pulse`)."""
+        rec = self.devices.get(sender)
+        if rec is None:
+            return False
+        rec.update(values)
+        self._schedule()
+        return True
+
+    @callback
+    def async_allow(self, sender: int, allow: bool = True) -> None:
+        """Sender für den Senderfilter erlauben bzw. sperren."""
+        if allow:
+            self._set_allowed(self.allowed | {sender})
+        else:
+            self._set_allowed(self.allowed - {sender})
+        self._schedule()
+
+    @callback
+    def _schedule(self) -> None:
+        if not self._dirty:
+            self._dirty = True
+            self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    @callback
+    def _data(self) -> dict:
+        self._dirty = False
+        return {
+            "devices": {f"{sender:08X}": rec for sender, rec in self.devices.items()},
+            "allowed": sorted(f"{sender:08X}" for sender in self.allowed),
+        }
+
+    async def async_save(self) -> None:
+        """Ausstehende Änderungen sofort schreiben (beim Entladen)."""
+        if self._dirty:
+            await self._store.async_save(self._data())
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+@callback
+def async_get_devices(hass: HomeAssistant, entry_id: str) -> DeviceStore:
+    return hass.data[DATA_DEVICES][entry_id]
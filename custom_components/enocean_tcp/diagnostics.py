@@ -0,0 +1,34 @@
+"""Diagnose-Download: Verbindung, Parser, Latenzen, Sende-Warteschlange, Funkqualität."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_HOST
+from .devices import async_get_devices
+
+# Adressen der Gateways bzw. des Listeners (Namen enthalten sie meist auch)
+TO_REDACT = {CONF_HOST, "peer", "listen", "host", "name"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    hub = hass.data[DOMAIN][entry.entry_id]
+    return async_redact_data(
+        {
+            "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+            "hub": hub.stats,
+            "counters": hub.counters,
+            "dedup": hub.dedup_stats,
+            "capture": hub.capture.stats if hub.capture is not None else None,
+            "manager": hub.manager.stats,
+            "devices": len(async_get_devices(hass, entry.entry_id).devices),
+            "sender_filter": hub.sender_filter.stats if hub.sender_filter is not None else None,
+            "link_quality": hub.link_quality,
+        },
+        TO_REDACT,
+    )
@@ -0,0 +1,188 @@
+"""EEP-Dekoder-Registry (ohne Home-Assistant-Abhängigkeit).
+
+Profile werden deklarativ als Bitfelder beschrieben (Offset/Größe wie in der
+EEP-Spezifikation, MSB von DB_n zuerst) und beim Laden in eine Python-
+Funktion übersetzt: Shift/Maske und Skalierung sind dann Konstanten, das
+Dekodieren eines 4BS-Telegramms sind ein paar Integer-Operationen.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from .decode import RORG_1BS, RORG_4BS, RORG_RPS, RORG_VLD, WINDOW_CODES
+
+EEPKey = Tuple[int, int, int]  # (RORG, FUNC, TYPE)
+
+
+class Field(NamedTuple):
+    """Bitfeld eines Profils.
+
+    `scale` ist `(raw_min, raw_max, min, max)` wie in der Spezifikation;
+    `enum` bildet Rohwerte auf Texte ab. Ohne beides bleibt der Rohwert.
+    """
+
+    key: str
+    offset: int
+    size: int
+    scale: Optional[Tuple[float, float, float, float]] = None
+    enum: Optional[Dict[int, str]] = None
+    unit: Optional[str] = None
+
+
+class EEPDecoder:
+    __slots__ = ("eep", "title", "fields", "payload_len", "_fn")
+
+    def __init__(self, eep: EEPKey, title: str, fields: Tuple[Field, ...], payload_len: int):
+        self.eep = eep
+        self.title = title
+        self.fields = fields
+        self.payload_len = payload_len
+        self._fn = _compile(fields, payload_len * 8)
+
+    @property
+    def name(self) -> str:
+        return "%02X-%02X-%02X" % self.eep
+
+    def decode(self, data) -> Optional[dict]:
+        """Dekodiert die ERP1-DATA (inkl. RORG, Sender, Status)."""
+        n = self.payload_len
+        if len(data) < n + 6:
+            return None
+        return self._fn(int.from_bytes(data[1:1 + n], "big"))
+
+
+def _compile(fields: Tuple[Field, ...], bits: int) -> Callable[[int], dict]:
+    # Quelltext einer Funktion erzeugen, die alle Felder aus einem Integer liest
+    consts: Dict[str, object] = {}
+    items = []
+    for i, f in enumerate(fields):
+        shift = bits - f.offset - f.size
+        if shift < 0:
+            raise ValueError(f"Feld {f.key} liegt außerhalb der Nutzdaten")
+        raw = f"((v >> {shift}) & {(1 << f.size) - 1})" if shift else f"(v & {(1 << f.size) - 1})"
+        if f.scale is not None:
+            rmin, rmax, smin, smax = f.scale
+            factor = (smax - smin) / (rmax - rmin)
+            base = smin - rmin * factor
+            expr = f"{raw} * {factor!r} + {base!r}"
+        elif f.enum is not None:
+            name = f"_e{i}"
+            consts[name] = f.enum
+            expr = f"{name}.get({raw})"
+        else:
+            expr = raw
+        items.append(f"{f.key!r}: {expr}")
+    src = "def _decode(v):\n    return {" + ", ".join(items) + "}\n"
+    exec(compile(src, "<eep>", "exec"), consts)  # noqa: S102 – nur eigene Felddefinitionen
+    return consts["_decode"]  # type: ignore[return-value]
+
+
+_REGISTRY: Dict[EEPKey, EEPDecoder] = {}
+
+
+def register_profile(
+    rorg: int,
+    func: int,
+    type_: int,
+    title: str,
+    fields: Iterable[Field],
+    payload_len: Optional[int] = None,
+) -> EEPDecoder:
+    """Registriert (oder ersetzt) ein Profil und übersetzt es sofort."""
+    if payload_len is None:
+        payload_len = {RORG_RPS: 1, RORG_1BS: 1, RORG_4BS: 4}[rorg]
+    dec = EEPDecoder((rorg, func, type_), title, tuple(fields), payload_len)
+    _REGISTRY[dec.eep] = dec
+    return dec
+
+
+def get_decoder(rorg: int, func: int, type_: int) -> Optional[EEPDecoder]:
+    return _REGISTRY.get((rorg, func, type_))
+
+
+def decode_eep(eep: EEPKey, data) -> Optional[dict]:
+    dec = _REGISTRY.get(eep)
+    if dec is None:
+        return None
+    return dec.decode(data)
+
+
+def parse_eep(text: str) -> EEPKey:
+    """'A5-02-05' -> (0xA5, 0x02, 0x05)."""
+    parts = text.strip().replace(":", "-").split("-")
+    if len(parts) != 3:
+        raise ValueError(f"Ungültiges EEP: {text}")
+    rorg, func, type_ = (int(p, 16) for p in parts)
+    return rorg, func, type_
+
+
+# --- Eingebaute Profile -----------------------------------------------------
+
+_LRN = Field("learn", 28, 1)  # 4BS: DB0.3, 0 = Teach-in
+
+# F6-02-01/02: Wippschalter
+for _t in (0x01, 0x02):
+    register_profile(RORG_RPS, 0x02, _t, "Light and Blind Control", (
+        Field("rocker1", 0, 3),
+        Field("energy_bow", 3, 1),
+        Field("rocker2", 4, 3),
+        Field("second_action", 7, 1),
+    ))
+
+# F6-10-00: Fenstergriff
+register_profile(RORG_RPS, 0x10, 0x00, "Window Handle", (
+    Field("window", 0, 4, enum=WINDOW_CODES),
+))
+
+# D5-00-01: Kontakt
+register_profile(RORG_1BS, 0x00, 0x01, "Single Input Contact", (
+    Field("learn", 4, 1),
+    Field("contact", 7, 1, enum={0: "open", 1: "closed"}),
+))
+
+# A5-02-01..0B: Temperatursensoren, 40 K Spanne, Rohwert invertiert
+for _t, _lo in zip(range(0x01, 0x0C), range(-40, 70, 10)):
+    register_profile(RORG_4BS, 0x02, _t, "Temperature Sensor", (
+        Field("temperature", 16, 8, scale=(255, 0, _lo, _lo + 40), unit="°C"),
+        _LRN,
+    ))
+
+# A5-04-01: Temperatur + Feuchte
+register_profile(RORG_4BS, 0x04, 0x01, "Temperature and Humidity Sensor", (
+    Field("humidity", 8, 8, scale=(0, 250, 0, 100), unit="%"),
+    Field("temperature", 16, 8, scale=(0, 250, 0, 40), unit="°C"),
+    _LRN,
+    Field("temperature_available", 30, 1),
+))
+
+# A5-07-01: Präsenzmelder
+register_profile(RORG_4BS, 0x07, 0x01, "Occupancy Sensor", (
+    Field("supply_voltage", 0, 8, scale=(0, 250, 0, 5.0), unit="V"),
+    Field("pir", 16, 8),
+    _LRN,
+    Field("supply_voltage_available", 31, 1),
+))
+
+# A5-10-01..06: Raumbediengeräte
+_FAN = Field("fan_speed", 0, 8)
+_SP = Field("set_point", 8, 8)
+_TMP = Field("temperature", 16, 8, scale=(255, 0, 0, 40), unit="°C")
+_OCC = Field("occupancy", 31, 1)
+_SLSW = Field("slide_switch", 31, 1)
+for _t, _fields in (
+    (0x01, (_FAN, _SP, _TMP, _LRN, _OCC)),
+    (0x02, (_FAN, _SP, _TMP, _LRN, _SLSW)),
+    (0x03, (_SP, _TMP, _LRN)),
+    (0x04, (_FAN, _SP, _TMP, _LRN)),
+    (0x05, (_SP, _TMP, _LRN, _OCC)),
+    (0x06, (_SP, _TMP, _LRN, _SLSW)),
+):
+    register_profile(RORG_4BS, 0x10, _t, "Room Operating Panel", _fields)
+
+# D2-01-xx: Aktor-Statusantwort (CMD 0x4)
+for _t in range(0x00, 0x13):
+    register_profile(RORG_VLD, 0x01, _t, "Electronic Switch/Dimmer", (
+        Field("command", 4, 4),
+        Field("channel", 11, 5),
+        Field("output", 17, 7),
+    ), payload_len=3)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .actuator import Actuator, get_actuator
+from .const import DOMAIN, SIGNAL_ADD_ACTUATOR
+from .devices import DeviceStore, async_get_devices
+from .esp3 import ESP3Packet
+from .tx import PRIORITY_HIGH
+
+_UNSET = object()
+
+
+class CoalescedWriteMixin:
+    """Fasst häufige `async_write_ha_state()`-Aufrufe zusammen.
+
+    Zwei Strategien, kombinierbar:
+    - `_write_interval` > 0: höchstens ein Schreibvorgang pro Intervall; der
+      letzte Stand wird am Intervallende geschrieben.
+    - `_write_on_change_only`: nur schreiben, wenn sich `_write_key()` seit
+      dem letzten Schreiben geändert hat.
+    Beim Entfernen der Entity wird ein ausstehender Stand noch geschrieben.
+    """
+
+    _write_interval: float = 0.0
+    _write_on_change_only: bool = False
+    _write_handle = None
+    _last_write: float = 0.0
+    _last_written_key: Any = _UNSET
+
+    def _write_key(self) -> Any:
+        return None
+
+    @callback
+    def async_write_coalesced(self) -> None:
+        if self._write_on_change_only and self._write_key() == self._last_written_key:
+            return
+        if self._write_handle is not None:
+            # Flush ist schon geplant und schreibt den dann aktuellen Stand
+            return
+        loop = self.hass.loop
+        now = loop.time()
+        due = self._last_write + self._write_interval
+        if now >= due:
+            self._write_now(now)
+        else:
+            self._write_handle = loop.call_at(due, self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        self._write_handle = None
+        self._write_now(self.hass.loop.time())
+
+    def _write_now(self, now: float) -> None:
+        self._last_write = now
+        if self._write_on_change_only:
+            self._last_written_key = self._write_key()
+        self.async_write_ha_state()
+
+    @callback
+    def async_flush_coalesced(self) -> None:
+        """Schreibt einen ausstehenden Stand sofort (z. B. beim Entladen)."""
+        if self._write_handle is not None:
+            self._write_handle.cancel()
+            self._flush()
+
+    async def async_will_remove_from_hass(self) -> None:
+        self.async_flush_coalesced()
+        await super().async_will_remove_from_hass()
+
+
+class EnOceanTCPActuatorEntity(Entity):
+    """Ein Aktor-Kanal; Frames kommen fertig aus `Actuator`.
+
+    Der Zustand folgt nach erfolgreichem Senden sofort dem Befehl und wird
+    von Rückmeldungen des Aktors (Abo auf dessen Sender-ID) überschrieben.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        hub,
+        devices: DeviceStore,
+        actuator: Actuator,
+        name: str,
+    ) -> None:
+        device_id = f"{actuator.device:08X}"
+        self._hub = hub
+        self._devices = devices
+        self._actuator = actuator
+        self._output: Optional[int] = None  # 0..100
+        self._attr_name = name
+        self._attr_unique_id = f"{entry.entry_id}_actuator_{device_id}_{actuator.channel}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"device_{device_id}")},
+            name=f"EnOcean Device {device_id}",
+            manufacturer="EnOcean",
+            model="%02X-%02X-%02X" % actuator.eep,
+            via_device=(DOMAIN, entry.entry_id),
+        )
+
+    @property
+    def is_on(self) -> Optional[bool]:
+        return None if self._output is None else self._output > 0
+
+    async def async_added_to_hass(self) -> None:
+        rec = self._devices.devices.get(self._actuator.device) or {}
+        self._output = (rec.get("state") or {}).get(str(self._actuator.channel))
+        self.async_on_remove(
+            self._hub.async_subscribe(self.handle_packet, self._actuator.device)
+        )
+
+    @callback
+    def handle_packet(self, pkt: ESP3Packet) -> None:
+        value = self._actuator.status(pkt.data)
+        if value is None:
+            return
+        changed = value != self._output
+        self._output = value
+        self._devices.async_seen(self._actuator.device, pkt.dbm, self._state())
+        if changed:
+            self.async_write_ha_state()
+
+    def _state(self) -> dict:
+        rec = self._devices.devices.get(self._actuator.device) or {}
+        return {**(rec.get("state") or {}), str(self._actuator.channel): self._output}
+
+    async def _async_send(self, frame: bytes, value: int) -> None:
+        await self._hub.manager.send_frame(frame, PRIORITY_HIGH, target=self._actuator.device)
+        if value != self._output:
+            self._output = value
+            self._devices.async_set(self._actuator.device, state=self._state())
+            self.async_write_ha_state()
+
+
+async def async_setup_actuators(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    platform: str,
+    factory: Callable[..., EnOceanTCPActuatorEntity],
+) -> None:
+    """Aktoren einer Plattform aus der Gerätetabelle anlegen, neue per Signal."""
+    hub = hass.data[DOMAIN][entry.entry_id]
+    devices = async_get_devices(hass, entry.entry_id)
+    added: set = set()
+
+    @callback
+    def _add(device: int) -> None:
+        rec = devices.devices.get(device)
+        if rec is None or rec.get("platform") != platform:
+            return
+        entities = []
+        for channel in rec.get("channels", (0,)):
+            if (device, channel) in added:
+                continue
+            actuator = get_actuator(rec["eep"], device, channel, rec.get("source", 0))
+            name = rec.get("name") or f"Actuator {device:08X}"
+            if channel:
+                name = f"{name} CH{channel}"
+            added.add((device, channel))
+            entities.append(factory(entry, hub, devices, actuator, name))
+        if entities:
+            async_add_entities(entities)
+
+    for device, _ in list(devices.known(platform)):
+        _add(device)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_ADD_ACTUATOR.format(entry.entry_id), _add)
+    )
@@ -0,0 +1,445 @@
+"""ESP3 Framing: Paket-Typ und Stream-Parser (ohne Home-Assistant-Abhängigkeit)."""
+from __future__ import annotations
+
+import binascii
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from .allowlist import SenderFilter
+from .crc8 import CRC8_TABLE, crc8
+from .decode import Telegram, decode_telegram
+
+ESP3_SYNC = 0x55
+ESP3_HEADER_LEN = 6  # Sync + DL(2) + OL(1) + PT(1) + CRC8H(1)
+
+# Obergrenze für ungelesene Bytes im Parser. Ein ERP1-Frame ist < 40 Bytes;
+# größere Werte schützen nur vor Müllfluten bzw. falschen Headern.
+DEFAULT_MAX_BUFFER = 8192
+# Mindestens so viel freien Platz bietet `get_buffer()` dem Transport an
+MIN_RECV_SPACE = 1024
+
+
+_setattr = object.__setattr__
+_UNSET = object()
+
+
+class ESP3Packet:
+    """Unveränderliches ESP3-Paket; ERP1-Felder werden einmalig dekodiert.
+
+    `data`/`opt` sind Bytes bzw. `memoryview`s, `frame` optional der ganze
+    geprüfte Rohframe (Sync bis CRC8D). Sender, RORG, Status sowie
+    Subtelegramme/dBm aus den ERP1-Optionsdaten werden im Konstruktor gelesen,
+    Hex-Strings und das dekodierte Telegramm (`telegram`) erst beim ersten
+    Zugriff gebaut und dann gecacht.
+    """
+
+    __slots__ = (
+        "packet_type",
+        "data",
+        "opt",
+        "frame",
+        "rorg",
+        "sender",
+        "status",
+        "subtel",
+        "dbm",
+        "_sender_id",
+        "_data_hex",
+        "_opt_hex",
+        "_telegram",
+    )
+
+    def __init__(self, packet_type: int, data: bytes, opt: bytes, frame: Optional[bytes] = None):
+        _setattr(self, "packet_type", packet_type)
+        _setattr(self, "data", data)
+        _setattr(self, "opt", opt)
+        _setattr(self, "frame", frame)
+        rorg = sender = status = subtel = dbm = None
+        if packet_type == 0x01:
+            n = len(data)
+            if n > 0:
+                # Bei ERP1 ist erstes Datenbyte RORG (z.B. 0xF6, 0xD2, 0xA5, ...)
+                rorg = data[0]
+                status = data[-1]
+            if n >= 6:
+                # data: RORG | payload.. | sender(4) | status(1)
+                sender = (data[-5] << 24) | (data[-4] << 16) | (data[-3] << 8) | data[-2]
+            if len(opt) >= 6:
+                # opt: SubTelNum(1) | Destination(4) | dBm(1) | Security(1)
+                subtel = opt[0]
+                dbm = -opt[5]
+        _setattr(self, "rorg", rorg)
+        _setattr(self, "sender", sender)
+        _setattr(self, "status", status)
+        _setattr(self, "subtel", subtel)
+        _setattr(self, "dbm", dbm)
+        _setattr(self, "_sender_id", None)
+        _setattr(self, "_data_hex", None)
+        _setattr(self, "_opt_hex", None)
+        _setattr(self, "_telegram", _UNSET)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ESP3Packet ist unveränderlich")
+
+    def __delattr__(self, name):
+        raise AttributeError("ESP3Packet ist unveränderlich")
+
+    def __repr__(self) -> str:
+        return f"ESP3Packet(pt={self.packet_type:02X}, data={self.data_hex}, opt={self.opt_hex})"
+
+    @property
+    def sender_id(self) -> Optional[str]:
+        sid = self._sender_id
+        if sid is None and self.sender is not None:
+            sid = f"{self.sender:08X}"
+            _setattr(self, "_sender_id", sid)
+        return sid
+
+    @property
+    def data_hex(self) -> str:
+        h = self._data_hex
+        if h is None:
+            h = self.data.hex().upper()
+            _setattr(self, "_data_hex", h)
+        return h
+
+    @property
+    def opt_hex(self) -> str:
+        h = self._opt_hex
+        if h is None:
+            h = self.opt.hex().upper()
+            _setattr(self, "_opt_hex", h)
+        return h
+
+    @property
+    def telegram(self) -> Optional[Telegram]:
+        """RORG-dekodiertes Telegramm; wird pro Paket nur einmal berechnet."""
+        tg = self._telegram
+        if tg is _UNSET:
+            tg = decode_telegram(self) if self.rorg is not None else None
+            _setattr(self, "_telegram", tg)
+        return tg
+
+    def as_dict(self) -> dict:
+        d = {
+            "packet_type": self.packet_type,
+            "data_hex": self.data_hex,
+            "opt_hex": self.opt_hex,
+        }
+        if self.rorg is not None:
+            d["rorg"] = self.rorg
+        if self.sender is not None:
+            d["sender_id"] = self.sender_id
+        if self.status is not None:
+            d["status"] = self.status
+        if self.dbm is not None:
+            d["dbm"] = self.dbm
+        return d
+
+
+class ESP3StreamParser:
+    """Zustandsmaschine zum Parsen von ESP3-Frames aus einem Bytestrom.
+
+    Der Buffer ist fest vorbelegt (`max_buffer` Bytes) und wird über einen
+    Lese-Offset (`_pos`) und einen Füllstand (`_end`) verwaltet. Neue Daten
+    landen entweder per `feed()` oder – ohne Zwischenkopie – direkt über
+    `get_buffer()`/`buffer_updated()` (asyncio.BufferedProtocol) im freien
+    Ende. Kompaktiert wird erst, wenn dort der Platz knapp wird.
+
+    `data`/`opt` der Pakete sind schreibgeschützte `memoryview`-Slices auf
+    den Buffer. Das freie Ende überschreibt keine ausgegebenen Pakete; hält
+    ein Konsument Pakete fest, bekommt der Parser beim Kompaktieren einfach
+    einen neuen Buffer.
+
+    Mit `sender_filter` werden ERP1-Frames fremder Sender nach der
+    CRC-Prüfung verworfen, ohne dass ein Paket entsteht. Mit `keep_frames`
+    tragen die Pakete zusätzlich den geprüften Rohframe (`frame`), etwa für
+    den Mitschnitt; `on_filtered` bekommt die verworfenen Rohframes (nur
+    während des Aufrufs gültige `memoryview`).
+    """
+
+    def __init__(
+        self,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+        sender_filter: Optional[SenderFilter] = None,
+        keep_frames: bool = False,
+        on_filtered: Optional[Callable[[memoryview], None]] = None,
+    ):
+        self.max_buffer = max_buffer
+        self.sender_filter = sender_filter
+        self.keep_frames = keep_frames
+        self.on_filtered = on_filtered
+        self._buf = bytearray(max_buffer)
+        # Nullbytes zum Auffüllen nach dem Kompaktieren (ohne Allokation)
+        self._pad = memoryview(bytes(max_buffer))
+        self._pos = 0
+        self._end = 0
+        # Zähler
+        self.frames = 0
+        self.header_crc_errors = 0
+        self.data_crc_errors = 0
+        self.bytes_skipped = 0  # Müll vor Sync / verworfene Sync-Bytes
+        self.bytes_dropped = 0  # wegen max_buffer verworfen
+        self.overflows = 0
+        self.frames_filtered = 0  # fremde Sender (sender_filter)
+
+    def feed(self, chunk: bytes):
+        n = len(chunk)
+        cap = self.max_buffer
+        if n > cap:
+            # Größer als der ganze Buffer: nur das Ende zählt
+            self.bytes_dropped += n - cap
+            self.overflows += 1
+            chunk = memoryview(chunk)[n - cap:]
+            n = cap
+        if cap - self._end < n:
+            self._compact(n)
+        end = self._end
+        self._buf[end:end + n] = chunk
+        self._end = end + n
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """Freies Buffer-Ende zum direkten Hineinlesen (BufferedProtocol)."""
+        need = max(sizehint, MIN_RECV_SPACE)
+        if self.max_buffer - self._end < need:
+            # Ungelesenes nur verwerfen, wenn der Buffer wirklich voll ist –
+            # ein langer, unvollständiger Frame bleibt erhalten
+            unread = self._end - self._pos
+            self._compact(max(min(need, self.max_buffer - unread), 1))
+        return memoryview(self._buf)[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """`nbytes` wurden in den Puffer aus `get_buffer()` geschrieben."""
+        self._end += nbytes
+
+    def _compact(self, need: int) -> None:
+        """Ungelesenes an den Anfang schieben, sodass `need` Bytes frei sind."""
+        buf = self._buf
+        pos = self._pos
+        end = self._end
+        cap = self.max_buffer
+        excess = end - pos + need - cap
+        if excess > 0:
+            # Älteste Bytes verwerfen; der Scan synchronisiert sich neu
+            pos += excess
+            self.bytes_dropped += excess
+            self.overflows += 1
+        if pos:
+            try:
+                # bytearray kürzt vorne in O(1) (nur Startzeiger); schlägt
+                # fehl, solange ausgegebene Pakete den Buffer referenzieren
+                del buf[:pos]
+                buf += self._pad[:pos]
+            except BufferError:
+                new = bytearray(cap)
+                new[:end - pos] = buf[pos:end]
+                self._buf = new
+        self._pos = 0
+        self._end = end - pos
+
+    def packets(self) -> Iterator[ESP3Packet]:
+        """Liefert 0..n komplette Packets; behält Rest im Buffer."""
+        buf = self._buf
+        end = self._end
+        pos = self._pos
+        table = CRC8_TABLE
+        max_frame = self.max_buffer
+        flt = self.sender_filter
+        allowed = flt.allowed if flt is not None else None
+        keep = self.keep_frames
+        with memoryview(buf) as base:
+            view = base.toreadonly()
+        try:
+            while True:
+                # Suche nach Sync 0x55 ab dem Lese-Offset
+                idx = buf.find(ESP3_SYNC, pos, end)
+                if idx == -1:
+                    # Kein Sync im Buffer – alles verwerfen
+                    self.bytes_skipped += end - pos
+                    pos = end
+                    break
+                if idx > pos:
+                    self.bytes_skipped += idx - pos
+                    pos = idx
+                if end - pos < ESP3_HEADER_LEN:
+                    break
+                # Header nach Sync: DL(2), OL(1), PT(1), CRC8H(1)
+                dl = (buf[pos + 1] << 8) | buf[pos + 2]
+                ol = buf[pos + 3]
+                pt = buf[pos + 4]
+                crc = table[table[table[table[buf[pos + 1]] ^ buf[pos + 2]] ^ ol] ^ pt]
+                frame_len = ESP3_HEADER_LEN + dl + ol + 1  # + Data + Opt + CRC8D
+                if crc != buf[pos + 5] or frame_len > max_frame:
+                    # Header-CRC falsch – nur dieses Sync-Byte verwerfen
+                    self.header_crc_errors += 1
+                    self.bytes_skipped += 1
+                    pos += 1
+                    continue
+                if end - pos < frame_len:
+                    break
+                d0 = pos + ESP3_HEADER_LEN
+                d1 = d0 + dl
+                o1 = d1 + ol
+                crc = 0
+                for b in view[d0:o1]:
+                    crc = table[crc ^ b]
+                if crc != buf[o1]:
+                    # Daten-CRC falsch – Sync verwerfen und ab pos+1 weiter
+                    self.data_crc_errors += 1
+                    self.bytes_skipped += 1
+                    pos += 1
+                    continue
+                pos += frame_len
+                if allowed is not None and pt == 0x01 and dl >= 6:
+                    # Sender direkt aus den Rohbytes: RORG | … | ID(4) | Status
+                    sender = (buf[d1 - 5] << 24) | (buf[d1 - 4] << 16) | (buf[d1 - 3] << 8) | buf[d1 - 2]
+                    if sender not in allowed:
+                        if not flt.admit(buf, d0, d1, sender):
+                            self.frames_filtered += 1
+                            if self.on_filtered is not None:
+                                self.on_filtered(view[pos - frame_len:pos])
+                            continue
+                        # Aufgenommen: das Set wurde ersetzt
+                        allowed = flt.allowed
+                self._pos = pos
+                self.frames += 1
+                yield ESP3Packet(pt, view[d0:d1], view[d1:o1], view[pos - frame_len:pos] if keep else None)
+        finally:
+            self._pos = pos
+            del view
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "header_crc_errors": self.header_crc_errors,
+            "data_crc_errors": self.data_crc_errors,
+            "bytes_skipped": self.bytes_skipped,
+            "bytes_dropped": self.bytes_dropped,
+            "overflows": self.overflows,
+            "frames_filtered": self.frames_filtered,
+            "buffered": self._end - self._pos,
+        }
+
+
+def build_frame(packet_type: int, data: bytes, opt: bytes = b"") -> bytes:
+    """Baut einen vollständigen ESP3-Frame (Sync, Header, CRCs)."""
+    header = bytes([(len(data) >> 8) & 0xFF, len(data) & 0xFF, len(opt) & 0xFF, packet_type & 0xFF])
+    crcd = crc8(opt, crc8(data))
+    return b"\x55" + header + bytes([crc8(header)]) + data + opt + bytes([crcd])
+
+
+_BYTE = [bytes((i,)) for i in range(256)]
+
+
+class FrameTemplate:
+    """Vorberechneter ESP3-Frame, in dem nur `data[start:stop]` variabel ist.
+
+    Header, Header-CRC und alle festen Bytes stehen beim Anlegen fest. Die
+    Daten-CRC wird inkrementell gebildet: Der CRC-Stand nach dem festen
+    Anfang ist gespeichert, für den festen Rest (restliche Daten, Optionen)
+    liegt eine 256er-Tabelle "CRC-Stand -> End-CRC" bereit. `render()` kostet
+    eine Tabellen-Abfrage je variablem Byte plus eine.
+    """
+
+    __slots__ = ("_head", "_tail", "_size", "_crc", "_final")
+
+    def __init__(
+        self, packet_type: int, data: bytes, opt: bytes = b"", start: int = 0, stop: Optional[int] = None
+    ):
+        stop = len(data) if stop is None else stop
+        frame = build_frame(packet_type, data, opt)
+        self._head = frame[:ESP3_HEADER_LEN + start]
+        self._tail = frame[ESP3_HEADER_LEN + stop:-1]
+        self._size = stop - start
+        self._crc = crc8(data[:start])
+        rest = bytes(data[stop:]) + bytes(opt)
+        self._final = bytes(crc8(rest, state) for state in range(256))
+
+    def render(self, values: bytes) -> bytes:
+        """Fertiger Frame mit `values` im variablen Bereich."""
+        if len(values) != self._size:
+            raise ValueError(f"{self._size} variable Bytes erwartet, {len(values)} erhalten")
+        table = CRC8_TABLE
+        crc = self._crc
+        for b in values:
+            crc = table[crc ^ b]
+        return b"".join((self._head, bytes(values), self._tail, _BYTE[self._final[crc]]))
+
+
+def encode_raw_hex(hex_string: str) -> bytes:
+    payload = _normalize_hex(hex_string)
+    if not payload:
+        raise ValueError("Leere/ungültige Hex‑Payload")
+
+    # Akzeptiere zwei Modi:
+    # 1) Vollständiger Frame ab 0x55 … inkl. Header/Daten‑CRCs
+    # 2) Nur (PT, DATA, OPT) – wir bauen Header+CRCs
+    if payload[0] == 0x55:
+        return bytes(payload)
+    # Erwartet: PT | DATA… | 0x7C | OPT…  (Separator 0x7C '|' für Aufteilung)
+    # Alternativ akzeptieren wir ein Tripel als Text über Service (siehe __init__.py)
+    raise ValueError(
+        "Sende bitte einen vollständigen ESP3‑Frame beginnend mit 55 … oder nutze den Service mit Feldern pt/data/opt."
+    )
+
+
+def encode_triplet(pt: int, data_hex: str, opt_hex: str = "") -> bytes:
+    data = bytes(_normalize_hex(data_hex)) if data_hex else b""
+    opt = bytes(_normalize_hex(opt_hex)) if opt_hex else b""
+    return build_frame(pt, data, opt)
+
+
+def frame_destination(frame: bytes) -> Optional[int]:
+    """Ziel-ID aus den ERP1-Optionsdaten eines Frames (ohne Broadcast)."""
+    if len(frame) < 7 or frame[4] != 0x01:
+        return None
+    dl = (frame[1] << 8) | frame[2]
+    if frame[3] < 5:
+        return None
+    o = 6 + dl + 1  # SubTelNum überspringen
+    dest = int.from_bytes(frame[o:o + 4], "big")
+    return None if dest == 0xFFFFFFFF else dest
+
+
+def encode_frame_spec(spec: Union[str, dict]) -> bytes:
+    """RAW‑String oder {raw} / {pt, data, opt} -> fertiger Frame."""
+    if isinstance(spec, str):
+        return encode_raw_hex(spec)
+    if spec.get("raw"):
+        return encode_raw_hex(str(spec["raw"]))
+    if spec.get("pt") is not None and spec.get("data") is not None:
+        return encode_triplet(int(spec["pt"]), str(spec["data"]), str(spec.get("opt", "")))
+    raise ValueError("Entweder 'raw' ODER ('pt' und 'data') angeben")
+
+
+def _normalize_hex(s: str) -> bytearray:
+    s = s.strip().replace(" ", "").replace("-", "").replace(":", "")
+    if s.startswith("0x") or s.startswith("0X"):
+        s = s[2:]
+    if len(s) % 2 != 0:
+        raise ValueError("Ungerade Hex‑Länge")
+    try:
+        return bytearray(binascii.unhexlify(s))
+    except binascii.Error as e:
+        raise ValueError(f"Ungültige Hexdaten: {e}")
+
+
+def encode_frame_specs(
+    specs: List[Union[str, dict]],
+) -> Tuple[List[dict], List[Tuple[int, bytes]]]:
+    """Kodiert eine Liste von Frame-Angaben vorab.
+
+    Liefert die Ergebnisliste (ungültige Einträge bereits mit `error`) und
+    die gültigen Frames als `(Index in der Ergebnisliste, Frame)`.
+    """
+    results: List[dict] = []
+    jobs: List[Tuple[int, bytes]] = []
+    for idx, spec in enumerate(specs):
+        try:
+            frame = encode_frame_spec(spec)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            results.append({"index": idx, "ok": False, "error": str(e)})
+            continue
+        jobs.append((idx, frame))
+        results.append({"index": idx, "ok": False})
+    return results, jobs
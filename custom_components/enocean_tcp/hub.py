@@ -1,142 +1,171 @@
 from __future__ import annotations
 import asyncio
-import binascii
 import logging
-from typing import Optional, Tuple
+import random
+import socket
+import time
+from typing import Callable, List, Optional, Sequence, Tuple, Union
 
 from homeassistant.core import HomeAssistant, callback
-from .const import EVENT_FRAME
+from .allowlist import SenderFilter
+from .capture import DIR_TX, CaptureWriter
+from .const import (
+    DEFAULT_DEDUP_WINDOW_MS,
+    DEFAULT_KEEPALIVE_S,
+    DEFAULT_RECONNECT_MAX_S,
+    DEFAULT_RECONNECT_S,
+    DEFAULT_TX_PACING_MS,
+    DEFAULT_TX_RESPONSE_TIMEOUT_S,
+    ms_to_s,
+)
+from .esp3 import (
+    ESP3Packet,
+    ESP3StreamParser,
+    build_frame,
+    encode_frame_specs,
+    encode_raw_hex,
+    encode_triplet,
+)
+from .tx import (
+    CO_RD_VERSION,
+    PACKET_TYPE_COMMON_COMMAND,
+    PACKET_TYPE_RESPONSE,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    TransmitError,
+    TxQueue,
+)
+from .linkstats import LinkHistory, LinkStats
+from .manager import EnOceanTCPManager, PacketCallback
+from .metrics import ReceiveMetrics
+from .transport import ESP3Protocol
+from .worker import PacketBatcher, ParseWorker, ThreadedProtocol
 
 _LOGGER = logging.getLogger(__name__)
 
-# --- ESP3 Hilfsfunktionen ---
+# Verbindung gilt als stabil (Backoff zurücksetzen), wenn sie so lange hielt
+STABLE_CONNECTION = 60.0  # Sekunden
+PROBE_TIMEOUT = 5.0  # Sekunden bis zur Antwort auf CO_RD_VERSION
+CLOSE_TIMEOUT = 2.0  # Sekunden für geordnetes Schließen, danach abort()
+PROBE_FRAME = build_frame(PACKET_TYPE_COMMON_COMMAND, bytes([CO_RD_VERSION]))
 
-def _crc8(data: bytes) -> int:
-    # Polynom 0x07, Initial 0x00 – Standard ESP3 CRC8
-    crc = 0
-    for b in data:
-        crc ^= b
-        for _ in range(8):
-            if crc & 0x80:
-                crc = ((crc << 1) ^ 0x07) & 0xFF
-            else:
-                crc = (crc << 1) & 0xFF
-    return crc
-
-class ESP3Packet:
-    """Minimaler ESP3 Parser für ERP1 (Typ 0x01) und generische Pakete."""
+LINK_CONNECTING = "connecting"
+LINK_CONNECTED = "connected"
+LINK_BACKOFF = "backoff"
+LINK_STOPPED = "stopped"
 
-    def __init__(self, packet_type: int, data: bytes, opt: bytes):
-        self.packet_type = packet_type
-        self.data = data
-        self.opt = opt
 
-    @property
-    def rorg(self) -> Optional[int]:
-        # Bei ERP1 ist erstes Datenbyte RORG (z.B. 0xF6, 0xD2, 0xA5, ...)
-        if self.packet_type == 0x01 and len(self.data) > 0:
-            return self.data[0]
-        return None
-
-    @property
-    def sender_id(self) -> Optional[str]:
-        # Bei ERP1 ist die Sender-ID typischerweise die letzten 4 Bytes vor Status
-        if self.packet_type == 0x01 and len(self.data) >= 6:
-            # data: RORG | payload.. | sender(4) | status(1)
-            sid = self.data[-5:-1]
-            return sid.hex().upper()
-        return None
+def _set_keepalive(sock: Optional[socket.socket], idle: int) -> None:
+    """TCP-Keepalive und TCP_USER_TIMEOUT setzen (soweit das OS sie kennt).
 
-    @property
-    def status(self) -> Optional[int]:
-        if self.packet_type == 0x01 and len(self.data) >= 1:
-            return self.data[-1]
-        return None
-
-    def as_dict(self) -> dict:
-        d = {
-            "packet_type": self.packet_type,
-            "data_hex": self.data.hex().upper(),
-            "opt_hex": self.opt.hex().upper(),
-        }
-        if self.rorg is not None:
-            d["rorg"] = self.rorg
-        if self.sender_id is not None:
-            d["sender_id"] = self.sender_id
-        if self.status is not None:
-            d["status"] = self.status
-        return d
-
-class ESP3StreamParser:
-    """Zustandsmaschine zum Parsen von ESP3-Frames aus einem Bytestrom."""
-
-    def __init__(self):
-        self._buf = bytearray()
-
-    def feed(self, chunk: bytes):
-        self._buf.extend(chunk)
-
-    def packets(self):
-        # Liefert 0..n komplette Packets; behält Rest im Buffer
-        out = []
-        while True:
-            pkt = self._try_extract_packet()
-            if not pkt:
-                break
-            out.append(pkt)
-        return out
+    Halboffene Verbindungen werden so nach etwa `idle` + 3 Proben erkannt,
+    auch wenn nie wieder Daten kommen.
+    """
+    if sock is None or idle <= 0:
+        return
+    interval = max(1, idle // 3)
+    opts = (
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        (socket.IPPROTO_TCP, getattr(socket, "TCP_KEEPIDLE", None), idle),
+        (socket.IPPROTO_TCP, getattr(socket, "TCP_KEEPINTVL", None), interval),
+        (socket.IPPROTO_TCP, getattr(socket, "TCP_KEEPCNT", None), 3),
+        # Unbestätigte Sendedaten: gleiche Frist in Millisekunden
+        (socket.IPPROTO_TCP, getattr(socket, "TCP_USER_TIMEOUT", None), (idle + 3 * interval) * 1000),
+    )
+    for level, opt, value in opts:
+        if opt is None:
+            continue
+        try:
+            sock.setsockopt(level, opt, value)
+        except OSError as e:
+            _LOGGER.debug("enocean_tcp: Socket-Option %s nicht gesetzt: %s", opt, e)
 
-    def _try_extract_packet(self) -> Optional[ESP3Packet]:
-        buf = self._buf
-        # Suche nach Sync 0x55
-        while True:
-            idx = buf.find(b"\x55")
-            if idx == -1:
-                # Kein Sync im Buffer
-                self._buf = bytearray()
-                return None
-            if idx > 0:
-                del buf[:idx]
-            if len(buf) < 6:
-                return None
-            # Header nach Sync: DL(2), OL(1), PT(1), CRC8H(1)
-            dl = (buf[1] << 8) | buf[2]
-            ol = buf[3]
-            pt = buf[4]
-            crch = buf[5]
-            header = bytes([buf[1], buf[2], buf[3], buf[4]])
-            if _crc8(header) != crch:
-                # Header-CRC falsch – Sync verwerfen und neu suchen
-                del buf[0]
-                continue
-            frame_len = 6 + dl + ol + 1  # Sync+Header(6) + Data + Opt + CRC8D
-            if len(buf) < frame_len:
-                return None
-            data = bytes(buf[6:6+dl])
-            opt = bytes(buf[6+dl:6+dl+ol])
-            crcd = buf[6+dl+ol]
-            if _crc8(data + opt) != crcd:
-                # Daten-CRC falsch – Sync verwerfen und weiter
-                del buf[0]
-                continue
-            # Gültig – entferne Frame aus Buffer
-            del buf[:frame_len]
-            return ESP3Packet(pt, data, opt)
 
 class EnOceanTCPHub:
-    def __init__(self, hass: HomeAssistant, host: str, port: int, reconnect_interval: int = 5):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        reconnect_interval: int = DEFAULT_RECONNECT_S,
+        fire_events: bool = True,
+        event_batch: Optional[float] = None,
+        tx_pacing: float = ms_to_s(DEFAULT_TX_PACING_MS),
+        tx_response_timeout: float = DEFAULT_TX_RESPONSE_TIMEOUT_S,
+        dedup_window: float = ms_to_s(DEFAULT_DEDUP_WINDOW_MS),
+        manager: Optional[EnOceanTCPManager] = None,
+        name: Optional[str] = None,
+        reconnect_max: float = DEFAULT_RECONNECT_MAX_S,
+        keepalive: int = DEFAULT_KEEPALIVE_S,
+        probe_interval: float = 0,
+        capture: Optional[CaptureWriter] = None,
+        sender_filter: Optional[SenderFilter] = None,
+        worker: Optional[ParseWorker] = None,
+        link_history: int = 0,
+    ):
         self.hass = hass
         self.host = host
         self.port = port
+        self.name = name or f"{host}:{port}"
         self.reconnect_interval = reconnect_interval
-        self._reader: Optional[asyncio.StreamReader] = None
-        self._writer: Optional[asyncio.StreamWriter] = None
+        self.reconnect_max = reconnect_max
+        self.keepalive = keepalive
+        # Ohne empfangene Daten nach so vielen Sekunden CO_RD_VERSION senden
+        self.probe_interval = probe_interval
+        self._probe_waiter: Optional[asyncio.Future] = None
+        # Optionaler Mitschnitt aller empfangenen und gesendeten Frames
+        self.capture = capture
+        self._last_rx = 0.0
+        self._protocol: Optional[Union[ESP3Protocol, ThreadedProtocol]] = None
+        # Optional: Lesen/Parsen im Worker-Thread, Pakete kommen gebündelt
+        self.worker = worker
+        self._batcher: Optional[PacketBatcher] = None
+        if worker is not None:
+            self._batcher = PacketBatcher(hass.loop, self._dispatch, self._on_data)
         self._task: Optional[asyncio.Task] = None
         self._stopped = asyncio.Event()
-        self._parser = ESP3StreamParser()
+        # Optional: fremde Sender schon im Parser verwerfen
+        self.sender_filter = sender_filter
+        self._parser = ESP3StreamParser(
+            sender_filter=sender_filter,
+            keep_frames=capture is not None,
+            on_filtered=capture.record_filtered if capture is not None else None,
+        )
+        self.fire_events = fire_events
+        # None = ein Event je Frame, sonst Sammelfenster in s (0 = je Lesevorgang)
+        self.event_batch = event_batch
+        self._tx = TxQueue(self._write_frames, tx_pacing, tx_response_timeout)
+        self.dedup_window = dedup_window
+        # Optional: Pegel, Repeater-Stufe und Abstände je Sender
+        self.link_history_size = link_history
+        self.link_stats: Optional[LinkStats] = None
+        if link_history > 0:
+            self.link_stats = LinkStats(link_history, min_gap=dedup_window)
+        # Gemeinsame Dekodier-/Dispatch-Stufe aller Gateways
+        self.manager = manager if manager is not None else EnOceanTCPManager(hass)
+        # Nur Pakete dieses Gateways (vor der Duplikatfilterung), für Diagnose
+        self._gateway_subs: List[PacketCallback] = []
+        # Verbindungsstatistik
+        self.connected_since: Optional[float] = None
+        self.bytes_received = 0
+        # Parse-/Dispatch-Latenz je Paket (über Verbindungen hinweg)
+        self.metrics = ReceiveMetrics()
+        self.connects = 0
+        self.disconnects = 0
+        self.probe_failures = 0
+        self.link_state = LINK_STOPPED
+        self.link_state_since = time.time()
+        self._lost_at: Optional[float] = None
+        # Zeit vom Verbindungsverlust bis zur erneuten Verbindung
+        self.reconnect_latency: Optional[float] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._protocol is not None
 
     async def start(self):
         self._stopped.clear()
+        self._tx.start()
         self._task = asyncio.create_task(self._run())
 
     async def stop(self):
@@ -147,26 +176,100 @@ class EnOceanTCPHub:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        await self._tx.stop()
         await self._close()
+        self._set_link_state(LINK_STOPPED)
 
-    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    def _set_link_state(self, state: str) -> None:
+        if state == self.link_state:
+            return
+        _LOGGER.debug("enocean_tcp: %s: %s -> %s", self.name, self.link_state, state)
+        self.link_state = state
+        self.link_state_since = time.time()
+
+    def create_protocol(self, on_made=None) -> ESP3Protocol:
+        """Protokoll-Instanz, die direkt in den Parser dieses Hubs liest.
+
+        Im Worker-Modus lebt sie im Worker-Loop und liefert über den Batcher.
+        """
+        if self._batcher is not None:
+            batcher = self._batcher
+            return ESP3Protocol(self._parser, batcher.packet, batcher.data, on_made, self.metrics)
+        return ESP3Protocol(self._parser, self._dispatch, self._on_data, on_made, self.metrics)
+
+    async def _connect(self) -> Union[ESP3Protocol, ThreadedProtocol]:
         _LOGGER.info("enocean_tcp: Verbinde zu %s:%s", self.host, self.port)
-        return await asyncio.open_connection(self.host, self.port)
+        worker = self.worker
+        if worker is not None:
+            _, protocol = await worker.run(
+                worker.loop.create_connection(self.create_protocol, self.host, self.port)
+            )
+            return ThreadedProtocol(worker, protocol)
+        loop = asyncio.get_running_loop()
+        _, protocol = await loop.create_connection(self.create_protocol, self.host, self.port)
+        return protocol
+
+    async def serve_connection(self, protocol: Union[ESP3Protocol, ThreadedProtocol]):
+        """Betreibt eine vom Gateway aufgebaute Verbindung bis zu ihrem Ende.
+
+        Server-Modus: kein eigener Verbindungsaufbau und kein Reconnect.
+        """
+        self._stopped.clear()
+        self._tx.start()
+        self._attach(protocol)
+        try:
+            await self._read_loop()
+        except OSError as e:
+            _LOGGER.info("enocean_tcp: Gateway %s getrennt: %s", self.name, e)
+        finally:
+            await self._tx.stop()
+            await self._close()
+            self._set_link_state(LINK_STOPPED)
+
+    def _attach(self, protocol: Union[ESP3Protocol, ThreadedProtocol]):
+        _set_keepalive(protocol.transport.get_extra_info("socket"), self.keepalive)
+        self._protocol = protocol
+        self.connected_since = time.time()
+        self.connects += 1
+        now = time.monotonic()
+        if self._lost_at is not None:
+            self.reconnect_latency = now - self._lost_at
+            self._lost_at = None
+        self._set_link_state(LINK_CONNECTED)
 
     async def _close(self):
-        if self._writer:
+        self._tx.connection_lost()
+        protocol = self._protocol
+        if protocol:
+            self.disconnects += 1
+            self._lost_at = time.monotonic()
+            protocol.close()
             try:
-                self._writer.close()
-                await self._writer.wait_closed()
-            except Exception:  # noqa
-                pass
-        self._reader = None
-        self._writer = None
+                await asyncio.wait_for(protocol.wait_closed(), CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Gegenstelle nimmt nichts mehr an (halboffen) – hart trennen
+                protocol.abort()
+        self._protocol = None
+        self.connected_since = None
+
+    def _backoff(self, failures: int) -> float:
+        """Exponentieller Backoff mit Jitter.
+
+        Der Zufallsanteil verteilt die Reconnects vieler HA-Instanzen nach
+        einem Gateway-Neustart, statt sie im Gleichtakt anklopfen zu lassen.
+        """
+        base = max(self.reconnect_interval, 0.1)
+        ceiling = min(self.reconnect_max, base * 2 ** min(failures, 16))
+        return random.uniform(ceiling / 2, ceiling)
 
     async def _run(self):
+        failures = 0
         while not self._stopped.is_set():
+            self._set_link_state(LINK_CONNECTING)
+            up_since = None
             try:
-                self._reader, self._writer = await self._connect()
+                self._attach(await self._connect())
+                up_since = time.monotonic()
                 _LOGGER.info("enocean_tcp: verbunden")
                 await self._read_loop()
             except asyncio.CancelledError:
@@ -176,68 +279,211 @@ class EnOceanTCPHub:
             await self._close()
             if self._stopped.is_set():
                 break
-            await asyncio.sleep(self.reconnect_interval)
+            if up_since is not None and time.monotonic() - up_since >= STABLE_CONNECTION:
+                failures = 0
+            delay = self._backoff(failures)
+            failures += 1
+            self._set_link_state(LINK_BACKOFF)
+            _LOGGER.debug("enocean_tcp: neuer Verbindungsversuch in %.1f s", delay)
+            await asyncio.sleep(delay)
 
     async def _read_loop(self):
-        while not self._stopped.is_set():
-            chunk = await self._reader.read(4096)
-            if not chunk:
-                raise ConnectionError("EOF vom TCP‑Stick")
-            self._parser.feed(chunk)
-            for pkt in self._parser.packets():
-                self._emit_event(pkt)
+        """Wartet auf das Verbindungsende; empfangen wird im Protokoll-Callback."""
+        self._last_rx = asyncio.get_running_loop().time()
+        probe = None
+        if self.probe_interval > 0:
+            probe = asyncio.create_task(self._probe_loop())
+        try:
+            exc = await self._protocol.wait_closed()
+        finally:
+            if probe is not None:
+                probe.cancel()
+        raise ConnectionError(str(exc) if exc else "EOF vom TCP‑Stick")
 
-    @callback
-    def _emit_event(self, pkt: ESP3Packet):
-        data = pkt.as_dict()
-        # Rohframe (ohne Sync/CRC) wieder zusammenbauen für Referenz
-        raw_hex = f"PT={pkt.packet_type:02X} DATA={pkt.data.hex().upper()} OPT={pkt.opt.hex().upper()}"
-        data["raw"] = raw_hex
-        self.hass.bus.async_fire(EVENT_FRAME, data)
-
-    async def send_raw_hex(self, hex_string: str):
-        """Sendet einen kompletten ESP3‑Frame in Hex (mit oder ohne Sync/CRCs)."""
-        payload = _normalize_hex(hex_string)
-        if not payload:
-            raise ValueError("Leere/ungültige Hex‑Payload")
-
-        # Akzeptiere zwei Modi:
-        # 1) Vollständiger Frame ab 0x55 … inkl. Header/Daten‑CRCs
-        # 2) Nur (PT, DATA, OPT) – wir bauen Header+CRCs
-        if payload[0] == 0x55:
-            frame = bytes(payload)
-        else:
-            # Erwartet: PT | DATA… | 0x7C | OPT…  (Separator 0x7C '|' für Aufteilung)
-            # Alternativ akzeptieren wir ein Tripel als Text über Service (siehe __init__.py)
-            raise ValueError(
-                "Sende bitte einen vollständigen ESP3‑Frame beginnend mit 55 … oder nutze den Service mit Feldern pt/data/opt."
+    def _on_data(self, nbytes: int) -> None:
+        self._last_rx = self.hass.loop.time()
+        self.bytes_received += nbytes
+        waiter = self._probe_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _probe_loop(self):
+        """Liveness-Probe: nach `probe_interval` Funkstille CO_RD_VERSION senden.
+
+        Kommt innerhalb von `PROBE_TIMEOUT` nichts zurück (irgendein Byte
+        genügt), wird die Verbindung verworfen und neu aufgebaut.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            idle = loop.time() - self._last_rx
+            if idle < self.probe_interval:
+                await asyncio.sleep(self.probe_interval - idle)
+                continue
+            waiter = self._probe_waiter = loop.create_future()
+            try:
+                await asyncio.wait_for(self._tx.send(PROBE_FRAME, PRIORITY_HIGH), PROBE_TIMEOUT)
+                await asyncio.wait_for(waiter, PROBE_TIMEOUT)
+            except (asyncio.TimeoutError, TransmitError, ConnectionError):
+                pass
+            finally:
+                self._probe_waiter = None
+            # wait_for bricht den Waiter bei Timeout ab – nur ein Ergebnis zählt
+            if waiter.done() and not waiter.cancelled():
+                continue
+            self.probe_failures += 1
+            _LOGGER.warning(
+                "enocean_tcp: %s antwortet nicht auf CO_RD_VERSION – Verbindung wird neu aufgebaut",
+                self.name,
             )
+            if self._protocol is not None:
+                # Lese-Schleife endet darauf mit EOF
+                self._protocol.abort()
+            return
+
+    @callback
+    def async_subscribe(
+        self,
+        cb: PacketCallback,
+        sender: Optional[int] = None,
+        rorg: Optional[int] = None,
+    ) -> Callable[[], None]:
+        """Abo auf den zusammengeführten Strom aller Gateways (siehe Manager)."""
+        return self.manager.async_subscribe(cb, sender, rorg)
+
+    @callback
+    def async_subscribe_gateway(self, cb: PacketCallback) -> Callable[[], None]:
+        """Abo auf alle Pakete, die genau dieses Gateway empfangen hat."""
+        self._gateway_subs = [*self._gateway_subs, cb]
+
+        @callback
+        def _unsub() -> None:
+            self._gateway_subs = [c for c in self._gateway_subs if c is not cb]
+
+        return _unsub
+
+    @callback
+    def _dispatch(self, pkt: ESP3Packet):
+        if pkt.packet_type == PACKET_TYPE_RESPONSE:
+            self._tx.handle_response(pkt)
+        elif self.link_stats is not None and pkt.sender is not None:
+            self.link_stats.record(pkt.sender, pkt.dbm, pkt.status)
+        for cb in self._gateway_subs:
+            try:
+                cb(pkt)
+            except Exception:  # noqa
+                _LOGGER.exception("enocean_tcp: Fehler im Paket-Callback")
+        delivered = self.manager.handle_packet(self, pkt)
+        if self.capture is not None:
+            # Duplikate mit Flag, damit der Mitschnitt dem Funkverkehr entspricht
+            self.capture.record_packet(pkt, dropped=not delivered)
+
+    @property
+    def tx_stats(self) -> dict:
+        return self._tx.stats
+
+    @property
+    def stats(self) -> dict:
+        """Kennzahlen dieser Verbindung (Parser, Sende-Warteschlange)."""
+        return {
+            "name": self.name,
+            "peer": f"{self.host}:{self.port}",
+            "connected": self.connected,
+            "connected_since": self.connected_since,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "link_state": self.link_state,
+            "link_state_since": self.link_state_since,
+            "reconnect_latency": self.reconnect_latency,
+            "probe_failures": self.probe_failures,
+            "bytes_received": self.bytes_received,
+            **self._parser.stats,
+            **self.metrics.stats,
+            "tx": self._tx.stats,
+            "worker": self._batcher.stats if self._batcher is not None else None,
+        }
 
-        if not self._writer:
+    @property
+    def counters(self) -> dict:
+        """Flache Zähler für Sensoren (billig, ohne Histogramm-Aufbereitung)."""
+        parser = self._parser
+        return {
+            "bytes_received": self.bytes_received,
+            "reads": self.metrics.reads,
+            "frames": parser.frames,
+            "frames_filtered": parser.frames_filtered,
+            "header_crc_errors": parser.header_crc_errors,
+            "data_crc_errors": parser.data_crc_errors,
+            "bytes_skipped": parser.bytes_skipped,
+            "bytes_dropped": parser.bytes_dropped,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "probe_failures": self.probe_failures,
+            "tx_queued": self._tx.depth,
+            "tx_sent": self._tx.sent,
+            "tx_timeouts": self._tx.timeouts,
+            "tx_errors": self._tx.errors,
+            "worker_overflows": self._batcher.overflows if self._batcher is not None else 0,
+        }
+
+    @property
+    def dedup_stats(self) -> Optional[dict]:
+        return self.manager.dedup_stats
+
+    @property
+    def link_quality(self) -> Optional[dict]:
+        """Funkqualität aller gehörten Sender (Perzentile werden hier berechnet)."""
+        return self.link_stats.as_dict() if self.link_stats is not None else None
+
+    def link_history(self, sender: int) -> Optional[LinkHistory]:
+        return self.link_stats.get(sender) if self.link_stats is not None else None
+
+    async def _write_frames(self, frames: Sequence[bytes]):
+        # Wird nur vom Sende-Worker aufgerufen – kein Verschachteln von Frames
+        if not self._protocol:
             raise ConnectionError("Nicht verbunden – kann nicht senden")
-        self._writer.write(frame)
-        await self._writer.drain()
-
-    async def send_triplet(self, pt: int, data_hex: str, opt_hex: str = ""):
-        data = bytes.fromhex(data_hex.replace(" ", "")) if data_hex else b""
-        opt = bytes.fromhex(opt_hex.replace(" ", "")) if opt_hex else b""
-        header = bytes([(len(data) >> 8) & 0xFF, len(data) & 0xFF, len(opt) & 0xFF, pt & 0xFF])
-        crch = _crc8(header)
-        crcd = _crc8(data + opt)
-        frame = b"\x55" + header + bytes([crch]) + data + opt + bytes([crcd])
-        if not self._writer:
+        if self.capture is not None:
+            self.capture.record_frames(DIR_TX, frames)
+        await self._protocol.write(frames[0] if len(frames) == 1 else b"".join(frames))
+
+    async def send_frame(self, frame: bytes, priority: int) -> Optional[int]:
+        if not self._protocol:
             raise ConnectionError("Nicht verbunden – kann nicht senden")
-        self._writer.write(frame)
-        await self._writer.drain()
-
-
-def _normalize_hex(s: str) -> bytearray:
-    s = s.strip().replace(" ", "").replace("-", "").replace(":", "")
-    if s.startswith("0x") or s.startswith("0X"):
-        s = s[2:]
-    if len(s) % 2 != 0:
-        raise ValueError("Ungerade Hex‑Länge")
-    try:
-        return bytearray(binascii.unhexlify(s))
-    except binascii.Error as e:
-        raise ValueError(f"Ungültige Hexdaten: {e}")
\ No newline at end of file
+        return await self._tx.send(frame, priority)
+
+    async def send_raw_hex(self, hex_string: str, priority: int = PRIORITY_NORMAL):
+        """Sendet einen kompletten ESP3‑Frame in Hex (mit oder ohne Sync/CRCs)."""
+        return await self.send_frame(encode_raw_hex(hex_string), priority)
+
+    async def send_triplet(
+        self, pt: int, data_hex: str, opt_hex: str = "", priority: int = PRIORITY_NORMAL
+    ):
+        return await self.send_frame(encode_triplet(pt, data_hex, opt_hex), priority)
+
+    async def send_batch(
+        self, frames: List[Union[str, dict]], priority: int = PRIORITY_NORMAL
+    ) -> List[dict]:
+        """Sendet viele Frames in einem Auftrag.
+
+        Jeder Eintrag ist ein RAW‑Hex‑String oder ein Dict mit `raw` bzw.
+        `pt`/`data`/`opt`. Alle Einträge werden vorab kodiert; ungültige
+        werden nicht gesendet. Ergebnis je Eintrag: `ok`, `return_code`,
+        ggf. `error`.
+        """
+        results, jobs = encode_frame_specs(frames)
+        if jobs:
+            await self.send_encoded(jobs, results, priority)
+        return results
+
+    async def send_encoded(
+        self, jobs: List[Tuple[int, bytes]], results: List[dict], priority: int = PRIORITY_NORMAL
+    ) -> None:
+        """Sendet kodierte Frames `(slot, frame)` und trägt Ergebnisse in `results` ein."""
+        if not self._protocol:
+            raise ConnectionError("Nicht verbunden – kann nicht senden")
+        frames = [frame for _, frame in jobs]
+        for (slot, _), res in zip(jobs, await self._tx.send_batch(frames, priority)):
+            if isinstance(res, Exception):
+                results[slot]["error"] = str(res)
+            else:
+                results[slot]["ok"] = True
+                results[slot]["return_code"] = res
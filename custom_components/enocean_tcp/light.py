@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from homeassistant.components.light import ATTR_BRIGHTNESS, ColorMode, LightEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .entity import EnOceanTCPActuatorEntity, async_setup_actuators
+
+PLATFORM = "light"
+
+
+class EnOceanTCPLight(EnOceanTCPActuatorEntity, LightEntity):
+    """Dimmer: HA-Helligkeit 0..255 <-> Ausgangswert 0..100."""
+
+    _attr_color_mode = ColorMode.BRIGHTNESS
+    _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
+
+    @property
+    def brightness(self) -> Optional[int]:
+        if self._output is None:
+            return None
+        return round(self._output * 255 / 100)
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        if ATTR_BRIGHTNESS in kwargs:
+            value = max(1, round(kwargs[ATTR_BRIGHTNESS] * 100 / 255))
+            await self._async_send(self._actuator.dim(value), value)
+        else:
+            # Tatsächlichen Wert liefert ggf. die Rückmeldung des Aktors
+            await self._async_send(self._actuator.switch(True), 100)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        await self._async_send(self._actuator.switch(False), 0)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    await async_setup_actuators(hass, entry, async_add_entities, PLATFORM, EnOceanTCPLight)
@@ -0,0 +1,154 @@
+"""Funkqualität je Sender in kompakten Ringpuffern (ohne HA-Abhängigkeit).
+
+Je Sender und Gateway liegen die letzten `size` Telegramme in drei
+`array`-Ringpuffern: Pegel (dBm, 1 Byte), Repeater-Stufe aus dem
+ERP1-Statusbyte (Bits 0..3, 1 Byte) und Abstand zum vorigen Telegramm
+(ms, 4 Byte). Im Empfangspfad wird nur geschrieben; Perzentile entstehen
+erst beim Auslesen (Diagnose, Sensoren).
+
+Speicher ist hart begrenzt: höchstens `max_senders` Sender, danach ersetzt
+ein neuer Sender den am längsten stummen und übernimmt dessen Puffer.
+Kopien desselben Telegramms (Repeater, Mehrwege) innerhalb von `min_gap`
+landen mit Pegel und Repeater-Stufe im Puffer, zählen aber nicht als neuer
+Abstand.
+"""
+from __future__ import annotations
+
+import time
+from array import array
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+DEFAULT_SIZE = 64  # Telegramme je Sender
+DEFAULT_MAX_SENDERS = 2000
+MAX_GAP_MS = 0xFFFFFFFF
+REPEATER_MASK = 0x0F
+
+
+def _percentile(values: List[int], q: float) -> Optional[int]:
+    """Nächster Rang auf einer sortierten Liste."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _filled(buf: array, n: int) -> List[int]:
+    # Der Ring füllt sich ab Platz 0; Reihenfolge spielt für Perzentile keine Rolle
+    return buf.tolist()[:n]
+
+
+class LinkHistory:
+    """Ringpuffer eines Senders."""
+
+    __slots__ = ("dbm", "repeater", "gap", "pos", "count", "gaps", "telegrams", "last_mono", "last_seen")
+
+    def __init__(self, size: int):
+        self.dbm = array("b", bytes(size))
+        self.repeater = array("B", bytes(size))
+        self.gap = array("I", bytes(4 * size))
+        self.reset()
+
+    def reset(self) -> None:
+        self.pos = 0  # nächster Schreibplatz in dbm/repeater
+        self.count = 0  # gefüllte Plätze in dbm/repeater
+        self.gaps = 0  # bisher geschriebene Abstände (Ring über `gap`)
+        self.telegrams = 0
+        self.last_mono = 0.0
+        self.last_seen = 0.0
+
+    def as_dict(self) -> dict:
+        dbm = sorted(_filled(self.dbm, self.count))
+        repeated = sum(1 for r in _filled(self.repeater, self.count) if r)
+        gaps = [ms / 1000 for ms in sorted(_filled(self.gap, self.gaps))]
+        return {
+            "telegrams": self.telegrams,
+            "samples": self.count,
+            "last_seen": self.last_seen,
+            "dbm_min": dbm[0] if dbm else None,
+            "dbm_p10": _percentile(dbm, 0.1),
+            "dbm_p50": _percentile(dbm, 0.5),
+            "dbm_p90": _percentile(dbm, 0.9),
+            "dbm_max": dbm[-1] if dbm else None,
+            "repeated_ratio": repeated / self.count if self.count else None,
+            "interval_p50_s": _percentile(gaps, 0.5),
+            "interval_p90_s": _percentile(gaps, 0.9),
+            "interval_max_s": gaps[-1] if gaps else None,
+        }
+
+
+class LinkStats:
+    """Funkqualität aller Sender, die ein Gateway gehört hat."""
+
+    def __init__(
+        self,
+        size: int = DEFAULT_SIZE,
+        max_senders: int = DEFAULT_MAX_SENDERS,
+        min_gap: float = 0.0,
+    ):
+        self.size = size
+        self.max_senders = max_senders
+        self.min_gap = min_gap
+        # Reihenfolge = zuletzt gehört (ältester vorne): Verdrängen in O(1)
+        self._senders: "OrderedDict[int, LinkHistory]" = OrderedDict()
+        self.evicted = 0
+
+    def record(self, sender: int, dbm: Optional[int], status: Optional[int], now: Optional[float] = None) -> None:
+        hist = self._senders.get(sender)
+        if hist is None:
+            hist = self._new(sender)
+        else:
+            self._senders.move_to_end(sender)
+        mono = now if now is not None else time.monotonic()
+        last = hist.last_mono
+        # Kopien innerhalb von min_gap: Pegel zählt, Abstand nicht
+        if not hist.telegrams or mono - last >= self.min_gap:
+            if hist.telegrams:
+                ms = int((mono - last) * 1000)
+                hist.gap[hist.gaps % self.size] = ms if ms < MAX_GAP_MS else MAX_GAP_MS
+                hist.gaps += 1
+            hist.last_mono = mono
+            hist.last_seen = time.time()
+        pos = hist.pos
+        # dBm aus den Optionsdaten ist 0..-255; array("b") fasst bis -128
+        hist.dbm[pos] = dbm if dbm is not None and dbm > -128 else -128
+        hist.repeater[pos] = status & REPEATER_MASK if status is not None else 0
+        hist.pos = pos + 1 if pos + 1 < self.size else 0
+        if hist.count < self.size:
+            hist.count += 1
+        hist.telegrams += 1
+
+    def _new(self, sender: int) -> LinkHistory:
+        senders = self._senders
+        if len(senders) >= self.max_senders:
+            # Am längsten stummen Sender verdrängen und seinen Puffer weiterverwenden
+            _, hist = senders.popitem(last=False)
+            hist.reset()
+            self.evicted += 1
+        else:
+            hist = LinkHistory(self.size)
+        senders[sender] = hist
+        return hist
+
+    def get(self, sender: int) -> Optional[LinkHistory]:
+        return self._senders.get(sender)
+
+    def __len__(self) -> int:
+        return len(self._senders)
+
+    def items(self) -> Iterator[Tuple[int, LinkHistory]]:
+        return iter(self._senders.items())
+
+    @property
+    def memory_bytes(self) -> int:
+        """Nutzdaten der Ringpuffer (ohne Objekt-Overhead)."""
+        return len(self._senders) * self.size * 6
+
+    def as_dict(self) -> dict:
+        return {
+            "senders": len(self._senders),
+            "max_senders": self.max_senders,
+            "size": self.size,
+            "evicted": self.evicted,
+            "memory_bytes": self.memory_bytes,
+            "devices": {f"{sender:08X}": hist.as_dict() for sender, hist in self._senders.items()},
+        }
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, EVENT_FRAME, EVENT_FRAMES
+from .dedup import DedupCache
+from .esp3 import ESP3Packet, encode_frame_specs, frame_destination
+from .tx import PRIORITY_NORMAL
+
+if TYPE_CHECKING:
+    from .hub import EnOceanTCPHub
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_MANAGER = f"{DOMAIN}_manager"
+
+# Empfangswege älter als das zählen für die Gateway-Wahl nicht mehr
+ROUTE_MAX_AGE = 600.0  # Sekunden
+# Obergrenze gemerkter Sender (fremde Sender ohne Filter), LRU wie DedupCache
+ROUTE_MAX_SENDERS = 1024
+
+PacketCallback = Callable[[ESP3Packet], None]
+
+
+@callback
+def async_get_manager(hass: HomeAssistant) -> "EnOceanTCPManager":
+    """Gemeinsamer Manager aller Gateways (ein Objekt pro HA-Instanz)."""
+    manager = hass.data.get(DATA_MANAGER)
+    if manager is None:
+        manager = hass.data[DATA_MANAGER] = EnOceanTCPManager(hass)
+    return manager
+
+
+class EnOceanTCPManager:
+    """Führt die Empfangsströme aller Gateways zusammen.
+
+    Jedes Gateway (`EnOceanTCPHub`) parst seinen Strom selbst und reicht
+    Pakete hier ein. Der Manager merkt sich, welches Gateway welchen Sender
+    mit welchem Pegel gehört hat, unterdrückt Kopien desselben Telegramms
+    über Gateways hinweg und verteilt jedes Telegramm genau einmal an die
+    Abonnenten.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.hubs: List["EnOceanTCPHub"] = []
+        self._dedup: Optional[DedupCache] = None
+        # Abos je (Sender, RORG); None = Wildcard. Listen werden bei
+        # Änderungen ersetzt, damit Dispatch ohne Kopie iterieren kann.
+        self._subs: Dict[Tuple[Optional[int], Optional[int]], List[PacketCallback]] = {}
+        # Sender -> {Gateway: (dBm, Zeitpunkt)}, zuletzt gehörte Sender hinten
+        self._routes: "OrderedDict[int, Dict[EnOceanTCPHub, Tuple[Optional[int], float]]]" = OrderedDict()
+        self.routes_pruned = 0
+        # (Plattform, Sender) -> Eigentümer (entry_id), gegen doppelte Entities
+        self._claims: Dict[Tuple[str, int], str] = {}
+        # Gebündelte Events: Frames bis zum nächsten Flush
+        self._event_frames: List[dict] = []
+        self._event_flush: Optional[asyncio.Handle] = None
+        self.events_fired = 0
+        self.event_frames = 0
+
+    # --- Gateways -----------------------------------------------------------
+
+    @callback
+    def register(self, hub: "EnOceanTCPHub") -> None:
+        self.hubs.append(hub)
+        self._update_dedup()
+
+    @callback
+    def unregister(self, hub: "EnOceanTCPHub") -> None:
+        if hub in self.hubs:
+            self.hubs.remove(hub)
+        for sender, routes in list(self._routes.items()):
+            routes.pop(hub, None)
+            if not routes:
+                del self._routes[sender]
+        self._update_dedup()
+
+    def _update_dedup(self) -> None:
+        # Ein gemeinsamer Cache, damit Kopien über Gateways hinweg auffallen;
+        # das Fenster gilt je Gateway (siehe handle_packet)
+        if not any(h.dedup_window > 0 for h in self.hubs):
+            self._dedup = None
+        elif self._dedup is None:
+            self._dedup = DedupCache()
+
+    @callback
+    def claim(self, platform: str, sender: int, owner: str) -> bool:
+        """True, wenn `owner` die Entity für diesen Sender anlegen soll."""
+        return self._claims.setdefault((platform, sender), owner) == owner
+
+    @callback
+    def release_claims(self, owner: str) -> None:
+        self._claims = {k: v for k, v in self._claims.items() if v != owner}
+
+    # --- Routing ------------------------------------------------------------
+
+    def _note_route(self, sender: int, hub: "EnOceanTCPHub", dbm: Optional[int], now: float) -> None:
+        """Empfangsweg merken; beim ersten Telegramm eines Senders aufräumen."""
+        all_routes = self._routes
+        routes = all_routes.get(sender)
+        if routes is None:
+            all_routes[sender] = {hub: (dbm, now)}
+            self._prune_routes(now)
+        else:
+            routes[hub] = (dbm, now)
+            all_routes.move_to_end(sender)
+
+    def _prune_routes(self, now: float) -> None:
+        # Vorne steht der am längsten nicht gehörte Sender: entfernen, solange
+        # alle seine Wege veraltet sind oder die Obergrenze überschritten ist
+        all_routes = self._routes
+        while all_routes:
+            sender, routes = next(iter(all_routes.items()))
+            if len(all_routes) <= ROUTE_MAX_SENDERS and any(
+                now - ts < ROUTE_MAX_AGE for _, ts in routes.values()
+            ):
+                return
+            del all_routes[sender]
+            self.routes_pruned += 1
+
+    def best_hub_for(self, sender: int) -> Optional["EnOceanTCPHub"]:
+        """Verbundenes Gateway, das den Sender zuletzt am stärksten hörte."""
+        routes = self._routes.get(sender)
+        if not routes:
+            return None
+        now = time.monotonic()
+        best = None
+        best_key = None
+        for hub, (dbm, ts) in routes.items():
+            if not hub.connected:
+                continue
+            fresh = now - ts < ROUTE_MAX_AGE
+            # frische Wege vor alten, dann Pegel, dann Aktualität
+            key = (fresh, dbm if dbm is not None else -255, ts)
+            if best_key is None or key > best_key:
+                best, best_key = hub, key
+        return best
+
+    def select_hub(
+        self, gateway: Optional[str] = None, target: Optional[int] = None
+    ) -> "EnOceanTCPHub":
+        """Gateway für einen Sendeauftrag wählen.
+
+        `gateway` (Titel, Host oder host:port) hat Vorrang, sonst das Gateway mit
+        dem besten Empfang des Ziels, sonst das erste verbundene.
+        """
+        if gateway:
+            for hub in self.hubs:
+                if gateway in (hub.name, hub.host, f"{hub.host}:{hub.port}"):
+                    return hub
+            raise ValueError(f"Unbekanntes Gateway: {gateway}")
+        if target is not None:
+            hub = self.best_hub_for(target)
+            if hub is not None:
+                return hub
+        for hub in self.hubs:
+            if hub.connected:
+                return hub
+        raise ConnectionError("Kein Gateway verbunden – kann nicht senden")
+
+    async def send_frame(
+        self,
+        frame: bytes,
+        priority: int = PRIORITY_NORMAL,
+        gateway: Optional[str] = None,
+        target: Optional[int] = None,
+    ) -> Optional[int]:
+        """Sendet über das passende Gateway; Ziel ggf. aus den ERP1-Optionsdaten."""
+        if target is None:
+            target = frame_destination(frame)
+        return await self.select_hub(gateway, target).send_frame(frame, priority)
+
+    async def send_batch(
+        self,
+        specs: List[Union[str, dict]],
+        priority: int = PRIORITY_NORMAL,
+        gateway: Optional[str] = None,
+        target: Optional[int] = None,
+    ) -> List[dict]:
+        """Wie `EnOceanTCPHub.send_batch`, aber je Frame zum passenden Gateway."""
+        results, jobs = encode_frame_specs(specs)
+        groups: Dict["EnOceanTCPHub", List[Tuple[int, bytes]]] = {}
+        for slot, frame in jobs:
+            dest = target if target is not None else frame_destination(frame)
+            try:
+                hub = self.select_hub(gateway, dest)
+            except (ValueError, ConnectionError) as e:
+                results[slot]["error"] = str(e)
+                continue
+            groups.setdefault(hub, []).append((slot, frame))
+
+        async def _send(hub: "EnOceanTCPHub", group: List[Tuple[int, bytes]]) -> None:
+            try:
+                await hub.send_encoded(group, results, priority)
+            except Exception as e:  # noqa
+                for slot, _ in group:
+                    results[slot].setdefault("error", str(e))
+
+        # Gateways arbeiten ihre Teil-Batches parallel ab
+        await asyncio.gather(*(_send(h, g) for h, g in groups.items()))
+        return results
+
+    # --- Empfang ------------------------------------------------------------
+
+    @callback
+    def async_subscribe(
+        self,
+        cb: PacketCallback,
+        sender: Optional[int] = None,
+        rorg: Optional[int] = None,
+    ) -> Callable[[], None]:
+        """Registriert `cb` für Pakete eines Senders und/oder RORG.
+
+        Gibt eine Funktion zum Abmelden zurück.
+        """
+        key = (sender, rorg)
+        self._subs[key] = [*self._subs.get(key, ()), cb]
+
+        @callback
+        def _unsub() -> None:
+            cbs = [c for c in self._subs.get(key, ()) if c is not cb]
+            if cbs:
+                self._subs[key] = cbs
+            else:
+                self._subs.pop(key, None)
+
+        return _unsub
+
+    @callback
+    def handle_packet(self, hub: "EnOceanTCPHub", pkt: ESP3Packet) -> bool:
+        """Paket verteilen; False, wenn es als Duplikat verworfen wurde."""
+        sender = pkt.sender
+        if sender is not None:
+            now = time.monotonic()
+            self._note_route(sender, hub, pkt.dbm, now)
+            # Fenster des empfangenden Eintrags; 0 merkt das Telegramm nur vor
+            if self._dedup is not None and self._dedup.is_duplicate(pkt, now, hub.dedup_window):
+                # Repeater-/Mehrwege-/Gateway-Kopie: weder Entities noch Event-Bus
+                return False
+        subs = self._subs
+        if subs:
+            rorg = pkt.rorg
+            for key in ((sender, rorg), (sender, None), (None, rorg), (None, None)):
+                cbs = subs.get(key)
+                if not cbs:
+                    continue
+                for cb in cbs:
+                    try:
+                        cb(pkt)
+                    except Exception:  # noqa
+                        _LOGGER.exception("enocean_tcp: Fehler im Paket-Callback")
+        if hub.fire_events:
+            if hub.event_batch is None:
+                self._emit_event(pkt)
+            else:
+                self._queue_event(pkt, hub.event_batch)
+        return True
+
+    @callback
+    def _emit_event(self, pkt: ESP3Packet):
+        data = pkt.as_dict()
+        # Rohframe (ohne Sync/CRC) wieder zusammenbauen für Referenz
+        raw_hex = f"PT={pkt.packet_type:02X} DATA={data['data_hex']} OPT={data['opt_hex']}"
+        data["raw"] = raw_hex
+        self.hass.bus.async_fire(EVENT_FRAME, data)
+        self.events_fired += 1
+        self.event_frames += 1
+
+    @callback
+    def _queue_event(self, pkt: ESP3Packet, window: float) -> None:
+        """Frame für das nächste enocean_tcp_frames-Event vormerken.
+
+        Ohne Fenster läuft der Flush per `call_soon` nach dem aktuellen
+        Callback – also einmal je Lesevorgang (bzw. Worker-Bündel), egal wie
+        viele Telegramme darin standen. Das erste Gateway bestimmt das Fenster.
+        """
+        self._event_frames.append(pkt.as_dict())
+        if self._event_flush is None:
+            loop = self.hass.loop
+            if window > 0:
+                self._event_flush = loop.call_later(window, self._flush_events)
+            else:
+                self._event_flush = loop.call_soon(self._flush_events)
+
+    @callback
+    def _flush_events(self) -> None:
+        self._event_flush = None
+        frames, self._event_frames = self._event_frames, []
+        if frames:
+            self.hass.bus.async_fire(EVENT_FRAMES, {"count": len(frames), "frames": frames})
+            self.events_fired += 1
+            self.event_frames += len(frames)
+
+    @property
+    def dedup_stats(self) -> Optional[dict]:
+        return self._dedup.stats if self._dedup is not None else None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "gateways": len(self.hubs),
+            "known_senders": len(self._routes),
+            "routes_pruned": self.routes_pruned,
+            "subscriptions": sum(len(cbs) for cbs in self._subs.values()),
+            "claims": len(self._claims),
+            "events_fired": self.events_fired,
+            "event_frames": self.event_frames,
+        }
@@ -0,0 +1,112 @@
+"""Kennzahlen des Empfangspfads mit geringem Overhead (ohne HA-Abhängigkeit).
+
+Im heißen Pfad wird nur gezählt: ein Histogramm-Eintrag ist ein
+`int.bit_length()` und eine Listen-Addition. Perzentile, Mittelwerte und die
+Aufbereitung für Diagnose und Sensoren entstehen erst beim Auslesen.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+# Buckets sind Zweierpotenzen in Nanosekunden: Bucket i enthält Werte mit
+# i Bits, also [2^(i-1), 2^i). 32 Buckets reichen bis etwa 2 s.
+BUCKETS = 32
+
+
+class LatencyHistogram:
+    """Log2-Histogramm für Dauern in Nanosekunden."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, ns: int) -> None:
+        i = ns.bit_length()
+        self.counts[i if i < BUCKETS else BUCKETS - 1] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def copy(self) -> "LatencyHistogram":
+        new = LatencyHistogram()
+        new.merge(self)
+        return new
+
+    def since(self, earlier: "LatencyHistogram") -> "LatencyHistogram":
+        """Nur die Einträge seit `earlier` (einer früheren `copy()`)."""
+        new = LatencyHistogram()
+        new.counts = [a - b for a, b in zip(self.counts, earlier.counts)]
+        new.count = self.count - earlier.count
+        new.total = self.total - earlier.total
+        # Genaues Maximum ist nicht rekonstruierbar: Obergrenze des höchsten Buckets
+        top = max((i for i, n in enumerate(new.counts) if n), default=0)
+        new.max = min(1 << top, self.max) if new.count else 0
+        return new
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Obergrenze des Buckets mit dem q-Quantil (0..1) in µs."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(1 << i, self.max) / 1000
+        return self.max / 1000
+
+    def as_dict(self) -> dict:
+        buckets: Dict[str, int] = {
+            f"<{(1 << i) / 1000:g}µs": n for i, n in enumerate(self.counts) if n
+        }
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1000 if self.count else None,
+            "p50_us": self.percentile(0.5),
+            "p90_us": self.percentile(0.9),
+            "p99_us": self.percentile(0.99),
+            "max_us": self.max / 1000 if self.count else None,
+            "buckets": buckets,
+        }
+
+
+class ReceiveMetrics:
+    """Kennzahlen, die `ESP3Protocol` je Empfangsvorgang fortschreibt.
+
+    `parse`: Zeit, bis der Parser das nächste Paket liefert (Sync-Suche,
+    CRCs, ggf. Müll überspringen). `dispatch`: Zeit im Paket-Callback
+    (Manager, Abos, Events).
+    """
+
+    __slots__ = ("reads", "parse", "dispatch")
+
+    def __init__(self):
+        self.reads = 0  # Empfangsvorgänge (recv_into)
+        self.parse = LatencyHistogram()
+        self.dispatch = LatencyHistogram()
+
+    def merge(self, other: "ReceiveMetrics") -> None:
+        self.reads += other.reads
+        self.parse.merge(other.parse)
+        self.dispatch.merge(other.dispatch)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "reads": self.reads,
+            "parse_latency": self.parse.as_dict(),
+            "dispatch_latency": self.dispatch.as_dict(),
+        }
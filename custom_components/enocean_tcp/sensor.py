@@ -1,65 +1,337 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import NamedTuple, Optional
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import SIGNAL_STRENGTH_DECIBELS_MILLIWATT, EntityCategory
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 
-from .const import DOMAIN, EVENT_FRAME
+from .const import DOMAIN, CONF_STATE_INTERVAL, DEFAULT_STATE_INTERVAL_S, SIGNAL_DEVICE_ADDED
+from .decode import RORG_4BS
+from .devices import DeviceStore, async_get_devices
+from .eep import EEPDecoder, Field, get_decoder, parse_eep
+from .entity import CoalescedWriteMixin
+from .esp3 import ESP3Packet
+from .hub import EnOceanTCPHub
+from .metrics import LatencyHistogram
+from .server import EnOceanTCPServer
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORM = "sensor"
+# Abgefragte Sensoren (Zähler, Pegel) höchstens so oft; 0 gilt nur für Last Frame
+MIN_POLL_INTERVAL = 1.0  # Sekunden
+
+
+class _Stat(NamedTuple):
+    key: str
+    name: str
+    unit: Optional[str]
+    icon: str
+    enabled: bool = False  # Diagnose-Sensoren sind standardmäßig aus
+    state_class: SensorStateClass = SensorStateClass.TOTAL_INCREASING
+
+
+_MEASUREMENT = SensorStateClass.MEASUREMENT
+
+# Felder der EEP-Registry mit passender HA-Geräteklasse
+_DEVICE_CLASSES = {
+    "temperature": SensorDeviceClass.TEMPERATURE,
+    "humidity": SensorDeviceClass.HUMIDITY,
+    "supply_voltage": SensorDeviceClass.VOLTAGE,
+}
+
+# Schlüssel aus `hub.counters`; *_p99 werden aus den Latenz-Histogrammen
+# des jeweils letzten Intervalls berechnet
+STATS = (
+    _Stat("frames", "EnOcean Frames Received", "frames", "mdi:counter", True),
+    _Stat("frames_filtered", "EnOcean Frames Filtered", "frames", "mdi:filter-remove-outline"),
+    _Stat("bytes_received", "EnOcean Bytes Received", "B", "mdi:download-network"),
+    _Stat("header_crc_errors", "EnOcean Header CRC Errors", "errors", "mdi:alert-circle-outline"),
+    _Stat("data_crc_errors", "EnOcean Data CRC Errors", "errors", "mdi:alert-circle-outline"),
+    _Stat("bytes_skipped", "EnOcean Resync Bytes Skipped", "B", "mdi:debug-step-over"),
+    _Stat("disconnects", "EnOcean Reconnects", None, "mdi:lan-disconnect"),
+    _Stat("tx_queued", "EnOcean TX Queue Depth", "frames", "mdi:tray-full", state_class=_MEASUREMENT),
+    _Stat("parse_p99", "EnOcean Parse Latency p99", "µs", "mdi:timer-outline", state_class=_MEASUREMENT),
+    _Stat("dispatch_p99", "EnOcean Dispatch Latency p99", "µs", "mdi:timer-outline", state_class=_MEASUREMENT),
+)
+
+
+class EnOceanTCPStatSensor(SensorEntity):
+    """Kennzahl des Hubs, periodisch abgefragt statt je Frame geschrieben."""
 
-class EnOceanTCPFramesReceived(SensorEntity):
     _attr_should_poll = False
-    _attr_name = "EnOcean Frames Received"
-    _attr_icon = "mdi:counter"
-    _attr_native_unit_of_measurement = "frames"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        hub: EnOceanTCPHub | EnOceanTCPServer,
+        stat: _Stat,
+        interval: float = DEFAULT_STATE_INTERVAL_S,
+    ) -> None:
         self.hass = hass
         self.entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_frames_received"
-        self._count = 0
-        self._unsub = None
+        self._hub = hub
+        self._stat = stat
+        self._interval = max(interval, MIN_POLL_INTERVAL)
+        self._attr_name = stat.name
+        self._attr_icon = stat.icon
+        self._attr_native_unit_of_measurement = stat.unit
+        self._attr_state_class = stat.state_class
+        self._attr_entity_registry_enabled_default = stat.enabled
+        # "frames" behält die ID des früheren Frame-Zählers
+        suffix = "frames_received" if stat.key == "frames" else stat.key
+        self._attr_unique_id = f"{entry.entry_id}_{suffix}"
+        self._hist: LatencyHistogram | None = None
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
             name="EnOcean TCP Bridge",
         )
 
     async def async_added_to_hass(self) -> None:
-        self._unsub = self.hass.bus.async_listen(EVENT_FRAME, self._on_frame)
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._refresh, timedelta(seconds=self._interval)
+            )
+        )
+        self._refresh()
 
-    async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
+    def _value(self):
+        key = self._stat.key
+        if key.endswith("_p99"):
+            metrics = self._hub.metrics
+            hist = metrics.parse if key == "parse_p99" else metrics.dispatch
+            hist = hist.copy()
+            last, self._hist = self._hist, hist
+            if last is None:
+                return None
+            value = hist.since(last).percentile(0.99)
+            return round(value, 1) if value is not None else None
+        return self._hub.counters.get(key, 0)
 
-    @property
-    def native_value(self):
-        return self._count
+    @callback
+    def _refresh(self, _now=None) -> None:
+        value = self._value()
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+
+class EnOceanTCPEEPSensor(CoalescedWriteMixin, SensorEntity):
+    """Ein Messwert eines 4BS-Geräts, dekodiert über die EEP-Registry."""
+
+    _attr_should_poll = False
+    _write_on_change_only = True
+
+    def __init__(self, entry: ConfigEntry, sender: int, decoder: EEPDecoder, field: Field) -> None:
+        sender_id = f"{sender:08X}"
+        self._key = field.key
+        self._attr_name = f"{field.key.replace('_', ' ').title()} {sender_id}"
+        self._attr_unique_id = f"{entry.entry_id}_eep_{sender_id}_{field.key}"
+        self._attr_native_unit_of_measurement = field.unit
+        self._attr_device_class = _DEVICE_CLASSES.get(field.key)
+        if field.scale is not None:
+            self._attr_state_class = _MEASUREMENT
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"device_{sender_id}")},
+            name=f"EnOcean Device {sender_id}",
+            manufacturer="EnOcean",
+            model=f"{decoder.name} {decoder.title}",
+            via_device=(DOMAIN, entry.entry_id),
+        )
+
+    def _write_key(self):
+        return self._attr_native_value
+
+    @callback
+    def apply_values(self, values: dict) -> None:
+        value = values.get(self._key)
+        self._attr_native_value = round(value, 1) if isinstance(value, float) else value
+        if self.hass is not None:
+            self.async_write_coalesced()
+
+
+class _EEPSensorPlatform:
+    """4BS-Geräte mit Profil in der EEP-Registry: ein Sensor je Messwert.
+
+    Neue Geräte entstehen beim Teach-in mit EEP-Angabe (LRN-Typ-Bit). Je
+    Gerät gibt es ein Abo, das jedes Telegramm einmal dekodiert und alle
+    Sensoren des Geräts aktualisiert.
+    """
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        hub: EnOceanTCPHub | EnOceanTCPServer,
+        devices: DeviceStore,
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        self.entry = entry
+        self.hub = hub
+        self.devices = devices
+        self.async_add_entities = async_add_entities
+        self._sensors: dict[int, list[EnOceanTCPEEPSensor]] = {}
+        self._unsubs: list = []
+
+    def _add(self, sender: int, decoder: EEPDecoder, state: Optional[dict] = None) -> list[EnOceanTCPEEPSensor]:
+        # 1-Bit-Felder (LRN, Verfügbarkeit, Schalter) bleiben Attribute des Telegramms
+        sensors = [
+            EnOceanTCPEEPSensor(self.entry, sender, decoder, field)
+            for field in decoder.fields
+            if field.size > 1
+        ]
+        if state:
+            for sensor in sensors:
+                sensor.apply_values(state)
+        self._sensors[sender] = sensors
+        self._unsubs.append(
+            self.hub.async_subscribe(partial(self._on_data, sender, decoder), sender, RORG_4BS)
+        )
+        return sensors
 
     @callback
-    def _on_frame(self, event) -> None:
-        self._count += 1
-        self.async_write_ha_state()
+    def restore(self) -> list[EnOceanTCPEEPSensor]:
+        sensors = []
+        for sender, rec in self.devices.known(PLATFORM):
+            try:
+                decoder = get_decoder(*parse_eep(rec.get("eep") or ""))
+            except ValueError:
+                continue
+            if decoder is None or not self.hub.manager.claim(PLATFORM, sender, self.entry.entry_id):
+                continue
+            sensors.extend(self._add(sender, decoder, rec.get("state")))
+        return sensors
+
+    def start(self) -> None:
+        # Nur für Teach-ins neuer Sender; bekannte Geräte haben eigene Abos
+        self._unsubs.append(self.hub.async_subscribe(self._on_teach_in, rorg=RORG_4BS))
 
+    def stop(self) -> None:
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+
+    @callback
+    def _on_teach_in(self, pkt: ESP3Packet) -> None:
+        sender = pkt.sender
+        if sender is None or sender in self._sensors:
+            return
+        tg = pkt.telegram
+        if tg is None or not tg.teach_in or tg.func is None:
+            return
+        rec = self.devices.devices.get(sender)
+        if rec is not None and rec.get("platform") != PLATFORM:
+            return
+        decoder = get_decoder(RORG_4BS, tg.func, tg.type)
+        if decoder is None or not self.hub.manager.claim(PLATFORM, sender, self.entry.entry_id):
+            return
+        self.devices.async_add(sender, PLATFORM, decoder.name)
+        self.devices.async_seen(sender, pkt.dbm)
+        self.async_add_entities(self._add(sender, decoder))
+
+    @callback
+    def _on_data(self, sender: int, decoder: EEPDecoder, pkt: ESP3Packet) -> None:
+        tg = pkt.telegram
+        if tg is None or tg.teach_in:
+            return
+        values = decoder.decode(pkt.data)
+        if values is None:
+            return
+        self.devices.async_seen(sender, pkt.dbm, values)
+        for sensor in self._sensors.get(sender, ()):
+            sensor.apply_values(values)
+
+
+class EnOceanTCPLinkSensor(SensorEntity):
+    """Median-Pegel eines Geräts aus dem Ringpuffer, Details als Attribute."""
 
-class EnOceanTCPLastFrame(SensorEntity):
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
+    _attr_native_unit_of_measurement = SIGNAL_STRENGTH_DECIBELS_MILLIWATT
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_name = "Signal Strength"
+    # Perzentile ändern sich laufend; in den Recorder geht nur der Median
+    _unrecorded_attributes = frozenset(
+        {"dbm_min", "dbm_p10", "dbm_p90", "dbm_max", "repeated_ratio", "interval_p50_s",
+         "interval_p90_s", "interval_max_s", "telegrams", "samples", "last_seen"}
+    )
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        hub: EnOceanTCPHub | EnOceanTCPServer,
+        sender: int,
+        interval: float = DEFAULT_STATE_INTERVAL_S,
+    ) -> None:
+        sender_id = f"{sender:08X}"
+        self.hass = hass
+        self._hub = hub
+        self._sender = sender
+        self._interval = max(interval, MIN_POLL_INTERVAL)
+        self._attr_extra_state_attributes = {}
+        self._attr_unique_id = f"{entry.entry_id}_link_{sender_id}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"device_{sender_id}")},
+            name=f"EnOcean Device {sender_id}",
+            manufacturer="EnOcean",
+            via_device=(DOMAIN, entry.entry_id),
+        )
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._refresh, timedelta(seconds=self._interval)
+            )
+        )
+        self._refresh()
+
+    @callback
+    def _refresh(self, _now=None) -> None:
+        hist = self._hub.link_history(self._sender)
+        if hist is None:
+            return
+        attrs = hist.as_dict()
+        value = attrs.pop("dbm_p50")
+        if value != self._attr_native_value or attrs != self._attr_extra_state_attributes:
+            self._attr_native_value = value
+            self._attr_extra_state_attributes = attrs
+            self.async_write_ha_state()
+
+
+class EnOceanTCPLastFrame(CoalescedWriteMixin, SensorEntity):
     _attr_should_poll = False
     _attr_name = "EnOcean Last Frame"
     _attr_icon = "mdi:swap-horizontal"
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        hub: EnOceanTCPHub,
+        write_interval: float = DEFAULT_STATE_INTERVAL_S,
+    ) -> None:
         self.hass = hass
         self.entry = entry
+        self._hub = hub
+        self._write_interval = write_interval
         self._attr_unique_id = f"{entry.entry_id}_last_frame"
-        self._ts: datetime | None = None
-        self._last: dict | None = None
+        # Nur Verweise merken; Text entsteht erst beim tatsächlichen Schreiben
+        self._ts: float | None = None
+        self._pkt: ESP3Packet | None = None
         self._unsub = None
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
@@ -67,40 +339,67 @@ class EnOceanTCPLastFrame(SensorEntity):
         )
 
     async def async_added_to_hass(self) -> None:
-        self._unsub = self.hass.bus.async_listen(EVENT_FRAME, self._on_frame)
+        self._unsub = self._hub.async_subscribe_gateway(self._on_frame)
 
     async def async_will_remove_from_hass(self) -> None:
         if self._unsub:
             self._unsub()
             self._unsub = None
+        await super().async_will_remove_from_hass()
 
     @property
     def native_value(self):
-        return self._ts.isoformat() if self._ts else None
+        return datetime.fromtimestamp(self._ts, timezone.utc).isoformat() if self._ts else None
 
     @property
     def extra_state_attributes(self):
-        return self._last or {}
+        pkt = self._pkt
+        if pkt is None:
+            return {}
+        return {
+            "packet_type": pkt.packet_type,
+            "rorg": pkt.rorg,
+            "sender_id": pkt.sender_id,
+            "status": pkt.status,
+            "data_hex": pkt.data_hex,
+            "opt_hex": pkt.opt_hex,
+            "raw": f"PT={pkt.packet_type:02X} DATA={pkt.data_hex} OPT={pkt.opt_hex}",
+        }
 
     @callback
-    def _on_frame(self, event) -> None:
-        d = event.data
-        self._ts = datetime.now(timezone.utc)
-        self._last = {
-            "packet_type": d.get("packet_type"),
-            "rorg": d.get("rorg"),
-            "sender_id": d.get("sender_id"),
-            "status": d.get("status"),
-            "data_hex": d.get("data_hex"),
-            "opt_hex": d.get("opt_hex"),
-            "raw": d.get("raw"),
-        }
-        self.async_write_ha_state()
+    def _on_frame(self, pkt: ESP3Packet) -> None:
+        self._ts = time.time()
+        self._pkt = pkt
+        self.async_write_coalesced()
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
-    async_add_entities(
-        [EnOceanTCPFramesReceived(hass, entry), EnOceanTCPLastFrame(hass, entry)]
-    )
\ No newline at end of file
+    hub: EnOceanTCPHub = hass.data[DOMAIN][entry.entry_id]
+    interval = entry.options.get(CONF_STATE_INTERVAL, DEFAULT_STATE_INTERVAL_S)
+    devices = async_get_devices(hass, entry.entry_id)
+    platform = _EEPSensorPlatform(entry, hub, devices, async_add_entities)
+    entities: list[SensorEntity] = [
+        *(EnOceanTCPStatSensor(hass, entry, hub, stat, interval) for stat in STATS),
+        EnOceanTCPLastFrame(hass, entry, hub, interval),
+        *platform.restore(),
+    ]
+    if hub.link_history_size > 0:
+        # Je bekanntem Gerät ein (standardmäßig deaktivierter) Pegel-Sensor,
+        # für später hinzukommende Geräte per Signal aus der Gerätetabelle
+        linked = set(devices.devices)
+        entities.extend(EnOceanTCPLinkSensor(hass, entry, hub, sender, interval) for sender in linked)
+
+        @callback
+        def _add_link_sensor(sender: int) -> None:
+            if sender not in linked:
+                linked.add(sender)
+                async_add_entities([EnOceanTCPLinkSensor(hass, entry, hub, sender, interval)])
+
+        entry.async_on_unload(
+            async_dispatcher_connect(hass, SIGNAL_DEVICE_ADDED.format(entry.entry_id), _add_link_sensor)
+        )
+    async_add_entities(entities)
+    platform.start()
+    entry.async_on_unload(platform.stop)
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""Server-Modus: Home Assistant lauscht, die Gateways verbinden sich.
+
+Jede eingehende Verbindung wird ein eigener `EnOceanTCPHub` (eigener Parser,
+eigene Sende-Warteschlange, eigene Statistik), der beim gemeinsamen Manager
+registriert wird. Nach einem Gateway-Neustart ist das Gateway empfangsbereit,
+sobald es sich wieder verbindet – ohne Reconnect-Pause auf HA-Seite.
+
+Mit `worker` lauscht der Server im Loop des Worker-Threads; neue
+Verbindungen werden von dort an den HA-Loop gemeldet.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Union
+
+from homeassistant.core import HomeAssistant, callback
+
+from .allowlist import SenderFilter
+from .const import (
+    DEFAULT_DEDUP_WINDOW_MS,
+    DEFAULT_KEEPALIVE_S,
+    DEFAULT_TX_PACING_MS,
+    DEFAULT_TX_RESPONSE_TIMEOUT_S,
+    ms_to_s,
+)
+from .esp3 import ESP3Packet
+from .capture import CaptureWriter
+from .hub import EnOceanTCPHub
+from .linkstats import LinkHistory, LinkStats
+from .manager import EnOceanTCPManager, PacketCallback
+from .metrics import ReceiveMetrics
+from .transport import ESP3Protocol
+from .worker import ParseWorker, ThreadedProtocol
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EnOceanTCPServer:
+    """Nimmt beliebig viele Gateway-Verbindungen auf `host:port` an."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        fire_events: bool = True,
+        event_batch: Optional[float] = None,
+        tx_pacing: float = ms_to_s(DEFAULT_TX_PACING_MS),
+        tx_response_timeout: float = DEFAULT_TX_RESPONSE_TIMEOUT_S,
+        dedup_window: float = ms_to_s(DEFAULT_DEDUP_WINDOW_MS),
+        manager: Optional[EnOceanTCPManager] = None,
+        name: Optional[str] = None,
+        keepalive: int = DEFAULT_KEEPALIVE_S,
+        probe_interval: float = 0,
+        capture: Optional[CaptureWriter] = None,
+        sender_filter: Optional[SenderFilter] = None,
+        worker: Optional[ParseWorker] = None,
+        link_history: int = 0,
+    ):
+        self.hass = hass
+        self.host = host
+        self.port = port
+        self.name = name or f"{host}:{port}"
+        self.fire_events = fire_events
+        self.event_batch = event_batch
+        self.tx_pacing = tx_pacing
+        self.tx_response_timeout = tx_response_timeout
+        self.dedup_window = dedup_window
+        self.keepalive = keepalive
+        self.probe_interval = probe_interval
+        # Ein gemeinsamer Mitschnitt für alle Verbindungen
+        self.capture = capture
+        # Ein gemeinsamer Senderfilter für alle Verbindungen
+        self.sender_filter = sender_filter
+        self.worker = worker
+        # Funkqualität je Gateway-Host, überlebt dessen Reconnects
+        self.link_history_size = link_history
+        self._link_stats: Dict[str, LinkStats] = {}
+        self.manager = manager if manager is not None else EnOceanTCPManager(hass)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.connections: List[EnOceanTCPHub] = []
+        self._gateway_subs: List[PacketCallback] = []
+        self.accepted = 0
+        # Gateway-Host -> Zeitpunkt des letzten Verbindungsendes
+        self._lost_at: Dict[str, float] = {}
+        # Zähler beendeter Verbindungen, damit Summen nicht zurückspringen
+        self._retired: Dict[str, int] = {}
+        self._retired_metrics = ReceiveMetrics()
+
+    @property
+    def connected(self) -> bool:
+        return bool(self.connections)
+
+    async def start(self):
+        worker = self.worker
+        if worker is not None:
+            self._server = await worker.run(
+                worker.loop.create_server(self._create_protocol, self.host, self.port)
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            self._server = await loop.create_server(self._create_protocol, self.host, self.port)
+        _LOGGER.info("enocean_tcp: Lausche auf %s:%s", self.host, self.port)
+
+    async def stop(self):
+        worker = self.worker
+        if self._server is not None:
+            if worker is not None:
+                worker.call(self._server.close)
+            else:
+                self._server.close()
+        # Verbindungen schließen statt Tasks abzubrechen: sie enden dann
+        # regulär über EOF
+        tasks = list(self._tasks)
+        await asyncio.gather(*(hub.stop() for hub in list(self.connections)))
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server is not None:
+            if worker is not None:
+                await worker.run(self._server.wait_closed())
+            else:
+                await self._server.wait_closed()
+            self._server = None
+
+    def _create_protocol(self) -> ESP3Protocol:
+        # Gegenstelle ist erst in connection_made bekannt
+        hub = EnOceanTCPHub(
+            self.hass,
+            self.host,
+            self.port,
+            fire_events=self.fire_events,
+            event_batch=self.event_batch,
+            tx_pacing=self.tx_pacing,
+            tx_response_timeout=self.tx_response_timeout,
+            dedup_window=self.dedup_window,
+            manager=self.manager,
+            keepalive=self.keepalive,
+            probe_interval=self.probe_interval,
+            capture=self.capture,
+            sender_filter=self.sender_filter,
+            worker=self.worker,
+        )
+        if self.worker is not None:
+            return hub.create_protocol(partial(self._on_worker_connection, hub))
+        return hub.create_protocol(partial(self._on_connection, hub))
+
+    def _on_worker_connection(self, hub: EnOceanTCPHub, protocol: ESP3Protocol) -> None:
+        # Im Worker-Thread; erste Pakete folgen über denselben Loop danach
+        self.hass.loop.call_soon_threadsafe(
+            self._on_connection, hub, ThreadedProtocol(self.worker, protocol)
+        )
+
+    def _on_connection(
+        self, hub: EnOceanTCPHub, protocol: Union[ESP3Protocol, ThreadedProtocol]
+    ) -> None:
+        # Synchron in connection_made: erste Daten können sofort folgen
+        peer = protocol.transport.get_extra_info("peername") or ("?", 0)
+        hub.host, hub.port = peer[0], peer[1]
+        hub.name = f"{self.name} ({peer[0]})"
+        if self.link_history_size > 0:
+            hub.link_stats = self._link_stats.get(peer[0])
+            if hub.link_stats is None:
+                hub.link_stats = self._link_stats[peer[0]] = LinkStats(
+                    self.link_history_size, min_gap=self.dedup_window
+                )
+        lost_at = self._lost_at.pop(peer[0], None)
+        if lost_at is not None:
+            hub.reconnect_latency = time.monotonic() - lost_at
+        hub.async_subscribe_gateway(self._dispatch_gateway)
+        self.connections.append(hub)
+        self.accepted += 1
+        self.manager.register(hub)
+        _LOGGER.info("enocean_tcp: Gateway %s:%s verbunden", peer[0], peer[1])
+        task = asyncio.create_task(self._serve(hub, protocol))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _serve(
+        self, hub: EnOceanTCPHub, protocol: Union[ESP3Protocol, ThreadedProtocol]
+    ):
+        try:
+            await hub.serve_connection(protocol)
+        finally:
+            self._lost_at[hub.host] = time.monotonic()
+            for key, value in hub.counters.items():
+                if key != "tx_queued":
+                    self._retired[key] = self._retired.get(key, 0) + value
+            self._retired_metrics.merge(hub.metrics)
+            self.manager.unregister(hub)
+            self.connections.remove(hub)
+
+    @callback
+    def async_subscribe(
+        self,
+        cb: PacketCallback,
+        sender: Optional[int] = None,
+        rorg: Optional[int] = None,
+    ) -> Callable[[], None]:
+        """Abo auf den zusammengeführten Strom aller Gateways (siehe Manager)."""
+        return self.manager.async_subscribe(cb, sender, rorg)
+
+    @callback
+    def async_subscribe_gateway(self, cb: PacketCallback) -> Callable[[], None]:
+        """Abo auf alle Pakete, die über diesen Server empfangen wurden."""
+        self._gateway_subs = [*self._gateway_subs, cb]
+
+        @callback
+        def _unsub() -> None:
+            self._gateway_subs = [c for c in self._gateway_subs if c is not cb]
+
+        return _unsub
+
+    @callback
+    def _dispatch_gateway(self, pkt: ESP3Packet):
+        for cb in self._gateway_subs:
+            try:
+                cb(pkt)
+            except Exception:  # noqa
+                _LOGGER.exception("enocean_tcp: Fehler im Paket-Callback")
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "listen": f"{self.host}:{self.port}",
+            "accepted": self.accepted,
+            "totals": self.counters,
+            **self.metrics.stats,
+            "connections": [hub.stats for hub in self.connections],
+        }
+
+    @property
+    def counters(self) -> dict:
+        """Summe über alle (auch beendete) Verbindungen."""
+        totals = dict(self._retired)
+        for hub in self.connections:
+            for key, value in hub.counters.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    @property
+    def metrics(self) -> ReceiveMetrics:
+        merged = ReceiveMetrics()
+        merged.merge(self._retired_metrics)
+        for hub in self.connections:
+            merged.merge(hub.metrics)
+        return merged
+
+    @property
+    def dedup_stats(self) -> Optional[dict]:
+        return self.manager.dedup_stats
+
+    @property
+    def link_quality(self) -> Optional[dict]:
+        if self.link_history_size <= 0:
+            return None
+        return {
+            "gateways": [{"host": host, **stats.as_dict()} for host, stats in self._link_stats.items()]
+        }
+
+    def link_history(self, sender: int) -> Optional[LinkHistory]:
+        """Verlauf vom Gateway, das den Sender zuletzt gehört hat."""
+        best = None
+        for stats in self._link_stats.values():
+            hist = stats.get(sender)
+            if hist is not None and (best is None or hist.last_mono > best.last_mono):
+                best = hist
+        return best
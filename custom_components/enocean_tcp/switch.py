@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.switch import SwitchEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .entity import EnOceanTCPActuatorEntity, async_setup_actuators
+
+PLATFORM = "switch"
+
+
+class EnOceanTCPSwitch(EnOceanTCPActuatorEntity, SwitchEntity):
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        await self._async_send(self._actuator.switch(True), 100)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        await self._async_send(self._actuator.switch(False), 0)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    await async_setup_actuators(hass, entry, async_add_entities, PLATFORM, EnOceanTCPSwitch)
@@ -0,0 +1,106 @@
+"""Timer-Rad für viele kurze, oft verschobene Zeitgeber (ohne HA-Abhängigkeit).
+
+Statt je Tastendruck einen Loop-Timer abzubrechen und neu anzulegen, landen
+alle Ablaufzeiten in Slots eines Rads; ein einziger Loop-Timer tickt im Takt
+`resolution`, solange etwas ansteht. Planen und Abbrechen sind O(1)
+Dict-Operationen, Ablaufzeiten werden auf den nächsten Tick aufgerundet.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RESOLUTION = 0.1  # Sekunden je Tick
+DEFAULT_SLOTS = 128  # längere Zeiten drehen mehrere Runden
+
+
+class TimerWheel:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        resolution: float = DEFAULT_RESOLUTION,
+        slots: int = DEFAULT_SLOTS,
+    ):
+        self._loop = loop
+        self.resolution = resolution
+        self._base = loop.time()
+        # Slot -> {Schlüssel: (Ablauf-Tick, Callback)}
+        self._slots: List[Dict[Hashable, Tuple[int, Callable[[], None]]]] = [
+            {} for _ in range(slots)
+        ]
+        self._where: Dict[Hashable, int] = {}  # Schlüssel -> Slot
+        self._tick = 0  # zuletzt abgearbeiteter Tick
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _now_tick(self) -> int:
+        return int((self._loop.time() - self._base) / self.resolution)
+
+    def schedule(self, key: Hashable, delay: float, cb: Callable[[], None]) -> None:
+        """`cb` nach `delay` Sekunden aufrufen; ersetzt einen Timer mit gleichem Schlüssel."""
+        self.cancel(key)
+        if self._handle is None:
+            # Rad stand still: ab jetzt weiterzählen
+            self._tick = self._now_tick()
+        due = max(
+            self._tick + 1,
+            math.ceil((self._loop.time() + delay - self._base) / self.resolution),
+        )
+        slot = due % len(self._slots)
+        self._slots[slot][key] = (due, cb)
+        self._where[key] = slot
+        if self._handle is None:
+            self._arm()
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    def clear(self) -> None:
+        for slot in self._slots:
+            slot.clear()
+        self._where.clear()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _arm(self) -> None:
+        self._handle = self._loop.call_at(
+            self._base + (self._tick + 1) * self.resolution, self._on_tick
+        )
+
+    def _on_tick(self) -> None:
+        self._handle = None
+        now = self._now_tick()
+        last, self._tick = self._tick, now  # Callbacks planen ab `now` + 1
+        slots = self._slots
+        n = len(slots)
+        # Verspätete Ticks (voller Loop) nachholen, höchstens eine Runde
+        for tick in range(max(last + 1, now - n + 1), now + 1):
+            slot = slots[tick % n]
+            if not slot:
+                continue
+            due = [key for key, (at, _) in slot.items() if at <= now]
+            for key in due:
+                entry = slot.get(key)
+                if entry is None or entry[0] > now:
+                    # Von einem früheren Callback abgebrochen oder verschoben
+                    continue
+                del slot[key]
+                del self._where[key]
+                cb = entry[1]
+                try:
+                    cb()
+                except Exception:  # noqa
+                    _LOGGER.exception("enocean_tcp: Fehler im Timer-Callback")
+        if self._where and self._handle is None:
+            self._arm()
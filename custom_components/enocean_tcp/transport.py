@@ -0,0 +1,131 @@
+"""asyncio-Transport für ESP3 über TCP (ohne Home-Assistant-Abhängigkeit).
+
+`ESP3Protocol` ist ein `asyncio.BufferedProtocol`: Der Event-Loop liest per
+`recv_into` direkt in den vorbelegten Buffer des `ESP3StreamParser`, und die
+fertigen Pakete werden noch im selben Callback verteilt. Gegenüber
+`StreamReader.read()` entfallen der StreamReader-Puffer, das `bytes`-Objekt
+je Lesevorgang und die Kopie in den Parser.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import perf_counter_ns
+from typing import Callable, Optional
+
+from .esp3 import ESP3Packet, ESP3StreamParser
+from .metrics import ReceiveMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ESP3Protocol(asyncio.BufferedProtocol):
+    def __init__(
+        self,
+        parser: ESP3StreamParser,
+        on_packet: Callable[[ESP3Packet], None],
+        on_data: Optional[Callable[[int], None]] = None,
+        on_made: Optional[Callable[["ESP3Protocol"], None]] = None,
+        metrics: Optional[ReceiveMetrics] = None,
+    ):
+        self.parser = parser
+        self._on_packet = on_packet
+        self._on_data = on_data
+        self._on_made = on_made
+        self.metrics = metrics
+        self.transport: Optional[asyncio.Transport] = None
+        self._closed: Optional[asyncio.Future] = None
+        self._paused = False
+        self._drain_waiter: Optional[asyncio.Future] = None
+
+    # --- Empfang ------------------------------------------------------------
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+        self._closed = asyncio.get_running_loop().create_future()
+        if self._on_made is not None:
+            self._on_made(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.parser.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.parser.buffer_updated(nbytes)
+        if self._on_data is not None:
+            self._on_data(nbytes)
+        on_packet = self._on_packet
+        metrics = self.metrics
+        if metrics is None:
+            for pkt in self.parser.packets():
+                try:
+                    on_packet(pkt)
+                except Exception:  # noqa
+                    _LOGGER.exception("enocean_tcp: Fehler bei der Paketverteilung")
+            return
+        # Je Paket zwei Zeitstempel: Parser-Anteil und Verteilungs-Anteil
+        metrics.reads += 1
+        parse = metrics.parse.observe
+        dispatch = metrics.dispatch.observe
+        t0 = perf_counter_ns()
+        for pkt in self.parser.packets():
+            t1 = perf_counter_ns()
+            parse(t1 - t0)
+            try:
+                on_packet(pkt)
+            except Exception:  # noqa
+                _LOGGER.exception("enocean_tcp: Fehler bei der Paketverteilung")
+            t0 = perf_counter_ns()
+            dispatch(t0 - t1)
+
+    def eof_received(self) -> bool:
+        # False: Transport schließt sich selbst, connection_lost folgt
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        closed = self._closed
+        if closed is not None and not closed.done():
+            closed.set_result(exc)
+        waiter = self._drain_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_exception(exc or ConnectionError("Verbindung geschlossen"))
+
+    @property
+    def is_closing(self) -> bool:
+        return self._closed is None or self._closed.done()
+
+    async def wait_closed(self) -> Optional[Exception]:
+        """Wartet auf das Verbindungsende; liefert ggf. dessen Ursache."""
+        if self._closed is None:
+            return None
+        return await asyncio.shield(self._closed)
+
+    # --- Senden -------------------------------------------------------------
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        waiter = self._drain_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def write(self, data: bytes) -> None:
+        """Schreibt `data` und wartet ggf., bis der Sendepuffer abgebaut ist."""
+        if self.is_closing:
+            raise ConnectionError("Nicht verbunden – kann nicht senden")
+        self.transport.write(data)
+        if self._paused:
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._drain_waiter
+            finally:
+                self._drain_waiter = None
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    def abort(self) -> None:
+        if self.transport is not None:
+            self.transport.abort()
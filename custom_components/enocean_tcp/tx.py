@@ -0,0 +1,309 @@
+"""Sende-Warteschlange mit Prioritäten, Pacing und RESPONSE-Korrelation.
+
+Der TCM beantwortet jedes Kommando/Telegramm mit genau einem RESPONSE-Paket
+(Typ 0x02) und arbeitet Kommandos nacheinander ab. Deshalb ist immer nur ein
+Auftrag "in flight"; RESPONSE-Pakete gehören der Reihe nach zu seinen Frames
+(ein Frame, oder bei einem Batch ohne Pacing alle Frames des Batches).
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Sequence, Union
+
+from .const import DEFAULT_TX_PACING_MS, DEFAULT_TX_RESPONSE_TIMEOUT_S, ms_to_s
+from .esp3 import ESP3Packet
+
+_LOGGER = logging.getLogger(__name__)
+
+PACKET_TYPE_RESPONSE = 0x02
+PACKET_TYPE_COMMON_COMMAND = 0x05
+CO_RD_VERSION = 0x03
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# ESP3 Return Codes
+RET_OK = 0x00
+RET_ERROR = 0x01
+RET_NOT_SUPPORTED = 0x02
+RET_WRONG_PARAM = 0x03
+RET_OPERATION_DENIED = 0x04
+RET_NO_FREE_BUFFER = 0x07
+
+RETURN_CODES = {
+    RET_OK: "RET_OK",
+    RET_ERROR: "RET_ERROR",
+    RET_NOT_SUPPORTED: "RET_NOT_SUPPORTED",
+    RET_WRONG_PARAM: "RET_WRONG_PARAM",
+    RET_OPERATION_DENIED: "RET_OPERATION_DENIED",
+    0x05: "RET_LOCK_SET",
+    0x06: "RET_BUFFER_TO_SMALL",
+    RET_NO_FREE_BUFFER: "RET_NO_FREE_BUFFER",
+}
+
+DEFAULT_RETRIES = 2
+DEFAULT_MAX_QUEUE = 256
+
+
+class TransmitError(Exception):
+    """Frame konnte nicht (bestätigt) gesendet werden."""
+
+
+BatchResult = Union[Optional[int], Exception]
+
+
+class _TxItem:
+    __slots__ = ("frames", "batch", "future", "enqueued")
+
+    def __init__(
+        self, frames: Sequence[bytes], batch: bool, future: asyncio.Future, enqueued: float
+    ):
+        self.frames = frames
+        self.batch = batch
+        self.future = future
+        self.enqueued = enqueued
+
+
+class TxQueue:
+    def __init__(
+        self,
+        write: Callable[[Sequence[bytes]], Awaitable[None]],
+        pacing: float = ms_to_s(DEFAULT_TX_PACING_MS),
+        response_timeout: float = DEFAULT_TX_RESPONSE_TIMEOUT_S,
+        retries: int = DEFAULT_RETRIES,
+        maxsize: int = DEFAULT_MAX_QUEUE,
+    ):
+        self._write = write
+        self.pacing = pacing
+        self.response_timeout = response_timeout
+        self.retries = retries
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize)
+        self._seq = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        # Offene RESPONSEs des Auftrags in flight, in Sendereihenfolge
+        self._pending: Deque[asyncio.Future] = deque()
+        self._next_send = 0.0
+        # Kennzahlen
+        self.sent = 0
+        self.retried = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.backpressure_waits = 0
+        self.last_latency: Optional[float] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Offene Aufträge nicht hängen lassen
+        while not self._queue.empty():
+            _, _, item = self._queue.get_nowait()
+            if not item.future.done():
+                item.future.set_exception(TransmitError("Sende-Warteschlange gestoppt"))
+
+    async def send(self, frame: bytes, priority: int = PRIORITY_NORMAL) -> Optional[int]:
+        """Reiht einen fertigen ESP3-Frame ein und wartet auf das Ergebnis.
+
+        Liefert den Return Code der RESPONSE (oder `None`, wenn nicht auf
+        RESPONSE gewartet wird). Bei voller Warteschlange wartet der Aufrufer.
+        """
+        return await self._enqueue((frame,), False, priority)
+
+    async def send_batch(
+        self, frames: Sequence[bytes], priority: int = PRIORITY_NORMAL
+    ) -> List[BatchResult]:
+        """Reiht mehrere Frames als einen Auftrag ein.
+
+        Ohne Pacing gehen alle Frames in einem Schreibvorgang hinaus und die
+        RESPONSEs werden der Reihe nach zugeordnet; unbestätigte Frames werden
+        einzeln nachgesendet. Mit Pacing (Vorgabe) gehen sie einzeln im
+        Pacing-Abstand hinaus, aber ohne dass andere Aufträge dazwischenkommen.
+        Ergebnis je Frame: Return Code, `None` oder die aufgetretene Exception.
+        """
+        if not frames:
+            return []
+        return await self._enqueue(tuple(frames), True, priority)
+
+    async def _enqueue(self, frames: Sequence[bytes], batch: bool, priority: int):
+        loop = asyncio.get_running_loop()
+        item = _TxItem(frames, batch, loop.create_future(), loop.time())
+        if self._queue.full():
+            self.backpressure_waits += 1
+        await self._queue.put((priority, next(self._seq), item))
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return await item.future
+
+    def handle_response(self, pkt: ESP3Packet) -> None:
+        """RESPONSE-Paket dem ältesten unbestätigten Frame in flight zuordnen."""
+        pending = self._pending
+        while pending:
+            fut = pending.popleft()
+            if not fut.done():
+                fut.set_result(pkt.data[0] if len(pkt.data) else RET_ERROR)
+                return
+
+    def connection_lost(self) -> None:
+        for fut in self._pending:
+            if not fut.done():
+                fut.set_exception(ConnectionError("Verbindung während des Sendens verloren"))
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, item = await self._queue.get()
+            if item.future.done():
+                # Aufrufer hat abgebrochen
+                continue
+            delay = self._next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                if item.batch and self.pacing <= 0:
+                    code = await self._transmit_together(item.frames)
+                elif item.batch:
+                    code = await self._transmit_paced(item.frames)
+                else:
+                    code = await self._transmit(item.frames[0])
+            except asyncio.CancelledError:
+                if not item.future.done():
+                    item.future.set_exception(TransmitError("Sende-Warteschlange gestoppt"))
+                raise
+            except Exception as e:  # noqa
+                self.errors += 1
+                if not item.future.done():
+                    item.future.set_exception(e)
+            else:
+                self.last_latency = loop.time() - item.enqueued
+                if not item.future.done():
+                    item.future.set_result(code)
+
+    async def _transmit_together(self, frames: Sequence[bytes]) -> List[BatchResult]:
+        """Alle Frames in einem Schreibvorgang; RESPONSEs der Reihe nach zuordnen."""
+        loop = asyncio.get_running_loop()
+        timeout = self.response_timeout
+        futures = [loop.create_future() for _ in frames] if timeout > 0 else []
+        self._pending.extend(futures)
+        try:
+            await self._write(frames)
+            self.sent += len(frames)
+            self._next_send = loop.time()
+            if not futures:
+                return [None] * len(frames)
+            # Der TCM arbeitet die Frames nacheinander ab: Zeitlimit je Frame
+            await asyncio.wait(futures, timeout=timeout * len(futures))
+        finally:
+            self._pending.clear()
+        results: List[BatchResult] = []
+        resend: List[int] = []
+        for i, fut in enumerate(futures):
+            if not fut.done():
+                fut.cancel()
+                self.timeouts += 1
+                resend.append(i)
+                results.append(None)
+                continue
+            exc = fut.exception()
+            if exc is not None:
+                self.errors += 1
+                results.append(exc)
+                continue
+            code = fut.result()
+            if code == RET_NO_FREE_BUFFER:
+                resend.append(i)
+                results.append(None)
+            elif code != RET_OK:
+                self.errors += 1
+                results.append(TransmitError(f"Stick meldet {RETURN_CODES.get(code, hex(code))}"))
+            else:
+                results.append(code)
+        # Unbestätigte oder abgewiesene Frames einzeln (mit Wiederholungen) nachsenden
+        for i in resend:
+            try:
+                results[i] = await self._transmit(frames[i])
+            except (TransmitError, ConnectionError) as e:
+                self.errors += 1
+                results[i] = e
+        return results
+
+    async def _transmit_paced(self, frames: Sequence[bytes]) -> List[BatchResult]:
+        """Frames einzeln im Pacing-Abstand, ohne andere Aufträge dazwischen."""
+        loop = asyncio.get_running_loop()
+        results: List[BatchResult] = []
+        for frame in frames:
+            delay = self._next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                results.append(await self._transmit(frame))
+            except (TransmitError, ConnectionError) as e:
+                self.errors += 1
+                results.append(e)
+        return results
+
+    async def _transmit(self, frame: bytes) -> Optional[int]:
+        loop = asyncio.get_running_loop()
+        timeout = self.response_timeout
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+            if timeout > 0:
+                response = loop.create_future()
+                self._pending.append(response)
+            try:
+                await self._write((frame,))
+                self.sent += 1
+                self._next_send = loop.time() + self.pacing
+                if timeout <= 0:
+                    return None
+                try:
+                    code = await asyncio.wait_for(response, timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    continue
+            finally:
+                self._pending.clear()
+            if code == RET_NO_FREE_BUFFER:
+                # Stick ist voll – nach Pause erneut versuchen
+                await asyncio.sleep(self.pacing)
+                continue
+            if code != RET_OK:
+                raise TransmitError(
+                    f"Stick meldet {RETURN_CODES.get(code, hex(code))}"
+                )
+            return code
+        raise TransmitError(
+            f"Keine Bestätigung nach {self.retries + 1} Versuch(en)"
+        )
+
+    @property
+    def depth(self) -> int:
+        """Wartende Aufträge."""
+        return self._queue.qsize()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "retried": self.retried,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "backpressure_waits": self.backpressure_waits,
+            "last_latency": self.last_latency,
+        }
@@ -0,0 +1,182 @@
+"""Optionaler Empfangs-Thread: Socket-Lesen und Parsen außerhalb des HA-Loops.
+
+`ParseWorker` betreibt einen eigenen Event-Loop in einem Thread. Dort leben
+die Verbindungen (`ESP3Protocol` mit dem Parser des Hubs): `recv_into`,
+Sync-Suche, CRCs, Senderfilter und die RORG-Dekodierung laufen im Worker.
+`PacketBatcher` sammelt die fertigen Pakete und übergibt sie gebündelt mit
+einem einzigen `call_soon_threadsafe` je Bündel an den HA-Loop; kommt der
+HA-Loop nicht hinterher, wächst das Bündel bis `max_pending` und weitere
+Pakete werden verworfen und gezählt.
+
+`ThreadedProtocol` bietet dem Hub dieselbe Schnittstelle wie ein
+`ESP3Protocol` (Schließen, Warten, Schreiben), nur threadsicher.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, List, Optional
+
+from .esp3 import ESP3Packet
+from .transport import ESP3Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING = 10000  # Pakete je Hub, die auf den HA-Loop warten dürfen
+
+
+class ParseWorker:
+    """Thread mit eigenem Event-Loop für alle Verbindungen im Worker-Modus."""
+
+    def __init__(self, name: str = "enocean_tcp_io"):
+        self._name = name
+        self._thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name=self._name, daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def stop(self) -> None:
+        """Loop anhalten; der Thread endet danach von selbst."""
+        if self.loop is not None and self._thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread = None
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        thread = self._thread
+        self.stop()
+        if thread is not None:
+            thread.join(timeout)
+
+    async def run(self, coro: Awaitable[Any]) -> Any:
+        """`coro` im Worker-Loop ausführen und das Ergebnis im aufrufenden Loop abwarten."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> None:
+        self.loop.call_soon_threadsafe(fn, *args)
+
+
+class PacketBatcher:
+    """Sammelt im Worker Pakete und Bytezahlen und liefert sie gebündelt aus."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        on_packet: Callable[[ESP3Packet], None],
+        on_data: Callable[[int], None],
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ):
+        self._loop = loop
+        self._on_packet = on_packet
+        self._on_data = on_data
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: List[ESP3Packet] = []
+        self._nbytes = 0
+        self._scheduled = False
+        # Kennzahlen
+        self.batches = 0
+        self.delivered = 0
+        self.max_batch = 0
+        self.overflows = 0  # verworfene Pakete (HA-Loop zu langsam)
+
+    # --- Worker-Thread --------------------------------------------------------
+
+    def data(self, nbytes: int) -> None:
+        with self._lock:
+            self._nbytes += nbytes
+            self._schedule()
+
+    def packet(self, pkt: ESP3Packet) -> None:
+        if pkt.packet_type == 0x01:
+            # Dekodieren noch im Worker; das Ergebnis ist im Paket gecacht
+            pkt.telegram
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.overflows += 1
+                return
+            self._pending.append(pkt)
+            self._schedule()
+
+    def _schedule(self) -> None:
+        if not self._scheduled:
+            self._scheduled = True
+            self._loop.call_soon_threadsafe(self._deliver)
+
+    # --- HA-Loop --------------------------------------------------------------
+
+    def _deliver(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+            nbytes, self._nbytes = self._nbytes, 0
+            self._scheduled = False
+        if nbytes:
+            self._on_data(nbytes)
+        if not batch:
+            return
+        self.batches += 1
+        self.delivered += len(batch)
+        if len(batch) > self.max_batch:
+            self.max_batch = len(batch)
+        on_packet = self._on_packet
+        for pkt in batch:
+            try:
+                on_packet(pkt)
+            except Exception:  # noqa
+                _LOGGER.exception("enocean_tcp: Fehler bei der Paketverteilung")
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "mean_batch": self.delivered / self.batches if self.batches else None,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+            "overflows": self.overflows,
+        }
+
+
+class ThreadedProtocol:
+    """Threadsichere Fassade für ein `ESP3Protocol` im Worker-Loop."""
+
+    def __init__(self, worker: ParseWorker, protocol: ESP3Protocol):
+        self._worker = worker
+        self._protocol = protocol
+
+    @property
+    def transport(self) -> Optional[asyncio.Transport]:
+        # Nur für get_extra_info (Socket, Gegenstelle)
+        return self._protocol.transport
+
+    @property
+    def is_closing(self) -> bool:
+        return self._protocol.is_closing
+
+    async def wait_closed(self) -> Optional[Exception]:
+        return await self._worker.run(self._protocol.wait_closed())
+
+    async def write(self, data: bytes) -> None:
+        await self._worker.run(self._protocol.write(data))
+
+    def close(self) -> None:
+        self._worker.call(self._protocol.close)
+
+    def abort(self) -> None:
+        self._worker.call(self._protocol.abort)
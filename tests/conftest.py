@@ -0,0 +1,21 @@
+"""Gemeinsame Test-Hilfen.
+
+Wie in `benchmarks/_load.py` wird `enocean_tcp` nur als Namensraum
+registriert: Die HA-freien Module lassen sich so ohne Home-Assistant-
+Installation testen; Tests für HA-abhängige Module überspringen sich selbst.
+"""
+from __future__ import annotations
+
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+PKG = "enocean_tcp"
+COMPONENT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / PKG
+
+if PKG not in sys.modules:
+    _spec = importlib.machinery.ModuleSpec(PKG, None, is_package=True)
+    _pkg = importlib.util.module_from_spec(_spec)
+    _pkg.__path__ = [str(COMPONENT_DIR)]
+    sys.modules[PKG] = _pkg
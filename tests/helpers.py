@@ -0,0 +1,52 @@
+"""Testdaten: ERP1-Frames und ein Referenz-Parser."""
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from enocean_tcp.crc8 import crc8
+from enocean_tcp.esp3 import DEFAULT_MAX_BUFFER, build_frame
+
+ERP1 = 0x01
+OPT = bytes.fromhex("01FFFFFFFF3A00")
+
+
+def erp1(sender: int, payload: bytes = b"\xf6\x30", status: int = 0x30) -> bytes:
+    """ERP1-Frame: `payload` beginnt mit dem RORG."""
+    return build_frame(ERP1, payload + sender.to_bytes(4, "big") + bytes((status,)), OPT)
+
+
+def reference_packets(stream: bytes, max_frame: int = DEFAULT_MAX_BUFFER) -> List[Tuple[int, bytes, bytes]]:
+    """Parser wie in der ursprünglichen hub.py: Suche vorne, Kopien je Frame.
+
+    Einziger gewollter Unterschied: Header mit Länge > `max_frame` gelten als
+    falsch (die alte Version wartete darauf und blieb hängen).
+    """
+    buf = bytearray(stream)
+    out = []
+    while True:
+        idx = buf.find(b"\x55")
+        if idx == -1:
+            return out
+        del buf[:idx]
+        if len(buf) < 6:
+            return out
+        dl = (buf[1] << 8) | buf[2]
+        ol = buf[3]
+        pt = buf[4]
+        frame_len = 6 + dl + ol + 1
+        if crc8(bytes(buf[1:5])) != buf[5] or frame_len > max_frame:
+            del buf[0]
+            continue
+        if len(buf) < frame_len:
+            return out
+        data = bytes(buf[6:6 + dl])
+        opt = bytes(buf[6 + dl:6 + dl + ol])
+        if crc8(data + opt) != buf[6 + dl + ol]:
+            del buf[0]
+            continue
+        del buf[:frame_len]
+        out.append((pt, data, opt))
+
+
+def as_tuples(packets) -> List[Tuple[int, bytes, bytes]]:
+    return [(p.packet_type, bytes(p.data), bytes(p.opt)) for p in packets]
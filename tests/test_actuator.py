@@ -0,0 +1,56 @@
+import pytest
+
+from enocean_tcp.actuator import A538Actuator, Actuator, D201Actuator, get_actuator
+from enocean_tcp.esp3 import ESP3StreamParser, build_frame
+
+
+def _data(frame: bytes) -> bytes:
+    parser = ESP3StreamParser()
+    parser.feed(frame)
+    return bytes(next(parser.packets()).data)
+
+
+def test_d201_frames():
+    act = get_actuator("D2-01-12", 0x0A0B0C0D, channel=1)
+    assert isinstance(act, D201Actuator)
+    opt = bytes.fromhex("030A0B0C0DFF00")
+    assert act.switch(True) == build_frame(0x01, bytes.fromhex("D2010164") + bytes(5), opt)
+    assert act.switch(False) == build_frame(0x01, bytes.fromhex("D2010100") + bytes(5), opt)
+    assert act.dim(150) == act.switch(True)
+    assert _data(act.dim(42))[3] == 42
+
+
+def test_d201_status():
+    act = get_actuator("D2-01-12", 1, channel=1)
+    status = bytes.fromhex("D204013A") + bytes(5)
+    assert act.status(status) == 0x3A
+    assert act.status(bytes.fromhex("D204023A") + bytes(5)) is None  # anderer Kanal
+    assert act.status(bytes.fromhex("D204017F") + bytes(5)) is None  # ungültig
+
+
+def test_a538_frames_and_status():
+    act = get_actuator("A5-38-08", 0x01020304, source=0xFF800001)
+    assert isinstance(act, A538Actuator)
+    on = _data(act.switch(True))
+    assert on[:5] == bytes((0xA5, 0x01, 0, 0, 0x09)) and on[5:9] == bytes.fromhex("FF800001")
+    dim = _data(act.dim(30))
+    assert dim[:5] == bytes((0xA5, 0x02, 30, 0, 0x0D))
+    assert act.status(bytes((0xF6, 0x70)) + bytes(5)) == 100
+    assert act.status(bytes((0xF6, 0x50)) + bytes(5)) == 0
+    assert act.status(bytes((0xA5, 0x02, 55, 0, 0x09)) + bytes(5)) == 55
+
+
+def test_unsupported_eep():
+    with pytest.raises(ValueError):
+        get_actuator("A5-02-05", 1)
+
+
+def test_incomplete_actuator_rejected():
+    class SwitchOnly(Actuator):
+        def switch(self, on: bool) -> bytes:
+            return b""
+
+    with pytest.raises(TypeError):
+        Actuator((0xD2, 0x01, 0x12), 1)
+    with pytest.raises(TypeError):
+        SwitchOnly((0xD2, 0x01, 0x12), 1)
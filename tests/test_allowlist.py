@@ -0,0 +1,84 @@
+import time
+
+from enocean_tcp.allowlist import SenderFilter, is_teach_in
+from enocean_tcp.esp3 import ESP3StreamParser
+
+from .helpers import erp1
+
+TEACH_IN_4BS = b"\xa5\x08\x28\x2d\x80"
+DATA_4BS = b"\xa5\x00\x00\x80\x08"
+
+
+def _data(frame: bytes) -> bytes:
+    # ERP1-Daten eines Frames aus erp1(): Header 6, Optionen 7, CRC 1
+    return frame[6:-8]
+
+
+def test_is_teach_in():
+    for payload, expected in (
+        (TEACH_IN_4BS, True),
+        (DATA_4BS, False),
+        (b"\xd5\x00", True),
+        (b"\xd5\x08", False),
+        (b"\xf6\x30", True),
+        (b"\xd4\xa0\xff\x3e\x00\x01\x01\xd2", True),
+        (b"\xd2\x01", False),
+    ):
+        data = _data(erp1(1, payload))
+        assert is_teach_in(data, 0, len(data)) is expected, payload
+
+
+def test_unknown_rejected_without_learning():
+    flt = SenderFilter({1})
+    data = _data(erp1(2, TEACH_IN_4BS))
+    assert not flt.admit(data, 0, len(data), 2)
+    assert 2 not in flt.allowed
+
+
+def test_learn_mode_admits_teach_in_only():
+    learned = []
+    flt = SenderFilter((), learned.append)
+    flt.start_learning(60)
+    assert flt.learning
+    data = _data(erp1(3, DATA_4BS))
+    assert not flt.admit(data, 0, len(data), 3)
+    data = _data(erp1(3, TEACH_IN_4BS))
+    assert flt.admit(data, 0, len(data), 3)
+    assert 3 in flt.allowed and learned == [3] and flt.learned == 1
+
+
+def test_learn_mode_expires():
+    flt = SenderFilter()
+    flt.start_learning(0.01)
+    time.sleep(0.02)
+    assert not flt.learning
+    data = _data(erp1(4, TEACH_IN_4BS))
+    assert not flt.admit(data, 0, len(data), 4)
+
+
+def test_stop_learning():
+    flt = SenderFilter()
+    flt.start_learning(60)
+    flt.start_learning(0)
+    assert not flt.learning
+
+
+def test_allowed_is_replaced_not_mutated():
+    flt = SenderFilter({1})
+    before = flt.allowed
+    flt.start_learning(60)
+    data = _data(erp1(5, b"\xf6\x30"))
+    flt.admit(data, 0, len(data), 5)
+    assert before == frozenset({1}) and flt.allowed == frozenset({1, 5})
+    flt.set_allowed([7])
+    assert flt.allowed == frozenset({7})
+
+
+def test_parser_learns_once_per_sender():
+    learned = []
+    flt = SenderFilter((), learned.append)
+    flt.start_learning(60)
+    parser = ESP3StreamParser(sender_filter=flt)
+    parser.feed(erp1(6) + erp1(6) + erp1(7, DATA_4BS))
+    assert [p.sender for p in parser.packets()] == [6, 6]
+    assert learned == [6] and parser.frames_filtered == 1
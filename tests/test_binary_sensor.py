@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from enocean_tcp import binary_sensor  # noqa: E402
+from enocean_tcp.esp3 import ESP3StreamParser  # noqa: E402
+
+from .helpers import erp1  # noqa: E402
+
+
+class Devices:
+    def __init__(self):
+        self.devices = {}
+        self.seen = []
+
+    def async_seen(self, sender, dbm, state=None):
+        self.seen.append((sender, state))
+
+
+def _pkt(payload: bytes, status: int = 0x20):
+    parser = ESP3StreamParser()
+    parser.feed(erp1(1, payload, status))
+    return next(parser.packets())
+
+
+def _entity(cls, devices):
+    async def make():
+        hass = SimpleNamespace(loop=asyncio.get_running_loop())
+        ent = cls(hass, SimpleNamespace(entry_id="e"), None, devices, 1)
+        ent.writes = []
+        ent.async_write_ha_state = lambda: ent.writes.append(ent._state_txt)
+        return ent
+
+    return asyncio.run(make())
+
+
+def test_base_classes_are_abstract():
+    with pytest.raises(TypeError):
+        binary_sensor._StateBS(None, SimpleNamespace(entry_id="e"), None, Devices(), 1, "x", "m", None)
+
+
+def test_window_handle_writes_only_on_change():
+    devices = Devices()
+    ent = _entity(binary_sensor.EnOceanTCPWindowHandleBS, devices)
+    for db0 in (0xF0, 0xF0, 0xC0, 0x30, 0xD0):
+        ent.handle_packet(_pkt(bytes((0xF6, db0))))
+    assert ent.writes == ["closed", "open", "tilt"]
+    assert ent.is_on and [state for _, state in devices.seen] == ["closed", "closed", "open", "tilt"]
+
+
+def test_contact_skips_teach_in():
+    devices = Devices()
+    ent = _entity(binary_sensor.EnOceanTCPContactBS, devices)
+    ent.handle_packet(_pkt(b"\xd5\x09"))
+    ent.handle_packet(_pkt(b"\xd5\x00"))
+    ent.handle_packet(_pkt(b"\xd5\x08"))
+    assert ent.writes == ["closed", "open"] and ent.is_on
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from enocean_tcp.allowlist import SenderFilter
+from enocean_tcp.capture import DIR_RX, DIR_TX, CaptureWriter, read_capture, replay
+from enocean_tcp.esp3 import ESP3StreamParser
+
+from .helpers import erp1
+
+
+def test_write_read_replay(tmp_path):
+    path = str(tmp_path / "c.eocap")
+    writer = CaptureWriter(path)
+    writer.start()
+    frames = [erp1(i) for i in range(5)]
+    for frame in frames:
+        writer.record(DIR_RX, frame, ts=100.0)
+    writer.record(DIR_TX, frames[0], ts=100.5)
+    writer.close()
+    records = list(read_capture(path))
+    assert [r.frame for r in records] == frames + [frames[0]]
+    assert [r.direction for r in records] == [DIR_RX] * 5 + [DIR_TX]
+    got = []
+    assert asyncio.run(replay(records, got.append)) == 5
+    assert [p.sender for p in got] == list(range(5))
+
+
+def test_rotation(tmp_path):
+    path = str(tmp_path / "c.eocap")
+    writer = CaptureWriter(path, max_bytes=200, backups=2)
+    writer.start()
+    for i in range(50):
+        writer.record(DIR_RX, erp1(i))
+    writer.close()
+    assert writer.rotations > 0
+    assert (tmp_path / "c.eocap.1").exists() and not (tmp_path / "c.eocap.3").exists()
+
+
+def test_close_does_not_hang_after_write_error(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    # Verzeichnis unter einer Datei: Öffnen schlägt im Thread fehl
+    writer = CaptureWriter(str(blocker / "c.eocap"), queue_size=4)
+    writer.start()
+    time.sleep(0.1)
+    for i in range(10):
+        writer.record(DIR_RX, erp1(i))
+    start = time.monotonic()
+    writer.close()
+    assert time.monotonic() - start < 1
+    assert writer.errors == 1 and writer.dropped == 6
+
+
+def test_batch_frames_and_filtered_rx_recorded_separately(tmp_path):
+    path = str(tmp_path / "c.eocap")
+    writer = CaptureWriter(path)
+    writer.start()
+    writer.record_frames(DIR_TX, [erp1(7), erp1(8)])
+    parser = ESP3StreamParser(
+        sender_filter=SenderFilter({1}), keep_frames=True, on_filtered=writer.record_filtered
+    )
+    parser.feed(erp1(1) + erp1(2) + erp1(1))
+    packets = list(parser.packets())
+    writer.record_packet(packets[0])
+    writer.record_packet(packets[1], dropped=True)  # Duplikat
+    writer.close()
+    records = list(read_capture(path))
+    assert [(r.direction, r.frame, r.dropped) for r in records] == [
+        (DIR_TX, erp1(7), False),
+        (DIR_TX, erp1(8), False),
+        (DIR_RX, erp1(2), True),
+        (DIR_RX, erp1(1), False),
+        (DIR_RX, erp1(1), True),
+    ]
+    got = []
+    assert asyncio.run(replay(records, got.append)) == 3
+    assert [p.sender for p in got] == [2, 1, 1]
+    got.clear()
+    assert asyncio.run(replay(records, got.append, dropped=False)) == 1
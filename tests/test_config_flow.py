@@ -0,0 +1,28 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from enocean_tcp import config_flow  # noqa: E402
+from enocean_tcp.const import CONF_DEDUP_WINDOW, CONF_FIRE_EVENTS, CONF_LINK_HISTORY  # noqa: E402
+
+
+def test_options_flow_is_offered():
+    flow = config_flow.EnOceanTCPConfigFlow
+    entry = SimpleNamespace(options={})
+    assert flow.async_supports_options_flow(entry)
+    assert isinstance(flow.async_get_options_flow(entry), config_flow.EnOceanTCPOptionsFlowHandler)
+
+
+def test_options_form_has_all_options():
+    entry = SimpleNamespace(options={CONF_DEDUP_WINDOW: 250})
+    handler = config_flow.EnOceanTCPConfigFlow.async_get_options_flow(entry)
+    handler.flow_id = "f"
+    handler.handler = "enocean_tcp"
+    result = asyncio.run(handler.async_step_init())
+    schema = {str(key): key for key in result["data_schema"].schema}
+    for option in (CONF_FIRE_EVENTS, CONF_DEDUP_WINDOW, CONF_LINK_HISTORY):
+        assert option in schema
+    assert schema[CONF_DEDUP_WINDOW].default() == 250
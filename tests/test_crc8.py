@@ -0,0 +1,28 @@
+from enocean_tcp.crc8 import crc8
+
+
+def _bitwise(data: bytes) -> int:
+    crc = 0
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def test_matches_bitwise_reference():
+    for data in (b"", b"\x00", b"\x00\x07\x07\x01", bytes(range(256))):
+        assert crc8(data) == _bitwise(data)
+
+
+def test_incremental_equals_whole():
+    data = bytes(range(40))
+    assert crc8(data[10:], crc8(data[:10])) == crc8(data)
+    assert crc8(memoryview(data)) == crc8(data)
+
+
+def test_verify_many():
+    from enocean_tcp.crc8 import crc8_verify_many
+
+    buf = b"abcdef"
+    assert crc8_verify_many(buf, [(0, 3, crc8(b"abc")), (3, 6, crc8(b"abc"))]) == [True, False]
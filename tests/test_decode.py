@@ -0,0 +1,71 @@
+import pytest
+
+from enocean_tcp.decode import FourBSTelegram, OneBSTelegram, RPSTelegram, VLDTelegram
+from enocean_tcp.eep import decode_eep, get_decoder, parse_eep
+from enocean_tcp.esp3 import ESP3StreamParser
+
+from .helpers import erp1
+
+
+def _pkt(payload: bytes, status: int = 0x30, sender: int = 0x01020304):
+    parser = ESP3StreamParser()
+    parser.feed(erp1(sender, payload, status))
+    return next(parser.packets())
+
+
+@pytest.mark.parametrize(
+    "db0,window", [(0xC0, "open"), (0xE0, "open"), (0xF0, "closed"), (0xD0, "tilt"), (0x30, None)]
+)
+def test_window_handle_same_in_decode_and_registry(db0, window):
+    pkt = _pkt(bytes((0xF6, db0)), status=0x20)
+    assert pkt.telegram.window == window
+    assert decode_eep(parse_eep("F6-10-00"), pkt.data)["window"] == window
+
+
+def test_rps_rocker():
+    tg = _pkt(b"\xf6\x30").telegram
+    assert isinstance(tg, RPSTelegram)
+    # Status 0x30: T21 und NU gesetzt
+    assert tg.energy_bow and tg.rocker1 == 1 and tg.t21 and tg.nu
+
+
+def test_1bs_contact():
+    tg = _pkt(b"\xd5\x09").telegram
+    assert isinstance(tg, OneBSTelegram) and tg.closed and not tg.teach_in
+    assert _pkt(b"\xd5\x00").telegram.teach_in
+    assert decode_eep(parse_eep("D5-00-01"), _pkt(b"\xd5\x08").data)["contact"] == "open"
+
+
+def test_4bs_teach_in_with_eep():
+    # A5-02-05, Hersteller 0x7FF
+    tg = _pkt(bytes((0xA5, 0x02 << 2, (0x05 << 3) | 0x07, 0xFF, 0x80))).telegram
+    assert isinstance(tg, FourBSTelegram)
+    assert tg.teach_in and (tg.func, tg.type, tg.manufacturer) == (0x02, 0x05, 0x7FF)
+
+
+def test_4bs_temperature():
+    pkt = _pkt(bytes((0xA5, 0, 0, 0x80, 0x08)))
+    assert not pkt.telegram.teach_in and pkt.telegram.func is None
+    values = get_decoder(0xA5, 0x02, 0x05).decode(pkt.data)
+    # A5-02-05: 0..40 °C, Rohwert invertiert (255 = 0 °C)
+    assert values["temperature"] == pytest.approx(40 * (255 - 0x80) / 255)
+    assert values["learn"] == 1
+
+
+def test_vld_payload():
+    tg = _pkt(b"\xd2\x04\x60\xe4").telegram
+    assert isinstance(tg, VLDTelegram) and tg.payload == b"\x04\x60\xe4"
+    values = decode_eep(parse_eep("D2-01-12"), _pkt(b"\xd2\x04\x60\xe4").data)
+    assert values == {"command": 4, "channel": 0, "output": 0x64}
+
+
+def test_unknown_rorg_and_short_data():
+    assert _pkt(b"\x30\x00").telegram is None
+    assert get_decoder(0xA5, 0x02, 0x05).decode(b"\xa5\x00") is None
+
+
+def test_parse_eep():
+    assert parse_eep("a5-02-05") == (0xA5, 0x02, 0x05)
+    assert parse_eep("A5:02:05") == (0xA5, 0x02, 0x05)
+    with pytest.raises(ValueError):
+        parse_eep("A5-02")
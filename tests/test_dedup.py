@@ -0,0 +1,74 @@
+from enocean_tcp.dedup import DedupCache
+from enocean_tcp.esp3 import ESP3Packet, ESP3StreamParser
+
+from .helpers import erp1
+
+
+def _pkt(sender: int, status: int = 0x30, payload: bytes = b"\xf6\x30") -> ESP3Packet:
+    parser = ESP3StreamParser()
+    parser.feed(erp1(sender, payload, status))
+    return next(parser.packets())
+
+
+def test_copy_inside_window_is_duplicate():
+    cache = DedupCache(window=0.5)
+    assert not cache.is_duplicate(_pkt(1), 10.0)
+    # Repeater-Kopie: anderes Statusbyte, gleiche Nutzdaten
+    assert cache.is_duplicate(_pkt(1, status=0x31), 10.2)
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_outside_window_is_new():
+    cache = DedupCache(window=0.5)
+    assert not cache.is_duplicate(_pkt(1), 10.0)
+    assert not cache.is_duplicate(_pkt(1), 10.5)
+
+
+def test_window_does_not_slide_with_copies():
+    cache = DedupCache(window=0.5)
+    cache.is_duplicate(_pkt(1), 10.0)
+    assert cache.is_duplicate(_pkt(1), 10.4)
+    assert not cache.is_duplicate(_pkt(1), 10.6)
+
+
+def test_other_sender_or_payload_is_new():
+    cache = DedupCache(window=0.5)
+    cache.is_duplicate(_pkt(1), 10.0)
+    assert not cache.is_duplicate(_pkt(2), 10.1)
+    assert not cache.is_duplicate(_pkt(1, payload=b"\xf6\x10"), 10.1)
+
+
+def test_per_call_window():
+    cache = DedupCache(window=0.5)
+    cache.is_duplicate(_pkt(1), 10.0)
+    assert not cache.is_duplicate(_pkt(1), 10.1, window=0)
+    assert cache.is_duplicate(_pkt(1), 10.2, window=1.0)
+
+
+def test_memoryview_packets_do_not_alias_parser_buffer():
+    cache = DedupCache(window=1.0)
+    parser = ESP3StreamParser(max_buffer=64)
+    parser.feed(erp1(1))
+    first = next(parser.packets())
+    assert not cache.is_duplicate(first, 0.0)
+    parser.feed(erp1(1, b"\xf6\x10"))
+    assert not cache.is_duplicate(next(parser.packets()), 0.1)
+    parser.feed(erp1(1))
+    assert cache.is_duplicate(next(parser.packets()), 0.2)
+
+
+def test_lru_bound():
+    cache = DedupCache(window=10, maxsize=3)
+    for sender in range(5):
+        cache.is_duplicate(_pkt(sender), 0.0)
+    assert cache.stats["size"] == 3 and cache.stats["evictions"] == 2
+    # Ältester Eintrag ist verdrängt
+    assert not cache.is_duplicate(_pkt(0), 0.1)
+    assert cache.is_duplicate(_pkt(4), 0.1)
+
+
+def test_non_erp1_never_duplicate():
+    cache = DedupCache(window=10)
+    pkt = ESP3Packet(0x02, b"\x00", b"")
+    assert not cache.is_duplicate(pkt, 0.0)
+    assert not cache.is_duplicate(pkt, 0.0)
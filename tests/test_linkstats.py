@@ -0,0 +1,40 @@
+from enocean_tcp.linkstats import LinkStats
+
+
+def test_percentiles_and_copies():
+    stats = LinkStats(size=8, min_gap=0.3)
+    stats.record(1, -60, 0x00, now=1.0)
+    # Repeater-Kopie: Pegel zählt, Abstand nicht
+    stats.record(1, -70, 0x01, now=1.1)
+    stats.record(1, -65, 0x00, now=2.1)
+    hist = stats.get(1).as_dict()
+    assert hist["telegrams"] == 3 and hist["samples"] == 3
+    assert hist["dbm_min"] == -70 and hist["dbm_max"] == -60 and hist["dbm_p50"] == -65
+    assert hist["repeated_ratio"] == 1 / 3
+    assert hist["interval_p50_s"] == 1.1
+
+
+def test_ring_wraps():
+    stats = LinkStats(size=4)
+    for i in range(10):
+        stats.record(1, -50 - i, 0, now=float(i))
+    hist = stats.get(1).as_dict()
+    assert hist["samples"] == 4 and hist["telegrams"] == 10
+    assert hist["dbm_max"] == -56 and hist["dbm_min"] == -59
+
+
+def test_evicts_least_recently_heard():
+    stats = LinkStats(size=4, max_senders=3)
+    for i, sender in enumerate((1, 2, 3, 1, 4)):
+        stats.record(sender, -50, 0, now=float(i))
+    assert sorted(sender for sender, _ in stats.items()) == [1, 3, 4]
+    assert stats.evicted == 1 and len(stats) == 3
+    # Übernommener Puffer beginnt leer
+    assert stats.get(4).as_dict()["telegrams"] == 1
+
+
+def test_low_dbm_clamped():
+    stats = LinkStats(size=4)
+    stats.record(1, -200, None, now=0.0)
+    assert stats.get(1).as_dict()["dbm_min"] == -128
+    assert stats.as_dict()["memory_bytes"] == 4 * 6
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from enocean_tcp import manager as manager_mod  # noqa: E402
+from enocean_tcp.esp3 import ESP3StreamParser  # noqa: E402
+from enocean_tcp.manager import ROUTE_MAX_AGE, EnOceanTCPManager  # noqa: E402
+
+from .helpers import erp1  # noqa: E402
+
+
+class Hub:
+    def __init__(self, name: str):
+        self.name = name
+        self.connected = True
+        self.dedup_window = 0.0
+
+
+def test_best_hub_prefers_strongest_fresh_route():
+    mgr = EnOceanTCPManager(None)
+    a, b = Hub("a"), Hub("b")
+    mgr._note_route(1, a, -80, 10.0)
+    mgr._note_route(1, b, -60, 11.0)
+    assert mgr.best_hub_for(1) is b
+    b.connected = False
+    assert mgr.best_hub_for(1) is a
+
+
+def test_stale_senders_pruned_on_insert():
+    mgr = EnOceanTCPManager(None)
+    hub = Hub("a")
+    mgr._note_route(1, hub, -70, 0.0)
+    mgr._note_route(2, hub, -70, 100.0)
+    # Sender 1 erneut gehört: wandert nach hinten, bleibt erhalten
+    mgr._note_route(1, hub, -70, 200.0)
+    mgr._note_route(3, hub, -70, 100.0 + ROUTE_MAX_AGE)
+    assert list(mgr._routes) == [1, 3]
+    assert mgr.stats["routes_pruned"] == 1
+
+
+def test_route_map_capped(monkeypatch):
+    monkeypatch.setattr(manager_mod, "ROUTE_MAX_SENDERS", 3)
+    mgr = EnOceanTCPManager(None)
+    hub = Hub("a")
+    for sender in range(5):
+        mgr._note_route(sender, hub, -70, float(sender))
+    assert list(mgr._routes) == [2, 3, 4]
+
+
+def test_unregister_drops_empty_routes():
+    mgr = EnOceanTCPManager(None)
+    a, b = Hub("a"), Hub("b")
+    mgr.register(a)
+    mgr.register(b)
+    mgr._note_route(1, a, -70, 0.0)
+    mgr._note_route(2, a, -70, 0.0)
+    mgr._note_route(2, b, -70, 0.0)
+    mgr.unregister(a)
+    assert list(mgr._routes) == [2]
+    assert mgr.best_hub_for(2) is b
+
+
+def test_handle_packet_reports_duplicates():
+    mgr = EnOceanTCPManager(None)
+    hub = Hub("a")
+    hub.dedup_window = 1.0
+    hub.fire_events = False
+    mgr.register(hub)
+    parser = ESP3StreamParser()
+    parser.feed(erp1(1) + erp1(1, status=0x31))
+    first, copy = parser.packets()
+    assert mgr.handle_packet(hub, first) is True
+    assert mgr.handle_packet(hub, copy) is False
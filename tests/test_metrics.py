@@ -0,0 +1,20 @@
+from enocean_tcp.metrics import LatencyHistogram
+
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ns in (1000, 1000, 1000, 100_000):
+        hist.observe(ns)
+    assert hist.count == 4 and hist.max == 100_000
+    assert hist.percentile(0.5) == 1.024
+    assert hist.percentile(1.0) == 100.0
+
+
+def test_since():
+    hist = LatencyHistogram()
+    hist.observe(1000)
+    snap = hist.copy()
+    hist.observe(5000)
+    delta = hist.since(snap)
+    assert delta.count == 1 and delta.total == 5000
+    assert LatencyHistogram().percentile(0.5) is None
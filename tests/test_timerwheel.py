@@ -0,0 +1,98 @@
+import asyncio
+
+from enocean_tcp.timerwheel import TimerWheel
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_fires_after_delay():
+    async def main():
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(loop, resolution=0.01)
+        fired = []
+        start = loop.time()
+        wheel.schedule("a", 0.05, lambda: fired.append(loop.time() - start))
+        assert len(wheel) == 1
+        await asyncio.sleep(0.1)
+        assert len(fired) == 1 and fired[0] >= 0.05
+        assert len(wheel) == 0
+
+    _run(main())
+
+
+def test_cancel():
+    async def main():
+        wheel = TimerWheel(asyncio.get_running_loop(), resolution=0.01)
+        fired = []
+        wheel.schedule("a", 0.03, lambda: fired.append("a"))
+        assert wheel.cancel("a")
+        assert not wheel.cancel("a")
+        await asyncio.sleep(0.06)
+        assert fired == []
+
+    _run(main())
+
+
+def test_reschedule_replaces():
+    async def main():
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(loop, resolution=0.01)
+        fired = []
+        wheel.schedule("a", 0.03, lambda: fired.append("first"))
+        await asyncio.sleep(0.02)
+        wheel.schedule("a", 0.05, lambda: fired.append("second"))
+        await asyncio.sleep(0.03)
+        assert fired == []
+        await asyncio.sleep(0.05)
+        assert fired == ["second"]
+
+    _run(main())
+
+
+def test_longer_than_one_turn():
+    async def main():
+        wheel = TimerWheel(asyncio.get_running_loop(), resolution=0.01, slots=4)
+        fired = []
+        wheel.schedule("long", 0.1, lambda: fired.append("long"))
+        wheel.schedule("short", 0.02, lambda: fired.append("short"))
+        await asyncio.sleep(0.05)
+        assert fired == ["short"]
+        await asyncio.sleep(0.1)
+        assert fired == ["short", "long"]
+
+    _run(main())
+
+
+def test_callback_may_reschedule_and_errors_are_contained():
+    async def main():
+        wheel = TimerWheel(asyncio.get_running_loop(), resolution=0.01)
+        fired = []
+
+        def boom():
+            raise RuntimeError
+
+        def again():
+            fired.append(len(fired))
+            if len(fired) < 3:
+                wheel.schedule("b", 0.01, again)
+
+        wheel.schedule("a", 0.01, boom)
+        wheel.schedule("b", 0.01, again)
+        await asyncio.sleep(0.1)
+        assert fired == [0, 1, 2]
+
+    _run(main())
+
+
+def test_clear():
+    async def main():
+        wheel = TimerWheel(asyncio.get_running_loop(), resolution=0.01)
+        fired = []
+        wheel.schedule("a", 0.02, lambda: fired.append("a"))
+        wheel.clear()
+        await asyncio.sleep(0.05)
+        assert fired == [] and len(wheel) == 0
+
+    _run(main())
@@ -0,0 +1,182 @@
+import asyncio
+
+import pytest
+
+from enocean_tcp.esp3 import ESP3Packet
+from enocean_tcp.tx import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    RET_NO_FREE_BUFFER,
+    RET_OK,
+    RET_WRONG_PARAM,
+    TransmitError,
+    TxQueue,
+)
+
+
+def _response(code: int) -> ESP3Packet:
+    return ESP3Packet(0x02, bytes((code,)), b"")
+
+
+class FakeStick:
+    """Schreibt mit und beantwortet jeden Frame mit dem nächsten Code aus `codes`."""
+
+    def __init__(self, codes=()):
+        self.writes = []
+        self.times = []
+        self.codes = list(codes)
+        self.queue = None
+
+    async def write(self, frames) -> None:
+        loop = asyncio.get_running_loop()
+        data = b"".join(frames)
+        self.writes.append(data)
+        self.times.append(loop.time())
+        for _ in range(data.count(b"F")):
+            if self.codes:
+                code = self.codes.pop(0)
+                if code is not None:
+                    loop.call_soon(self.queue.handle_response, _response(code))
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _queue(stick, **kw) -> TxQueue:
+    q = TxQueue(stick.write, **kw)
+    stick.queue = q
+    q.start()
+    return q
+
+
+def test_response_code_returned():
+    async def main():
+        stick = FakeStick([RET_OK])
+        q = await _queue(stick, pacing=0, response_timeout=0.5)
+        assert await q.send(b"F1") == RET_OK
+        await q.stop()
+
+    _run(main())
+
+
+def test_error_code_raises():
+    async def main():
+        stick = FakeStick([RET_WRONG_PARAM])
+        q = await _queue(stick, pacing=0, response_timeout=0.5)
+        with pytest.raises(TransmitError):
+            await q.send(b"F1")
+        await q.stop()
+
+    _run(main())
+
+
+def test_timeout_retries_then_fails():
+    async def main():
+        stick = FakeStick([None, None, None])
+        q = await _queue(stick, pacing=0, response_timeout=0.02, retries=2)
+        with pytest.raises(TransmitError):
+            await q.send(b"F1")
+        assert len(stick.writes) == 3 and q.timeouts == 3 and q.retried == 2
+        await q.stop()
+
+    _run(main())
+
+
+def test_no_free_buffer_retried():
+    async def main():
+        stick = FakeStick([RET_NO_FREE_BUFFER, RET_OK])
+        q = await _queue(stick, pacing=0, response_timeout=0.5)
+        assert await q.send(b"F1") == RET_OK
+        assert stick.writes == [b"F1", b"F1"]
+        await q.stop()
+
+    _run(main())
+
+
+def test_priority_order():
+    async def main():
+        stick = FakeStick()
+        q = TxQueue(stick.write, pacing=0, response_timeout=0)
+        stick.queue = q
+        # Erst einreihen, dann starten: Reihenfolge entscheidet nur die Priorität
+        tasks = [
+            asyncio.create_task(q.send(b"Flow", PRIORITY_LOW)),
+            asyncio.create_task(q.send(b"Fnormal")),
+            asyncio.create_task(q.send(b"Fhigh", PRIORITY_HIGH)),
+            asyncio.create_task(q.send(b"Fnormal2")),
+        ]
+        await asyncio.sleep(0)
+        q.start()
+        await asyncio.gather(*tasks)
+        assert stick.writes == [b"Fhigh", b"Fnormal", b"Fnormal2", b"Flow"]
+        await q.stop()
+
+    _run(main())
+
+
+def test_pacing():
+    async def main():
+        stick = FakeStick()
+        q = await _queue(stick, pacing=0.05, response_timeout=0)
+        await asyncio.gather(*(q.send(b"F%d" % i) for i in range(3)))
+        gaps = [b - a for a, b in zip(stick.times, stick.times[1:])]
+        assert all(gap >= 0.045 for gap in gaps), gaps
+        await q.stop()
+
+    _run(main())
+
+
+def test_batch_single_write_responses_in_order():
+    async def main():
+        # F2 meldet "Puffer voll", F3 bleibt unbeantwortet: beide einzeln nach
+        stick = FakeStick([RET_OK, RET_NO_FREE_BUFFER, None, RET_OK, RET_OK])
+        q = await _queue(stick, pacing=0, response_timeout=0.05)
+        results = await q.send_batch([b"F1", b"F2", b"F3"])
+        assert stick.writes == [b"F1F2F3", b"F2", b"F3"]
+        assert results == [RET_OK, RET_OK, RET_OK]
+        await q.stop()
+
+    _run(main())
+
+
+def test_batch_paced_is_not_interleaved():
+    async def main():
+        stick = FakeStick()
+        q = await _queue(stick, pacing=0.01, response_timeout=0)
+        batch = asyncio.create_task(q.send_batch([b"F1", b"F2", b"F3"]))
+        await asyncio.sleep(0)
+        other = asyncio.create_task(q.send(b"Fx", PRIORITY_HIGH))
+        assert await batch == [None, None, None]
+        await other
+        assert stick.writes == [b"F1", b"F2", b"F3", b"Fx"]
+        await q.stop()
+
+    _run(main())
+
+
+def test_connection_lost_fails_in_flight():
+    async def main():
+        stick = FakeStick([None])
+        q = await _queue(stick, pacing=0, response_timeout=5, retries=0)
+        task = asyncio.create_task(q.send(b"F1"))
+        await asyncio.sleep(0.01)
+        q.connection_lost()
+        with pytest.raises(ConnectionError):
+            await task
+        await q.stop()
+
+    _run(main())
+
+
+def test_stop_fails_queued():
+    async def main():
+        stick = FakeStick()
+        q = TxQueue(stick.write, pacing=0, response_timeout=0)
+        task = asyncio.create_task(q.send(b"F1"))
+        await asyncio.sleep(0)
+        await q.stop()
+        with pytest.raises(TransmitError):
+            await task
+
+    _run(main())
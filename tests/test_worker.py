@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+from enocean_tcp.esp3 import ESP3StreamParser
+from enocean_tcp.worker import PacketBatcher, ParseWorker
+
+from .helpers import erp1
+
+
+def _packets(n: int):
+    parser = ESP3StreamParser()
+    parser.feed(b"".join(erp1(i) for i in range(n)))
+    return list(parser.packets())
+
+
+def test_batches_packets_from_another_thread():
+    async def main():
+        loop = asyncio.get_running_loop()
+        got, nbytes, threads = [], [], set()
+
+        def on_packet(pkt):
+            threads.add(threading.current_thread())
+            got.append(pkt.sender)
+
+        batcher = PacketBatcher(loop, on_packet, nbytes.append)
+        packets = _packets(100)
+
+        def produce():
+            batcher.data(1234)
+            for pkt in packets:
+                batcher.packet(pkt)
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+        assert got == list(range(100))
+        assert sum(nbytes) == 1234
+        assert threads == {threading.main_thread()}
+        # Alles lag vor dem ersten Ausliefern an: ein Bündel
+        assert batcher.stats["batches"] == 1 and batcher.stats["max_batch"] == 100
+        # Dekodiert wurde schon im Worker
+        assert all(p._telegram is not None for p in packets)
+
+    asyncio.run(main())
+
+
+def test_overflow_drops_and_counts():
+    async def main():
+        got = []
+        batcher = PacketBatcher(asyncio.get_running_loop(), lambda p: got.append(p), lambda n: None, max_pending=10)
+        for pkt in _packets(25):
+            batcher.packet(pkt)
+        await asyncio.sleep(0.01)
+        assert len(got) == 10 and batcher.overflows == 15
+
+    asyncio.run(main())
+
+
+def test_callback_errors_do_not_stop_batch():
+    async def main():
+        got = []
+
+        def on_packet(pkt):
+            if pkt.sender == 1:
+                raise RuntimeError
+            got.append(pkt.sender)
+
+        batcher = PacketBatcher(asyncio.get_running_loop(), on_packet, lambda n: None)
+        for pkt in _packets(3):
+            batcher.packet(pkt)
+        await asyncio.sleep(0.01)
+        assert got == [0, 2]
+
+    asyncio.run(main())
+
+
+def test_parse_worker_runs_coroutines_in_its_thread():
+    async def main():
+        worker = ParseWorker()
+        worker.start()
+
+        async def where():
+            return threading.current_thread().name
+
+        try:
+            assert await worker.run(where()) == worker._thread.name
+        finally:
+            worker.stop()
+            worker.join(2)
+
+    asyncio.run(main())